@@ -1,7 +1,8 @@
 """LangChain을 사용한 텍스트 청킹 유틸리티"""
 
+from bisect import bisect_right
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter, Language
 from legacy_code_archive_mcp.config import Config
 
@@ -95,3 +96,46 @@ class ChunkingService:
         """
         language = self.detect_language(file_path)
         return self.split_text(content, language)
+
+    def split_file_with_lines(
+        self,
+        file_path: str,
+        content: str
+    ) -> List[Tuple[str, int, int, int, int]]:
+        """파일 내용을 청크로 분할하고 각 청크의 줄 범위와 문자 오프셋을 함께 반환합니다.
+
+        Args:
+            file_path: 파일 경로 (언어 감지용)
+            content: 파일 내용
+
+        Returns:
+            (청크, 시작 줄, 끝 줄, 시작 오프셋, 끝 오프셋) 튜플 리스트
+            (줄 번호는 1부터 시작, 오프셋은 content 기준 문자 위치이며 끝은 포함하지 않음)
+        """
+        chunks = self.split_file(file_path, content)
+
+        # 각 줄의 시작 위치 (문자 오프셋)
+        line_starts = [0]
+        newline = content.find("\n")
+        while newline != -1:
+            line_starts.append(newline + 1)
+            newline = content.find("\n", newline + 1)
+
+        results = []
+        search_from = 0
+        for chunk in chunks:
+            # 분할기는 청크 앞뒤 공백을 제거하므로 원문에서 위치를 다시 찾음
+            start = content.find(chunk, search_from)
+            if start == -1:
+                start = max(content.find(chunk), 0)
+            end = start + max(len(chunk) - 1, 0)
+            results.append((
+                chunk,
+                bisect_right(line_starts, start),
+                bisect_right(line_starts, end),
+                start,
+                start + len(chunk)
+            ))
+            search_from = start + 1
+
+        return results
@@ -47,6 +47,59 @@ class Config(BaseModel):
         default=100,
         description="단일 배치에서 임베딩할 청크 수"
     )
+    checkpoint_chunks: int = Field(
+        default=1000,
+        description="인덱싱 중 원자적으로 커밋하고 저널에 기록하는 단위 청크 수"
+    )
+    optimize_version_threshold: int = Field(
+        default=50,
+        description="인덱싱 후 자동 최적화를 실행할 마지막 최적화 이후 테이블 버전 수"
+    )
+    optimize_fragment_threshold: int = Field(
+        default=32,
+        description="인덱싱 후 자동 최적화를 실행할 작은 프래그먼트 수"
+    )
+    search_mode: str = Field(
+        default="flat",
+        description=(
+            "기본 검색 모드 "
+            "(flat: 모든 청크 대상, two_stage: 파일 벡터로 후보 파일을 고른 뒤 청크 검색)"
+        )
+    )
+    two_stage_file_candidates: int = Field(
+        default=50,
+        description="2단계 검색에서 1단계로 고를 후보 파일 수"
+    )
+    mmr_lambda: float = Field(
+        default=0.7,
+        description=(
+            "검색 결과 재순위화(MMR)의 관련성 가중치 "
+            "(0~1, 작을수록 서로 다른 결과 우선, 1이면 관련성 순서 그대로)"
+        )
+    )
+    mmr_fetch_factor: int = Field(
+        default=4,
+        description="재순위화를 위해 결과 수 대비 더 가져올 후보 배수"
+    )
+    max_chunks_per_file: int = Field(
+        default=2,
+        description="검색 결과에 포함할 파일별 최대 청크 수 (0이면 제한 없음)"
+    )
+    version_retention_days: int = Field(
+        default=7,
+        description="최적화 시 보존할 이전 테이블 버전의 기간(일)"
+    )
+    read_consistency_seconds: float = Field(
+        default=5.0,
+        description="캐시된 테이블 핸들이 다른 프로세스가 기록한 새 버전을 확인하는 주기(초)"
+    )
+    store_content: bool = Field(
+        default=True,
+        description=(
+            "청크 본문을 테이블에 저장할지 여부 "
+            "(False이면 파일 경로, 바이트 오프셋, 내용 해시만 저장하고 검색 시 원본 파일에서 읽음)"
+        )
+    )
 
     @field_validator('project_paths', mode='before')
     @classmethod
@@ -75,6 +128,25 @@ class Config(BaseModel):
         return v
 
 
+# 선택적으로 환경 변수에서 읽는 구성 항목 (필드 이름 -> 환경 변수 이름)
+OPTIONAL_ENV_VARS = {
+    "embedding_model": "EMBEDDING_MODEL",
+    "chunk_size": "CHUNK_SIZE",
+    "chunk_overlap": "CHUNK_OVERLAP",
+    "checkpoint_chunks": "CHECKPOINT_CHUNKS",
+    "optimize_version_threshold": "OPTIMIZE_VERSION_THRESHOLD",
+    "optimize_fragment_threshold": "OPTIMIZE_FRAGMENT_THRESHOLD",
+    "version_retention_days": "VERSION_RETENTION_DAYS",
+    "search_mode": "SEARCH_MODE",
+    "two_stage_file_candidates": "TWO_STAGE_FILE_CANDIDATES",
+    "store_content": "STORE_CONTENT",
+    "mmr_lambda": "MMR_LAMBDA",
+    "mmr_fetch_factor": "MMR_FETCH_FACTOR",
+    "max_chunks_per_file": "MAX_CHUNKS_PER_FILE",
+    "read_consistency_seconds": "READ_CONSISTENCY_SECONDS",
+}
+
+
 def load_config() -> Config:
     """환경 변수에서 구성을 로드합니다.
 
@@ -96,10 +168,18 @@ def load_config() -> Config:
     if not project_paths:
         raise ValueError("PROJECT_PATHS environment variable is required")
 
+    # 선택 항목은 설정된 경우에만 전달 (미설정 시 Config 기본값 사용)
+    optional_settings = {
+        field: os.environ[env_name]
+        for field, env_name in OPTIONAL_ENV_VARS.items()
+        if os.environ.get(env_name)
+    }
+
     return Config(
         project_paths=project_paths,
         included_extensions=included_extensions,
         exclude_patterns=exclude_patterns,
         openai_api_key=openai_api_key,
-        lancedb_path=lancedb_path
+        lancedb_path=lancedb_path,
+        **optional_settings
     )
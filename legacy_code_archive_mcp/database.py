@@ -1,18 +1,63 @@
 """벡터 저장 및 검색을 위한 LanceDB 데이터베이스 작업"""
 
+import asyncio
+import copy
 import hashlib
+import random
+import time
+from datetime import timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Set
 import lancedb
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from lancedb.table import Table
 from legacy_code_archive_mcp.config import Config
 from legacy_code_archive_mcp.models import CodeSnippet, SearchResult
+from legacy_code_archive_mcp import reranking
+from legacy_code_archive_mcp.source_reader import read_chunks, read_lines
+from legacy_code_archive_mcp.state import IndexStateStore
 
 
 class DatabaseService:
     """LanceDB 벡터 데이터베이스 작업을 관리하는 서비스"""
 
     TABLE_NAME = "code_snippets"
+    FILES_TABLE_SUFFIX = "_files"
+    SEARCH_MODES = ("flat", "two_stage")
+    FILTER_BATCH_SIZE = 500
+    # 행 스키마 버전 (청크 행의 컬럼 구성이 바뀌면 증가시켜 재인덱싱을 유도)
+    SCHEMA_VERSION = 2
+    # 필터 컬럼 -> 스칼라 인덱스를 만들 수 있는 소문자 복사본 컬럼
+    # (Lance는 대소문자가 섞인 컬럼 이름에 스칼라 인덱스를 만들지 못함)
+    FILTER_COLUMNS = {
+        "projectId": "project_id",
+        "filePath": "file_path",
+        "lastModified": "last_modified"
+    }
+    # 이전 버전 테이블에 추가되는 컬럼과 기본값 SQL 식 (필터 컬럼 복사본은 원본 값으로 채움)
+    ADDED_COLUMNS = {
+        "startLine": "0",
+        "endLine": "0",
+        "contentHash": "''",
+        "startOffset": "0",
+        "endOffset": "0",
+        **{copy_column: f"`{column}`" for column, copy_column in FILTER_COLUMNS.items()}
+    }
+    # 검색 결과로 읽는 컬럼 (벡터 제외)
+    RESULT_COLUMNS = [
+        "id", "content", "filePath", "projectPath", "language",
+        "startLine", "endLine", "startOffset", "endOffset", "contentHash"
+    ]
+    # 필터 컬럼별 스칼라 인덱스 유형 (카디널리티가 낮은 컬럼은 BITMAP)
+    SCALAR_INDEXES = {
+        "project_id": "BITMAP",
+        "language": "BITMAP",
+        "file_path": "BTREE",
+        "last_modified": "BTREE",
+        "id": "BTREE"
+    }
 
     def __init__(self, config: Config):
         """데이터베이스 서비스를 초기화합니다.
@@ -22,17 +67,132 @@ class DatabaseService:
         """
         self.config = config
         self.db_path = config.lancedb_path
-        self.db = lancedb.connect(self.db_path)
+        # 열린 테이블 핸들은 캐시하며, 다른 프로세스가 기록한 새 버전은 이 주기로 확인하여 반영
+        self.db = lancedb.connect(
+            self.db_path,
+            read_consistency_interval=timedelta(seconds=config.read_consistency_seconds)
+        )
         self._table: Optional[Table] = None
+        self._files_table: Optional[Table] = None
+        self._fixed_table_name: Optional[str] = None
+        # 마지막으로 연 테이블 이름 (테이블이 없었던 경우도 기록하여 매 요청마다 다시 열지 않음)
+        self._opened_table_name: Optional[str] = None
+        # 열린 테이블에 필터 컬럼의 소문자 복사본이 모두 있는지 여부
+        self._filter_columns_ready = True
+        self.state = IndexStateStore(self.db_path)
+
+    @property
+    def table_name(self) -> str:
+        """이 서비스가 사용하는 테이블 이름 (기본값: 상태에 기록된 활성 테이블)"""
+        if self._fixed_table_name:
+            return self._fixed_table_name
+        return self.state.data.get("table", {}).get("name", self.TABLE_NAME)
+
+    def for_table(self, table_name: str) -> "DatabaseService":
+        """같은 연결과 상태 저장소를 공유하면서 다른 테이블을 다루는 서비스를 만듭니다.
+
+        Args:
+            table_name: 사용할 테이블 이름 (예: 재인덱싱 중인 섀도 테이블)
+
+        Returns:
+            지정한 테이블에 고정된 DatabaseService
+        """
+        service = copy.copy(self)
+        service._fixed_table_name = table_name
+        service._ensure_table()
+        return service
+
+    @property
+    def files_table_name(self) -> str:
+        """청크 테이블에 대응하는 파일 단위 벡터 테이블 이름"""
+        return f"{self.table_name}{self.FILES_TABLE_SUFFIX}"
 
     def _ensure_table(self):
-        """테이블이 존재하는지 확인하고, 없으면 생성합니다."""
+        """테이블이 존재하면 열고, 없으면 첫 삽입 시 생성되도록 비워 둡니다.
+
+        읽기 전용 경로에서도 호출되므로 테이블에 기록하지 않습니다
+        (이전 버전 테이블의 스키마 변경은 migrate_schema()에서 수행).
+        """
+        self._opened_table_name = self.table_name
+        try:
+            self._files_table = self.db.open_table(self.files_table_name)
+        except Exception:
+            # 파일 벡터 테이블은 첫 삽입 또는 ensure_file_vectors() 시 생성됨
+            self._files_table = None
+
         try:
-            self._table = self.db.open_table(self.TABLE_NAME)
+            self._table = self.db.open_table(self.table_name)
         except Exception:
             # 테이블이 존재하지 않으면 첫 삽입 시 생성됨
             self._table = None
 
+        self._update_filter_columns()
+
+    def migrate_schema(self):
+        """이전 버전에서 생성된 테이블에 새 컬럼을 추가합니다 (기존 행은 기본값 또는 원본 값).
+
+        테이블에 새 버전을 기록하므로 인덱서 잠금을 보유한 상태에서 호출해야 합니다.
+        """
+        self._add_missing_columns(self._table, self.ADDED_COLUMNS)
+        self._add_missing_columns(self._files_table, {
+            copy_column: f"`{column}`" for column, copy_column in self.FILTER_COLUMNS.items()
+        })
+        self._update_filter_columns()
+
+    def _update_filter_columns(self):
+        """열린 테이블에 필터 컬럼의 소문자 복사본이 모두 있는지 확인합니다."""
+        self._filter_columns_ready = all(
+            copy_column in table.schema.names
+            for table in (self._table, self._files_table) if table is not None
+            for copy_column in self.FILTER_COLUMNS.values()
+        )
+
+    @staticmethod
+    def _add_missing_columns(table: Optional[Table], columns: Dict[str, str]):
+        """테이블에 없는 컬럼을 SQL 식으로 채워 추가합니다.
+
+        Args:
+            table: 대상 테이블 (없으면 무시)
+            columns: 컬럼 이름 -> 기본값 SQL 식
+        """
+        if table is None:
+            return
+        missing_columns = {
+            column: expression
+            for column, expression in columns.items()
+            if column not in table.schema.names
+        }
+        if missing_columns:
+            table.add_columns(missing_columns)
+
+    def _column(self, column: str) -> str:
+        """필터 식에 사용할 컬럼 이름을 반환합니다.
+
+        스칼라 인덱스를 쓸 수 있도록 소문자 복사본 컬럼을 사용하며,
+        아직 복사본이 추가되지 않은 이전 테이블에서는 원본 컬럼을 사용합니다.
+
+        Args:
+            column: 원본 컬럼 이름 (예: "filePath")
+
+        Returns:
+            필터에 사용할 컬럼 이름
+        """
+        if self._filter_columns_ready:
+            return self.FILTER_COLUMNS.get(column, column)
+        return column
+
+    def refresh(self):
+        """캐시된 테이블 핸들이 최신 활성 테이블을 가리키도록 합니다.
+
+        상태 파일은 수정 시각이 바뀐 경우에만 다시 읽으며, 상태가 바뀌었거나 활성 테이블이
+        마지막으로 연 테이블과 다른 경우에만 테이블을 다시 엽니다. 테이블이 없으면 없다는 것을
+        기억하므로, 다른 프로세스가 테이블을 만들어 상태를 기록하기 전까지 다시 열지 않습니다.
+        같은 테이블의 새 버전은 연결의 read_consistency_interval 주기로 반영됩니다.
+        """
+        state_changed = self.state.refresh()
+        if state_changed or self._opened_table_name != self.table_name:
+            self._ensure_table()
+
     @staticmethod
     def compute_project_id(project_path: str) -> str:
         """고유 식별을 위해 프로젝트 경로의 MD5 해시를 계산합니다.
@@ -45,9 +205,70 @@ class DatabaseService:
         """
         return hashlib.md5(project_path.encode()).hexdigest()
 
+    @staticmethod
+    def compute_content_hash(content: str) -> str:
+        """벡터 재사용 판단을 위해 청크 내용의 MD5 해시를 계산합니다.
+
+        Args:
+            content: 청크 내용
+
+        Returns:
+            MD5 해시 문자열
+        """
+        return hashlib.md5(content.encode("utf-8", errors="surrogateescape")).hexdigest()
+
+    @staticmethod
+    def _sql_string(value: str) -> str:
+        """필터 식에 사용할 SQL 문자열 리터럴을 만듭니다.
+
+        Args:
+            value: 문자열 값
+
+        Returns:
+            작은따옴표로 감싸고 이스케이프한 리터럴
+        """
+        return "'" + value.replace("'", "''") + "'"
+
+    @classmethod
+    def _in_filter(cls, column: str, values: List[str]) -> str:
+        """`column IN (...)` 형태의 필터 식을 만듭니다.
+
+        Args:
+            column: 컬럼 이름
+            values: 문자열 값 리스트
+
+        Returns:
+            필터 식 문자열
+        """
+        literals = ", ".join(cls._sql_string(value) for value in values)
+        return f"`{column}` IN ({literals})"
+
+    def _scan_columns(self, columns: List[str], where: Optional[str] = None) -> pa.Table:
+        """지정한 컬럼만 읽어 Arrow 테이블로 반환합니다 (벡터 등 큰 컬럼은 읽지 않음).
+
+        Args:
+            columns: 읽을 컬럼 리스트
+            where: 필터 식 (선택 사항)
+
+        Returns:
+            Arrow 테이블
+        """
+        query = self._table.search().select(columns)
+        if where:
+            query = query.where(where)
+        return query.limit(None).to_arrow()
+
     async def upsert_chunks(self, chunks_data: List[Dict[str, Any]]):
         """데이터베이스에 코드 청크를 삽입하거나 업데이트합니다.
 
+        Args:
+            chunks_data: 모든 필수 필드를 포함하는 청크 딕셔너리 리스트
+        """
+        self._add_chunks(chunks_data)
+
+    def _add_chunks(self, chunks_data: List[Dict[str, Any]]):
+        """청크를 테이블에 추가하고, 테이블이 없으면 첫 배치로 만듭니다.
+
         Args:
             chunks_data: 모든 필수 필드를 포함하는 청크 딕셔너리 리스트
         """
@@ -57,24 +278,205 @@ class DatabaseService:
         if self._table is None:
             # 첫 번째 데이터 배치로 테이블 생성
             self._table = self.db.create_table(
-                self.TABLE_NAME,
+                self.table_name,
                 data=chunks_data,
                 mode="overwrite"
             )
+            self._record_table_meta()
         else:
             # 기존 테이블에 추가
             self._table.add(chunks_data)
 
+    async def replace_file_chunks(self, file_paths: List[str], chunks_data: List[Dict[str, Any]]):
+        """파일들의 기존 청크를 새 청크로 단일 커밋에서 교체합니다.
+
+        삭제와 삽입이 하나의 버전으로 기록되므로 중간에 중단되어도
+        파일이 일부만 기록된 상태로 남지 않습니다.
+
+        Args:
+            file_paths: 교체할 파일의 절대 경로 리스트
+            chunks_data: 새 청크 딕셔너리 리스트 (청크가 없는 파일은 기존 청크만 제거됨)
+        """
+        # 쓰기와 파일 벡터 계산이 이벤트 루프를 막지 않도록 별도 스레드에서 실행
+        await asyncio.to_thread(self._replace_file_chunks, file_paths, chunks_data)
+
+    def _replace_file_chunks(self, file_paths: List[str], chunks_data: List[Dict[str, Any]]):
+        """replace_file_chunks()의 동기 구현입니다.
+
+        Args:
+            file_paths: 교체할 파일의 절대 경로 리스트
+            chunks_data: 새 청크 딕셔너리 리스트
+        """
+        if not file_paths:
+            return
+
+        if self._table is None:
+            self._add_chunks(chunks_data)
+        elif not chunks_data:
+            self._delete_file_paths(file_paths)
+            return
+        else:
+            (
+                self._table
+                .merge_insert("id")
+                .when_not_matched_insert_all()
+                .when_not_matched_by_source_delete(
+                    self._in_filter(self._column("filePath"), file_paths)
+                )
+                .execute(chunks_data)
+            )
+
+        # 파일 단위 벡터 갱신 (청크가 없어진 파일은 제거)
+        file_vectors = self._compute_file_vectors(
+            [chunk_data["filePath"] for chunk_data in chunks_data],
+            np.asarray([chunk_data["vector"] for chunk_data in chunks_data], dtype=np.float32),
+            {chunk_data["filePath"]: chunk_data for chunk_data in chunks_data}
+        )
+        self._upsert_file_vectors(file_vectors)
+        emptied = sorted(set(file_paths) - {chunk_data["filePath"] for chunk_data in chunks_data})
+        if emptied and self._files_table is not None:
+            self._files_table.delete(self._in_filter(self._column("filePath"), emptied))
+
+    @staticmethod
+    def _compute_file_vectors(
+        file_paths: List[str],
+        vectors: np.ndarray,
+        metadata: Dict[str, Dict[str, Any]]
+    ) -> Optional[pa.Table]:
+        """청크 벡터를 파일별로 평균 내어 정규화한 파일 단위 벡터를 계산합니다.
+
+        Args:
+            file_paths: 각 청크의 파일 경로 (vectors와 같은 순서)
+            vectors: 청크 벡터 행렬 (청크 수 x 차원)
+            metadata: 파일 경로 -> 프로젝트/언어/수정 시간을 담은 행
+
+        Returns:
+            파일 벡터 Arrow 테이블 또는 청크가 없으면 None
+        """
+        if not file_paths:
+            return None
+
+        # 파일별로 정렬한 뒤 구간 합으로 평균 계산
+        unique_paths, inverse, counts = np.unique(
+            np.asarray(file_paths), return_inverse=True, return_counts=True
+        )
+        order = np.argsort(inverse, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        centroids = np.add.reduceat(vectors[order], starts, axis=0) / counts[:, None]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids = centroids / np.where(norms > 0, norms, 1.0)
+
+        rows = [metadata[path] for path in unique_paths.tolist()]
+        project_ids = [row["projectId"] for row in rows]
+        last_modified = [row["lastModified"] for row in rows]
+        return pa.table({
+            "filePath": unique_paths.tolist(),
+            "projectId": project_ids,
+            "projectPath": [row["projectPath"] for row in rows],
+            "language": [row["language"] for row in rows],
+            "lastModified": last_modified,
+            "file_path": unique_paths.tolist(),
+            "project_id": project_ids,
+            "last_modified": last_modified,
+            "chunkCount": counts.tolist(),
+            "vector": pa.FixedSizeListArray.from_arrays(
+                pa.array(centroids.astype(np.float32).ravel()), centroids.shape[1]
+            )
+        })
+
+    def _upsert_file_vectors(self, file_vectors: Optional[pa.Table]):
+        """파일 단위 벡터를 삽입하거나 갱신합니다.
+
+        Args:
+            file_vectors: _compute_file_vectors()가 반환한 Arrow 테이블
+        """
+        if file_vectors is None or file_vectors.num_rows == 0:
+            return
+
+        if self._files_table is None:
+            self._files_table = self.db.create_table(
+                self.files_table_name,
+                data=file_vectors,
+                mode="overwrite"
+            )
+            return
+
+        (
+            self._files_table
+            .merge_insert("`filePath`")
+            .when_matched_update_all()
+            .when_not_matched_insert_all()
+            .execute(file_vectors)
+        )
+
+    async def ensure_file_vectors(self):
+        """파일 단위 벡터 테이블이 없으면 청크 테이블에서 만듭니다."""
+        if self._table is None or self._files_table is not None:
+            return
+
+        columns = ["filePath", "projectId", "projectPath", "language", "lastModified", "vector"]
+        for project_id in await self.get_project_ids():
+            file_paths = sorted(await self.get_indexed_files(project_id))
+            for i in range(0, len(file_paths), self.FILTER_BATCH_SIZE):
+                batch = file_paths[i:i + self.FILTER_BATCH_SIZE]
+                data = self._scan_columns(columns, self._in_filter(self._column("filePath"), batch))
+                dimensions = data.schema.field("vector").type.list_size
+                vectors = (
+                    data.column("vector").combine_chunks().flatten()
+                    .to_numpy(zero_copy_only=False).reshape(-1, dimensions)
+                )
+                paths = data.column("filePath").to_pylist()
+                metadata = {
+                    row["filePath"]: row
+                    for row in data.select(columns[:-1]).to_pylist()
+                }
+                self._upsert_file_vectors(
+                    self._compute_file_vectors(paths, vectors, metadata)
+                )
+
+    async def delete_by_file_paths(self, file_paths: List[str]):
+        """여러 파일과 연관된 모든 청크를 단일 커밋으로 삭제합니다.
+
+        Args:
+            file_paths: 파일의 절대 경로 리스트
+        """
+        self._delete_file_paths(file_paths)
+
+    def _delete_file_paths(self, file_paths: List[str]):
+        """delete_by_file_paths()의 동기 구현입니다.
+
+        Args:
+            file_paths: 파일의 절대 경로 리스트
+        """
+        if self._table is None or not file_paths:
+            return
+
+        file_filter = self._in_filter(self._column("filePath"), file_paths)
+        self._table.delete(file_filter)
+        if self._files_table is not None:
+            self._files_table.delete(file_filter)
+
     async def delete_by_file_path(self, file_path: str):
         """특정 파일과 연관된 모든 청크를 삭제합니다.
 
         Args:
             file_path: 파일의 절대 경로
         """
+        await self.delete_by_file_paths([file_path])
+
+    async def delete_by_project_id(self, project_id: str):
+        """특정 프로젝트에 속한 모든 청크를 삭제합니다.
+
+        Args:
+            project_id: 프로젝트 경로의 MD5 해시
+        """
         if self._table is None:
             return
 
-        self._table.delete(f'filePath = "{file_path}"')
+        project_filter = f"`{self._column('projectId')}` = {self._sql_string(project_id)}"
+        self._table.delete(project_filter)
+        if self._files_table is not None:
+            self._files_table.delete(project_filter)
 
     async def get_file_metadata(self, file_path: str) -> Optional[Dict[str, Any]]:
         """특정 파일의 메타데이터를 가져옵니다.
@@ -91,7 +493,7 @@ class DatabaseService:
         results = (
             self._table
             .search()
-            .where(f'filePath = "{file_path}"')
+            .where(f"`{self._column('filePath')}` = {self._sql_string(file_path)}")
             .limit(1)
             .to_list()
         )
@@ -100,18 +502,265 @@ class DatabaseService:
             return results[0]
         return None
 
+    @classmethod
+    def _like_prefix(cls, prefix: str, match_anywhere: bool = False) -> str:
+        """LIKE 와일드카드를 이스케이프한 접두사 패턴 리터럴을 만듭니다.
+
+        Args:
+            prefix: 접두사 문자열
+            match_anywhere: True이면 문자열 중간에서 시작하는 일치도 허용
+
+        Returns:
+            `'prefix%'` (또는 `'%prefix%'`) 형태의 SQL 리터럴
+        """
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return cls._sql_string(("%" if match_anywhere else "") + escaped + "%")
+
+    def build_filter(
+        self,
+        project_filter: Optional[str] = None,
+        language: Optional[str] = None,
+        path_prefix: Optional[str] = None,
+        modified_since: Optional[float] = None
+    ) -> Optional[str]:
+        """검색 조건을 LanceDB 필터 식으로 변환합니다.
+
+        Args:
+            project_filter: 프로젝트 경로 (선택 사항)
+            language: 언어 식별자 (선택 사항)
+            path_prefix: 파일 경로 접두사. 절대 경로가 아니면 경로 중간의 일치도 허용 (선택 사항)
+            modified_since: 이 시각(Unix 타임스탬프) 이후 수정된 파일만 포함 (선택 사항)
+
+        Returns:
+            필터 식 또는 조건이 없으면 None
+        """
+        conditions = []
+
+        if project_filter:
+            project_id = self.compute_project_id(project_filter)
+            conditions.append(f"`{self._column('projectId')}` = {self._sql_string(project_id)}")
+
+        if language:
+            conditions.append(f"`language` = {self._sql_string(language.lower())}")
+
+        if path_prefix:
+            file_column = self._column("filePath")
+            if Path(path_prefix).is_absolute():
+                conditions.append(f"`{file_column}` LIKE {self._like_prefix(path_prefix)}")
+            else:
+                pattern = self._like_prefix("/" + path_prefix, match_anywhere=True)
+                conditions.append(f"`{file_column}` LIKE {pattern}")
+
+        if modified_since is not None:
+            conditions.append(f"`{self._column('lastModified')}` >= {float(modified_since)}")
+
+        if not conditions:
+            return None
+        return " AND ".join(conditions)
+
+    async def ensure_scalar_indexes(self) -> List[str]:
+        """필터에 사용되는 컬럼의 스칼라 인덱스가 없으면 생성합니다.
+
+        Returns:
+            만들지 못한 인덱스의 오류 메시지 리스트 (인덱스가 없어도 필터는 스캔으로 동작)
+        """
+        errors = []
+        for table in (self._table, self._files_table):
+            if table is None:
+                continue
+
+            indexed_columns = self._indexed_columns(table)
+            for column, index_type in self.SCALAR_INDEXES.items():
+                if column in table.schema.names and column not in indexed_columns:
+                    try:
+                        table.create_scalar_index(column, index_type=index_type)
+                    except RuntimeError as e:
+                        errors.append(
+                            f"Error creating {index_type} index on {table.name}.{column}: {str(e)}"
+                        )
+        return errors
+
+    @staticmethod
+    def _indexed_columns(table: Table) -> Set[str]:
+        """테이블에서 인덱스가 있는 컬럼 이름을 반환합니다.
+
+        Args:
+            table: LanceDB 테이블
+
+        Returns:
+            인덱스가 있는 컬럼 이름 집합
+        """
+        return {
+            column
+            for index in table.list_indices()
+            for column in index.columns
+        }
+
+    def _candidate_files(self, query_vector: Any, where: Optional[str]) -> Optional[List[str]]:
+        """파일 단위 벡터로 쿼리와 가까운 후보 파일을 고릅니다.
+
+        Args:
+            query_vector: 검색할 임베딩 벡터
+            where: 필터 식 (파일 벡터 테이블에도 같은 메타데이터 컬럼이 있음)
+
+        Returns:
+            후보 파일 경로 리스트 또는 파일 벡터 테이블이 없으면 None
+        """
+        if self._files_table is None:
+            return None
+
+        search = (
+            self._files_table
+            .search(query_vector)
+            .select(["filePath"])
+            .limit(self.config.two_stage_file_candidates)
+        )
+        if where:
+            search = search.where(where, prefilter=True)
+        return [row["filePath"] for row in search.to_list()]
+
+    def _search_rows(
+        self,
+        query_vector: Any,
+        limit: int,
+        where: Optional[str],
+        search_mode: str,
+        mmr_lambda: float = 1.0,
+        max_per_file: int = 0
+    ) -> List[Dict[str, Any]]:
+        """검색 모드에 따라 벡터 검색을 실행하고 결과 행을 반환합니다.
+
+        Args:
+            query_vector: 검색할 임베딩 벡터
+            limit: 반환할 최대 결과 수
+            where: 필터 식 (선택 사항)
+            search_mode: "flat" (모든 청크 대상) 또는 "two_stage" (후보 파일의 청크만 대상)
+            mmr_lambda: 재순위화 관련성 가중치 (기본값: 1, 재순위화 안 함)
+            max_per_file: 파일별 최대 결과 수 (기본값: 0, 제한 없음)
+
+        Returns:
+            LanceDB 검색 결과 행 리스트
+
+        Raises:
+            ValueError: 알 수 없는 검색 모드인 경우
+        """
+        if search_mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search_mode}")
+
+        if search_mode == "two_stage":
+            # 1단계: 파일 단위 벡터로 후보 파일 선택 (파일 벡터가 없으면 전체 검색)
+            candidate_files = self._candidate_files(query_vector, where)
+            if candidate_files is not None:
+                if not candidate_files:
+                    return []
+                file_filter = self._in_filter(self._column("filePath"), candidate_files)
+                where = f"({where}) AND {file_filter}" if where else file_filter
+
+        # 2단계 (또는 전체 검색): 청크 단위 벡터 검색
+        search = self._table.search(query_vector)
+        if where:
+            search = search.where(where, prefilter=True)
+        return self._limit_rows(search, query_vector, limit, mmr_lambda, max_per_file)
+
+    def _limit_rows(
+        self,
+        search: Any,
+        query_vector: Any,
+        limit: int,
+        mmr_lambda: float,
+        max_per_file: int
+    ) -> List[Dict[str, Any]]:
+        """벡터 검색 쿼리를 실행하여 limit개의 결과 행을 반환합니다.
+
+        MMR이나 파일별 상한을 적용하는 경우 `limit * mmr_fetch_factor`개의 후보를 벡터와 함께
+        가져온 뒤, 후보 벡터 행렬로 관련성과 다양성을 함께 고려하여 limit개를 다시 고릅니다.
+
+        Args:
+            search: 필터까지 적용된 LanceDB 검색 쿼리
+            query_vector: 검색할 임베딩 벡터
+            limit: 반환할 최대 결과 수
+            mmr_lambda: 재순위화 관련성 가중치 (1이면 관련성 순서 그대로)
+            max_per_file: 파일별 최대 결과 수 (0이면 제한 없음)
+
+        Returns:
+            결과 행 리스트 (재순위화한 경우 선택 순서)
+        """
+        if not reranking.needs_rerank(limit, mmr_lambda, max_per_file):
+            return search.select(self.RESULT_COLUMNS).limit(limit).to_list()
+
+        candidates = (
+            search
+            .select([*self.RESULT_COLUMNS, "vector"])
+            .limit(reranking.candidate_limit(limit, self.config.mmr_fetch_factor))
+            .to_arrow()
+        )
+        if candidates.num_rows <= 1:
+            return candidates.drop_columns(["vector"]).to_pylist()
+
+        order = reranking.mmr_rerank(
+            query_vector,
+            reranking.vector_matrix(candidates.column("vector")),
+            candidates.column("filePath").to_pylist(),
+            limit,
+            mmr_lambda,
+            max_per_file
+        )
+        return candidates.drop_columns(["vector"]).take(order).to_pylist()
+
+    @staticmethod
+    def _hydrate_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """본문 없이 참조로 저장된 결과 행의 내용을 원본 파일에서 채웁니다.
+
+        원본이 인덱싱 이후 바뀌었거나 삭제된 경우 현재 파일의 같은 줄 범위(없으면 빈 내용)를
+        채우고 `stale`로 표시합니다.
+
+        Args:
+            rows: 검색 결과 행 리스트
+
+        Returns:
+            내용이 채워진 행 리스트 (같은 객체)
+        """
+        pending = [row for row in rows if not row.get("content") and row.get("endOffset")]
+        texts = read_chunks([
+            (row["filePath"], row["startOffset"], row["endOffset"], row["contentHash"])
+            for row in pending
+        ])
+        for row, text in zip(pending, texts):
+            if text is None:
+                text = read_lines(row["filePath"], row["startLine"], row["endLine"])
+                row["stale"] = True
+            row["content"] = text or ""
+        return rows
+
     async def search_similar(
         self,
         query_vector: List[float],
         limit: int = 5,
-        project_filter: Optional[str] = None
+        project_filter: Optional[str] = None,
+        language: Optional[str] = None,
+        path_prefix: Optional[str] = None,
+        modified_since: Optional[float] = None,
+        search_mode: Optional[str] = None,
+        mmr_lambda: Optional[float] = None,
+        max_per_file: Optional[int] = None
     ) -> List[SearchResult]:
         """벡터 유사도를 사용하여 유사한 코드 청크를 검색합니다.
 
+        필터는 벡터 검색 전에 스칼라 인덱스로 적용(prefilter)되므로,
+        범위가 좁은 필터에서도 `limit`개의 결과를 채우며 더 빠르게 동작합니다.
+        후보를 더 가져와 MMR과 파일별 상한으로 재순위화하므로 같은 파일의 겹치는 청크 대신
+        서로 다른 관련 결과가 반환됩니다.
+
         Args:
             query_vector: 검색할 임베딩 벡터
             limit: 반환할 최대 결과 수
             project_filter: 결과를 필터링할 프로젝트 경로 (선택 사항)
+            language: 결과를 필터링할 언어 식별자 (선택 사항)
+            path_prefix: 결과를 필터링할 파일 경로 접두사 (선택 사항)
+            modified_since: 이 시각(Unix 타임스탬프) 이후 수정된 파일만 포함 (선택 사항)
+            search_mode: "flat" 또는 "two_stage" (기본값: 구성된 검색 모드)
+            mmr_lambda: 재순위화 관련성 가중치 (기본값: 구성된 mmr_lambda)
+            max_per_file: 파일별 최대 결과 수 (기본값: 구성된 max_chunks_per_file)
 
         Returns:
             SearchResult 객체 리스트
@@ -119,29 +768,212 @@ class DatabaseService:
         if self._table is None:
             return []
 
-        # 검색 쿼리 구성
-        search = self._table.search(query_vector).limit(limit)
+        where = self.build_filter(project_filter, language, path_prefix, modified_since)
+        mmr_lambda, max_per_file = reranking.resolve_settings(
+            mmr_lambda, max_per_file, self.config.mmr_lambda, self.config.max_chunks_per_file
+        )
+        results = self._search_rows(
+            query_vector, limit, where, search_mode or self.config.search_mode,
+            mmr_lambda, max_per_file
+        )
+
+        # 최종 결과에만 본문을 채운 뒤 SearchResult 객체로 변환
+        return [self._to_search_result(result) for result in self._hydrate_rows(results)]
 
-        # 프로젝트 필터가 지정된 경우 적용
-        if project_filter:
-            project_id = self.compute_project_id(project_filter)
-            search = search.where(f'projectId = "{project_id}"')
-
-        # 검색 실행
-        results = search.to_list()
-
-        # SearchResult 객체로 변환
-        search_results = []
-        for result in results:
-            search_results.append(SearchResult(
-                content=result.get("content", ""),
-                filePath=result.get("filePath", ""),
-                projectPath=result.get("projectPath", ""),
-                language=result.get("language", ""),
-                score=result.get("_distance", 0.0)  # LanceDB returns _distance
-            ))
+    async def compare_search_modes(self, sample_size: int = 50, limit: int = 10) -> Dict[str, Any]:
+        """저장된 청크 벡터를 쿼리로 사용하여 2단계 검색을 전체 검색과 비교합니다.
+
+        2단계 검색이 전체 검색의 상위 결과를 얼마나 찾는지(재현율)와 모드별 지연 시간을 측정합니다.
+
+        Args:
+            sample_size: 무작위로 뽑을 쿼리 청크 수
+            limit: 비교할 상위 결과 수 (recall@limit)
+
+        Returns:
+            재현율과 모드별 평균 지연 시간을 담은 딕셔너리 (테이블이 없으면 빈 딕셔너리)
+        """
+        if self._table is None:
+            return {}
+
+        total_chunks = self._table.count_rows()
+        offsets = random.sample(range(total_chunks), min(sample_size, total_chunks))
+
+        recalls = []
+        timings: Dict[str, float] = {mode: 0.0 for mode in self.SEARCH_MODES}
+        for offset in offsets:
+            query_vector = (
+                self._table.search().select(["vector"]).offset(offset).limit(1).to_list()
+            )[0]["vector"]
+
+            result_ids: Dict[str, Set[str]] = {}
+            for mode in self.SEARCH_MODES:
+                started = time.perf_counter()
+                rows = self._search_rows(query_vector, limit, None, mode)
+                timings[mode] += time.perf_counter() - started
+                result_ids[mode] = {row["id"] for row in rows}
+
+            if result_ids["flat"]:
+                recalls.append(
+                    len(result_ids["flat"] & result_ids["two_stage"]) / len(result_ids["flat"])
+                )
+
+        num_queries = max(len(offsets), 1)
+        return {
+            "sample_size": len(offsets),
+            "limit": limit,
+            "candidate_files": self.config.two_stage_file_candidates,
+            "total_chunks": total_chunks,
+            "total_files": self._files_table.count_rows() if self._files_table else 0,
+            # 2단계의 파일 필터가 스칼라 인덱스를 사용하는지 (아니면 전체 청크를 스캔하여 필터링)
+            "file_filter_indexed": self._column("filePath") in self._indexed_columns(self._table),
+            "recall": round(sum(recalls) / len(recalls), 4) if recalls else None,
+            "flat_ms": round(timings["flat"] / num_queries * 1000, 2),
+            "two_stage_ms": round(timings["two_stage"] / num_queries * 1000, 2)
+        }
+
+    async def get_chunk_vectors(
+        self,
+        file_path: Optional[str] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        chunk_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """저장된 청크 벡터를 가져옵니다.
+
+        Args:
+            file_path: 파일 절대 경로 (chunk_id가 없을 때 사용)
+            start_line: 줄 범위 시작 (선택 사항)
+            end_line: 줄 범위 끝 (선택 사항)
+            chunk_id: 청크 식별자 (선택 사항)
+
+        Returns:
+            `id`, `filePath`, `vector`를 포함하는 청크 딕셔너리 리스트
+        """
+        if self._table is None:
+            return []
+
+        if chunk_id:
+            where = f"`id` = {self._sql_string(chunk_id)}"
+        elif file_path:
+            where = f"`{self._column('filePath')}` = {self._sql_string(file_path)}"
+        else:
+            return []
+
+        rows = self._scan_columns(
+            ["id", "filePath", "vector", "startLine", "endLine"], where
+        ).to_pylist()
+
+        if chunk_id or (start_line is None and end_line is None):
+            return rows
+
+        # 줄 범위와 겹치는 청크만 선택 (줄 정보가 없는 이전 데이터는 파일 전체 사용)
+        range_start = start_line if start_line is not None else 1
+        range_end = end_line if end_line is not None else float("inf")
+        overlapping = [
+            row for row in rows
+            if row["startLine"] <= range_end and row["endLine"] >= range_start
+        ]
+        return overlapping or [row for row in rows if not row["endLine"]]
+
+    async def find_similar(
+        self,
+        file_path: Optional[str] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        chunk_id: Optional[str] = None,
+        limit: int = 5,
+        project_filter: Optional[str] = None,
+        language: Optional[str] = None,
+        mmr_lambda: Optional[float] = None,
+        max_per_file: Optional[int] = None
+    ) -> List[SearchResult]:
+        """저장된 벡터를 쿼리로 사용하여 유사한 코드를 검색합니다 (임베딩 API 호출 없음).
 
-        return search_results
+        선택한 청크 벡터의 평균을 쿼리로 사용하며, 원본 파일은 결과에서 제외합니다.
+        search_similar와 같이 MMR과 파일별 상한으로 재순위화합니다.
+
+        Args:
+            file_path: 원본 파일 절대 경로 (chunk_id가 없을 때 사용)
+            start_line: 원본 줄 범위 시작 (선택 사항)
+            end_line: 원본 줄 범위 끝 (선택 사항)
+            chunk_id: 원본 청크 식별자 (선택 사항)
+            limit: 반환할 최대 결과 수
+            project_filter: 결과를 필터링할 프로젝트 경로 (선택 사항)
+            language: 결과를 필터링할 언어 식별자 (선택 사항)
+            mmr_lambda: 재순위화 관련성 가중치 (기본값: 구성된 mmr_lambda)
+            max_per_file: 파일별 최대 결과 수 (기본값: 구성된 max_chunks_per_file)
+
+        Returns:
+            SearchResult 객체 리스트
+
+        Raises:
+            ValueError: 원본 청크를 인덱스에서 찾을 수 없는 경우
+        """
+        source_chunks = await self.get_chunk_vectors(file_path, start_line, end_line, chunk_id)
+        if not source_chunks:
+            raise ValueError("Source code is not indexed")
+
+        # 청크 벡터 평균을 정규화하여 쿼리 벡터로 사용
+        vectors = np.asarray([chunk["vector"] for chunk in source_chunks], dtype=np.float32)
+        query_vector = vectors.mean(axis=0)
+        norm = np.linalg.norm(query_vector)
+        if norm > 0:
+            query_vector /= norm
+
+        # 원본 파일 제외
+        source_path = source_chunks[0]["filePath"]
+        conditions = [f"`{self._column('filePath')}` != {self._sql_string(source_path)}"]
+        where = self.build_filter(project_filter, language)
+        if where:
+            conditions.append(where)
+
+        mmr_lambda, max_per_file = reranking.resolve_settings(
+            mmr_lambda, max_per_file, self.config.mmr_lambda, self.config.max_chunks_per_file
+        )
+        search = self._table.search(query_vector).where(" AND ".join(conditions), prefilter=True)
+        results = self._limit_rows(search, query_vector, limit, mmr_lambda, max_per_file)
+        return [self._to_search_result(result) for result in self._hydrate_rows(results)]
+
+    async def get_chunk(self, chunk_id: str) -> Optional[SearchResult]:
+        """청크 식별자로 저장된 청크의 전체 내용을 가져옵니다.
+
+        Args:
+            chunk_id: 청크 식별자
+
+        Returns:
+            SearchResult 객체 (점수 0) 또는 찾을 수 없으면 None
+        """
+        if self._table is None:
+            return None
+
+        rows = self._scan_columns(
+            self.RESULT_COLUMNS, f"`id` = {self._sql_string(chunk_id)}"
+        ).to_pylist()
+        if not rows:
+            return None
+        return self._to_search_result(self._hydrate_rows(rows[:1])[0])
+
+    @staticmethod
+    def _to_search_result(result: Dict[str, Any]) -> SearchResult:
+        """검색 결과 행을 SearchResult 객체로 변환합니다.
+
+        Args:
+            result: LanceDB 검색 결과 행
+
+        Returns:
+            SearchResult 객체
+        """
+        return SearchResult(
+            content=result.get("content", ""),
+            filePath=result.get("filePath", ""),
+            projectPath=result.get("projectPath", ""),
+            language=result.get("language", ""),
+            score=result.get("_distance", 0.0),  # LanceDB returns _distance
+            id=result.get("id", ""),
+            startLine=result.get("startLine") or 0,
+            endLine=result.get("endLine") or 0,
+            stale=result.get("stale", False)
+        )
 
     async def get_all_indexed_files(self) -> List[Dict[str, Any]]:
         """인덱싱된 모든 파일의 메타데이터를 가져옵니다.
@@ -152,22 +984,73 @@ class DatabaseService:
         if self._table is None:
             return []
 
-        # 최신 수정 시간과 함께 모든 고유 파일 경로 가져오기
-        results = self._table.to_pandas()
+        # 벡터와 본문을 제외한 메타데이터 컬럼만 읽기
+        results = self._scan_columns(["filePath", "projectPath", "projectId", "lastModified"])
 
-        if results.empty:
-            return []
+        # filePath별로 첫 번째 항목만 유지 (모두 동일한 메타데이터를 가져야 함)
+        file_metadata: Dict[str, Dict[str, Any]] = {}
+        for row in results.to_pylist():
+            file_metadata.setdefault(row["filePath"], row)
+
+        return list(file_metadata.values())
+
+    async def get_indexed_files(self, project_id: str) -> Dict[str, float]:
+        """프로젝트에 인덱싱된 파일과 수정 시간을 가져옵니다.
+
+        Args:
+            project_id: 프로젝트 경로의 MD5 해시
 
-        # filePath별로 그룹화하고 첫 번째 항목 가져오기 (모두 동일한 메타데이터를 가져야 함)
-        file_metadata = (
-            results.groupby("filePath")
-            .first()
-            .reset_index()
-            [["filePath", "projectPath", "projectId", "lastModified"]]
-            .to_dict("records")
+        Returns:
+            파일 경로 -> lastModified 딕셔너리
+        """
+        if self._table is None:
+            return {}
+
+        results = self._scan_columns(
+            ["filePath", "lastModified"],
+            f"`{self._column('projectId')}` = {self._sql_string(project_id)}"
         )
+        return dict(zip(
+            results.column("filePath").to_pylist(),
+            results.column("lastModified").to_pylist()
+        ))
+
+    async def get_file_mtimes(self, file_paths: List[str]) -> Dict[str, float]:
+        """지정한 파일 중 인덱싱된 파일의 수정 시간을 가져옵니다.
+
+        Args:
+            file_paths: 파일 절대 경로 리스트
+
+        Returns:
+            인덱싱된 파일 경로 -> lastModified 딕셔너리
+        """
+        if self._table is None or not file_paths:
+            return {}
+
+        mtimes: Dict[str, float] = {}
+        for i in range(0, len(file_paths), self.FILTER_BATCH_SIZE):
+            batch = file_paths[i:i + self.FILTER_BATCH_SIZE]
+            results = self._scan_columns(
+                ["filePath", "lastModified"],
+                self._in_filter(self._column("filePath"), batch)
+            )
+            mtimes.update(zip(
+                results.column("filePath").to_pylist(),
+                results.column("lastModified").to_pylist()
+            ))
+        return mtimes
+
+    async def get_project_ids(self) -> List[str]:
+        """인덱스에 존재하는 모든 프로젝트 ID를 가져옵니다.
+
+        Returns:
+            프로젝트 ID 리스트
+        """
+        if self._table is None:
+            return []
 
-        return file_metadata
+        results = self._scan_columns(["projectId"])
+        return pc.unique(results.column("projectId")).to_pylist()
 
     async def count_chunks(self) -> int:
         """데이터베이스의 전체 청크 수를 계산합니다.
@@ -180,6 +1063,291 @@ class DatabaseService:
 
         return self._table.count_rows()
 
+    def _table_disk_bytes(self) -> int:
+        """테이블 디렉토리가 디스크에서 차지하는 전체 크기(이전 버전 포함)를 계산합니다.
+
+        Returns:
+            바이트 단위 크기
+        """
+        table_dir = Path(self.db_path) / f"{self.table_name}.lance"
+        return sum(path.stat().st_size for path in table_dir.rglob("*") if path.is_file())
+
+    async def get_table_stats(self) -> Dict[str, Any]:
+        """테이블의 프래그먼트, 버전, 크기 통계를 가져옵니다.
+
+        Returns:
+            통계 딕셔너리 (테이블이 없으면 빈 딕셔너리)
+        """
+        if self._table is None:
+            return {}
+
+        stats = self._table.stats()
+        fragment_stats = stats["fragment_stats"]
+        return {
+            "version": self._table.version,
+            "num_versions": len(self._table.list_versions()),
+            "num_rows": stats["num_rows"],
+            "num_fragments": fragment_stats["num_fragments"],
+            "num_small_fragments": fragment_stats["num_small_fragments"],
+            "data_bytes": stats["total_bytes"],
+            "disk_bytes": self._table_disk_bytes()
+        }
+
+    async def needs_optimization(self) -> bool:
+        """구성된 임계값을 기준으로 테이블 유지 보수가 필요한지 확인합니다.
+
+        Returns:
+            마지막 최적화 이후 버전 수 또는 작은 프래그먼트 수가 임계값 이상이면 True
+        """
+        if self._table is None:
+            return False
+
+        last_optimized = self.state.data.get("maintenance", {}).get("lastOptimizedVersion", 0)
+        if self._table.version - last_optimized >= self.config.optimize_version_threshold:
+            return True
+
+        stats = self._table.stats()
+        small_fragments = stats["fragment_stats"]["num_small_fragments"]
+        return small_fragments >= self.config.optimize_fragment_threshold
+
+    async def optimize_table(self) -> Dict[str, Any]:
+        """테이블을 압축하고 보존 기간이 지난 버전을 정리하며 인덱스를 갱신합니다.
+
+        Returns:
+            최적화 전후 통계를 담은 딕셔너리
+        """
+        if self._table is None:
+            return {}
+
+        before = await self.get_table_stats()
+
+        # 작은 프래그먼트 병합, 오래된 버전 정리, 새 데이터를 인덱스에 반영
+        for table in (self._table, self._files_table):
+            if table is not None:
+                table.optimize(
+                    cleanup_older_than=timedelta(days=self.config.version_retention_days)
+                )
+
+        after = await self.get_table_stats()
+        self.state.data["maintenance"] = {
+            "lastOptimizedVersion": after["version"],
+            "lastOptimizedAt": time.time()
+        }
+        self.state.save()
+
+        return {"before": before, "after": after}
+
+    def expected_table_meta(self) -> Dict[str, Any]:
+        """현재 구성으로 만들어질 테이블의 메타데이터를 반환합니다.
+
+        Returns:
+            임베딩 모델, 청킹 파라미터, 본문 저장 여부, 스키마 버전을 담은 딕셔너리
+        """
+        return {
+            "embeddingModel": self.config.embedding_model,
+            "chunkSize": self.config.chunk_size,
+            "chunkOverlap": self.config.chunk_overlap,
+            "storeContent": self.config.store_content,
+            "schemaVersion": self.SCHEMA_VERSION
+        }
+
+    def _vector_dimensions(self) -> Optional[int]:
+        """현재 테이블의 벡터 차원 수를 반환합니다."""
+        if self._table is None:
+            return None
+        return self._table.schema.field("vector").type.list_size
+
+    def get_table_meta(self) -> Optional[Dict[str, Any]]:
+        """활성 테이블의 메타데이터를 가져옵니다.
+
+        Returns:
+            테이블 이름, 임베딩 모델, 벡터 차원, 청킹 파라미터, 스키마 버전을 담은 딕셔너리
+            또는 테이블이 없으면 None
+        """
+        meta = self.state.data.get("table")
+        if meta:
+            # 본문 저장 여부가 기록되기 전의 테이블은 본문을 저장함
+            return {"storeContent": True, **meta}
+        if self._table is None:
+            return None
+
+        # 메타데이터 기록 이전에 만들어진 테이블 - 당시에는 구성 변경을 지원하지 않았으므로
+        # 구성 기본값으로 만들어졌다고 가정 (현재 구성과 다르면 재인덱싱 대상이 됨)
+        defaults = Config.model_fields
+        return {
+            "name": self.TABLE_NAME,
+            "embeddingModel": defaults["embedding_model"].default,
+            "chunkSize": defaults["chunk_size"].default,
+            "chunkOverlap": defaults["chunk_overlap"].default,
+            "dimensions": self._vector_dimensions(),
+            "storeContent": True,
+            "schemaVersion": 1
+        }
+
+    def table_meta_mismatches(self) -> List[str]:
+        """활성 테이블과 현재 구성 사이에 호환되지 않는 항목을 찾습니다.
+
+        Returns:
+            값이 다른 메타데이터 키 리스트 (호환되거나 테이블이 없으면 빈 리스트)
+        """
+        meta = self.get_table_meta()
+        if meta is None:
+            return []
+        return [
+            key for key, value in self.expected_table_meta().items()
+            if meta.get(key) != value
+        ]
+
+    @property
+    def active_embedding_model(self) -> str:
+        """활성 테이블의 벡터를 만든 임베딩 모델 (검색 쿼리 임베딩에 사용)"""
+        meta = self.get_table_meta()
+        if meta is None:
+            return self.config.embedding_model
+        return meta["embeddingModel"]
+
+    def _record_table_meta(self):
+        """새로 만든 활성 테이블의 메타데이터를 기록합니다."""
+        if self._fixed_table_name or self.state.data.get("table"):
+            return
+        self.state.data["table"] = {
+            "name": self.table_name,
+            **self.expected_table_meta(),
+            "dimensions": self._vector_dimensions()
+        }
+        self.state.save()
+
+    def activate_table(
+        self,
+        table_name: str,
+        project_states: Dict[str, Dict[str, Any]],
+        table_meta: Optional[Dict[str, Any]] = None
+    ):
+        """섀도 테이블을 활성 테이블로 원자적으로 교체하고 이전 테이블을 제거합니다.
+
+        활성 테이블 이름은 상태 파일에 기록되며, 상태 파일은 임시 파일 작성 후
+        교체되므로 교체는 원자적으로 이루어집니다.
+
+        Args:
+            table_name: 활성화할 테이블 이름
+            project_states: 새 테이블 기준의 프로젝트별 인덱싱 상태
+            table_meta: 테이블을 만든 구성 (기본값: 현재 구성, 스냅샷 가져오기 시 스냅샷의 구성)
+        """
+        previous_name = self.table_name
+        new_table = self.db.open_table(table_name)
+
+        data = self.state.data
+        data["table"] = {
+            **(table_meta or self.expected_table_meta()),
+            "name": table_name,
+            "dimensions": new_table.schema.field("vector").type.list_size
+        }
+        data["projects"] = project_states
+        data.pop("migration", None)
+        data.pop("maintenance", None)
+        self.state.save()
+
+        self._ensure_table()
+        if previous_name != table_name:
+            self.drop_table(previous_name)
+
+    def discard_migration(self):
+        """진행 중이던 재인덱싱의 섀도 테이블과 상태를 제거합니다."""
+        migration = self.state.data.pop("migration", None)
+        if migration:
+            self.drop_table(migration["table"])
+            self.state.save()
+
+    def drop_table(self, table_name: str):
+        """청크 테이블과 그에 대응하는 파일 벡터 테이블을 제거합니다. 존재하지 않으면 무시합니다.
+
+        Args:
+            table_name: 제거할 청크 테이블 이름
+        """
+        for name in (table_name, f"{table_name}{self.FILES_TABLE_SUFFIX}"):
+            try:
+                self.db.drop_table(name)
+            except Exception:
+                pass
+
+    def scan_batches(self, batch_size: int) -> Optional[pa.RecordBatchReader]:
+        """활성 테이블의 모든 행을 레코드 배치 단위로 읽는 스트림을 엽니다.
+
+        Args:
+            batch_size: 배치당 최대 행 수
+
+        Returns:
+            레코드 배치 리더 또는 테이블이 없으면 None
+        """
+        if self._table is None:
+            return None
+        return self._table.search().limit(None).to_batches(batch_size)
+
+    def create_table_from_batches(
+        self,
+        table_name: str,
+        batches: Iterator[pa.RecordBatch],
+        schema: pa.Schema
+    ):
+        """레코드 배치 스트림으로 새 테이블을 만듭니다 (전체를 메모리에 올리지 않음).
+
+        Args:
+            table_name: 만들 테이블 이름
+            batches: 레코드 배치 이터레이터
+            schema: 배치 스키마
+        """
+        self.db.create_table(table_name, data=batches, schema=schema, mode="overwrite")
+
+    async def get_reusable_vectors(self, file_paths: List[str]) -> Dict[str, List[float]]:
+        """파일들의 기존 청크 벡터를 내용 해시 기준으로 가져옵니다.
+
+        Args:
+            file_paths: 파일 절대 경로 리스트
+
+        Returns:
+            청크 내용 MD5 해시 -> 벡터 딕셔너리
+        """
+        if self._table is None or not file_paths:
+            return {}
+
+        vectors: Dict[str, List[float]] = {}
+        for i in range(0, len(file_paths), self.FILTER_BATCH_SIZE):
+            batch = file_paths[i:i + self.FILTER_BATCH_SIZE]
+            rows = self._scan_columns(
+                ["content", "contentHash", "vector"],
+                self._in_filter(self._column("filePath"), batch)
+            ).to_pylist()
+            for row in rows:
+                # 해시 기록 이전 행은 내용으로 해시 계산
+                content_hash = row["contentHash"] or self.compute_content_hash(row["content"])
+                vectors[content_hash] = row["vector"]
+        return vectors
+
+    async def get_content_hashes(self, file_paths: List[str]) -> Set[str]:
+        """파일들의 기존 청크 내용 해시를 벡터 없이 가져옵니다.
+
+        Args:
+            file_paths: 파일 절대 경로 리스트
+
+        Returns:
+            청크 내용 MD5 해시 집합
+        """
+        if self._table is None or not file_paths:
+            return set()
+
+        hashes: Set[str] = set()
+        for i in range(0, len(file_paths), self.FILTER_BATCH_SIZE):
+            batch = file_paths[i:i + self.FILTER_BATCH_SIZE]
+            rows = self._scan_columns(
+                ["content", "contentHash"],
+                self._in_filter(self._column("filePath"), batch)
+            ).to_pylist()
+            hashes.update(
+                row["contentHash"] or self.compute_content_hash(row["content"])
+                for row in rows
+            )
+        return hashes
+
     async def close(self):
         """데이터베이스 연결을 종료합니다."""
         # LanceDB 연결은 일반적으로 자동으로 관리됨
@@ -1,10 +1,48 @@
 """코드 청크에 대한 OpenAI 임베딩 생성"""
 
-from typing import List
+from typing import List, Optional
 import httpx
 from openai import AsyncOpenAI
 from legacy_code_archive_mcp.config import Config
 
+# 토크나이저 없이 토큰 수를 추정할 때 사용하는 토큰당 평균 문자 수 (코드 기준 근사값)
+CHARS_PER_TOKEN = 4
+
+# 임베딩 모델별 100만 토큰당 가격 (USD)
+EMBEDDING_PRICES_PER_MILLION_TOKENS = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+
+def estimate_tokens(num_chars: int) -> int:
+    """문자 수로 임베딩 토큰 수를 추정합니다.
+
+    Args:
+        num_chars: 임베딩할 텍스트의 문자 수
+
+    Returns:
+        추정 토큰 수
+    """
+    return -(-num_chars // CHARS_PER_TOKEN)
+
+
+def estimate_cost(model: str, num_tokens: int) -> Optional[float]:
+    """임베딩 비용을 추정합니다.
+
+    Args:
+        model: 임베딩 모델 이름
+        num_tokens: 토큰 수
+
+    Returns:
+        추정 비용(USD) 또는 가격을 알 수 없는 모델이면 None
+    """
+    price = EMBEDDING_PRICES_PER_MILLION_TOKENS.get(model)
+    if price is None:
+        return None
+    return num_tokens * price / 1_000_000
+
 
 class EmbeddingService:
     """OpenAI API를 사용하여 임베딩을 생성하는 서비스"""
@@ -23,17 +61,19 @@ class EmbeddingService:
         self.model = config.embedding_model
         self.batch_size = config.embedding_batch_size
 
-    async def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
         """단일 텍스트에 대한 임베딩을 생성합니다.
 
         Args:
             text: 임베딩할 텍스트
+            model: 사용할 임베딩 모델 (기본값: 구성된 모델).
+                재인덱싱 중에는 활성 테이블을 만든 모델로 검색 쿼리를 임베딩해야 합니다.
 
         Returns:
             임베딩 벡터를 나타내는 float 리스트 (1536차원)
         """
         response = await self.client.embeddings.create(
-            model=self.model,
+            model=model or self.model,
             input=text
         )
         return response.data[0].embedding
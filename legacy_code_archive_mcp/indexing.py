@@ -1,20 +1,28 @@
 """코드 파일 스캔 및 처리를 위한 인덱싱 로직"""
 
+import asyncio
 import os
 import uuid
 import time
 from pathlib import Path
-from typing import List, Set, Dict, Any
+from typing import List, Set, Dict, Any, Optional, Tuple
+from legacy_code_archive_mcp import vcs
 from legacy_code_archive_mcp.config import Config
-from legacy_code_archive_mcp.models import IndexingResult
+from legacy_code_archive_mcp.models import IndexingEstimate, IndexingResult, ProjectEstimate
 from legacy_code_archive_mcp.database import DatabaseService
-from legacy_code_archive_mcp.embeddings import EmbeddingService
+from legacy_code_archive_mcp.embeddings import EmbeddingService, estimate_cost, estimate_tokens
+from legacy_code_archive_mcp.journal import IndexJournal
+from legacy_code_archive_mcp.locking import IndexerLock, IndexerLockError
 from legacy_code_archive_mcp.chunking import ChunkingService
+from legacy_code_archive_mcp.source_reader import read_source_text, to_byte_offsets
 
 
 class IndexingService:
     """코드 파일을 인덱싱하는 서비스"""
 
+    # 처리량 측정값을 합칠 때 이전 측정값에 곱하는 가중치 (최근 실행에 더 큰 가중치)
+    THROUGHPUT_DECAY = 0.5
+
     def __init__(
         self,
         config: Config,
@@ -34,6 +42,12 @@ class IndexingService:
         self.db = db_service
         self.embeddings = embedding_service
         self.chunker = chunking_service
+        self.journal = IndexJournal(config.lancedb_path)
+        self.lock = IndexerLock(config.lancedb_path)
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.rebuild_status: Dict[str, Any] = {"status": "idle"}
+        # 현재 실행에서 측정한 임베딩/저장 처리량 (실행 종료 시 상태에 반영)
+        self._throughput: Dict[str, float] = {}
 
     def _should_exclude(self, path: Path) -> bool:
         """제외 패턴을 기반으로 경로를 제외해야 하는지 확인합니다.
@@ -74,12 +88,155 @@ class IndexingService:
 
         return files_to_index
 
+    def _prepare_file(self, file_path: Path, project_path: str) -> List[Dict[str, Any]]:
+        """파일을 읽고 청크로 분할하여 임베딩을 제외한 행 데이터를 준비합니다.
+
+        Args:
+            file_path: 파일 경로
+            project_path: 프로젝트의 루트 경로
+
+        Returns:
+            청크 행 딕셔너리 리스트 (빈 파일이면 빈 리스트)
+        """
+        # 파일 내용 읽기 (텍스트 모드로 읽은 것과 같은 내용)
+        content, byte_exact = read_source_text(file_path.read_bytes())
+
+        # 빈 파일 건너뛰기
+        if not content.strip():
+            return []
+
+        # 파일 메타데이터 가져오기
+        file_stat = file_path.stat()
+        last_modified = file_stat.st_mtime
+
+        # 줄 범위, 문자 오프셋과 함께 청크로 분할
+        chunks = self.chunker.split_file_with_lines(str(file_path), content)
+
+        # 원본 바이트로 청크를 재현할 수 있는 파일만 바이트 오프셋 기록
+        # (CRLF 줄바꿈이나 잘못된 UTF-8 바이트가 있으면 0으로 두고 본문을 그대로 저장)
+        byte_offsets = {}
+        if byte_exact:
+            byte_offsets = to_byte_offsets(
+                content, [offset for chunk in chunks for offset in chunk[3:]]
+            )
+
+        # 데이터베이스용 데이터 준비
+        project_id = self.db.compute_project_id(project_path)
+        language = self.chunker.detect_language(str(file_path))
+
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "content": chunk,
+                "filePath": str(file_path),
+                "projectId": project_id,
+                "projectPath": project_path,
+                "language": language,
+                "lastModified": last_modified,
+                "startLine": start_line,
+                "endLine": end_line,
+                "startOffset": byte_offsets.get(start, 0),
+                "endOffset": byte_offsets.get(end, 0),
+                "contentHash": self.db.compute_content_hash(chunk),
+                # 스칼라 인덱스용 필터 컬럼 복사본
+                "project_id": project_id,
+                "file_path": str(file_path),
+                "last_modified": last_modified
+            }
+            for chunk, start_line, end_line, start, end in chunks
+        ]
+
+    async def _embed_and_store(
+        self,
+        file_paths: List[str],
+        chunks_data: List[Dict[str, Any]],
+        reuse_paths: Optional[List[str]] = None,
+        target: Optional[DatabaseService] = None
+    ) -> int:
+        """청크 임베딩을 생성하고 파일들의 기존 청크를 단일 커밋으로 교체합니다.
+
+        활성 테이블에 내용이 같은 청크가 이미 있으면 임베딩을 다시 생성하지 않고
+        벡터를 재사용합니다.
+
+        Args:
+            file_paths: 교체할 파일 경로 리스트
+            chunks_data: 임베딩을 제외한 청크 행 리스트
+            reuse_paths: 기존 벡터를 재사용할 수 있는 파일 경로 (기본값: 재사용 안 함)
+            target: 저장할 데이터베이스 서비스 (기본값: 활성 테이블)
+
+        Returns:
+            새로 임베딩한 청크 수
+        """
+        target = target or self.db
+        vectors = await self.db.get_reusable_vectors(reuse_paths or [])
+
+        # 재사용할 벡터가 없는 고유한 청크 내용에 대해서만 임베딩 생성
+        missing = {
+            chunk_data["contentHash"]: chunk_data["content"]
+            for chunk_data in chunks_data
+            if chunk_data["contentHash"] not in vectors
+        }
+        embed_start = time.time()
+        embeddings = await self.embeddings.generate_embeddings_batch(list(missing.values()))
+        vectors.update(zip(missing.keys(), embeddings))
+        if missing:
+            missing_chars = sum(len(text) for text in missing.values())
+            self._measure("embed", missing_chars, time.time() - embed_start)
+
+        for chunk_data in chunks_data:
+            chunk_data["vector"] = vectors[chunk_data["contentHash"]]
+            # 참조 저장: 원본에서 다시 읽을 수 있는 청크는 본문을 저장하지 않음
+            if not self.config.store_content and chunk_data["endOffset"]:
+                chunk_data["content"] = ""
+
+        # 데이터베이스에 저장
+        store_start = time.time()
+        await target.replace_file_chunks(file_paths, chunks_data)
+        if chunks_data:
+            self._measure("store", len(chunks_data), time.time() - store_start)
+        return len(missing)
+
+    def _measure(self, stage: str, amount: int, seconds: float):
+        """현재 실행의 처리량 측정값을 누적합니다.
+
+        Args:
+            stage: "embed" (임베딩한 문자 수) 또는 "store" (기록한 청크 수)
+            amount: 처리한 양
+            seconds: 소요 시간(초)
+        """
+        unit = "Chars" if stage == "embed" else "Chunks"
+        self._throughput[f"{stage}{unit}"] = self._throughput.get(f"{stage}{unit}", 0) + amount
+        self._throughput[f"{stage}Seconds"] = self._throughput.get(f"{stage}Seconds", 0.0) + seconds
+
+    def _save_throughput(self):
+        """현재 실행의 처리량 측정값을 이전 측정값과 합쳐 상태에 기록합니다.
+
+        이전 측정값은 THROUGHPUT_DECAY를 곱해 합치므로 최근 실행이 추정에 더 크게 반영됩니다.
+        임베딩 처리량은 모델에 따라 다르므로 모델이 바뀌면 이전 임베딩 측정값은 버립니다.
+        """
+        if not self._throughput:
+            return
+
+        previous = self.db.state.data.get("throughput", {})
+        same_model = previous.get("embeddingModel") == self.config.embedding_model
+        throughput: Dict[str, Any] = {"embeddingModel": self.config.embedding_model}
+        for key in ("embedChars", "embedSeconds", "storeChunks", "storeSeconds"):
+            keep = same_model or key.startswith("store")
+            throughput[key] = (
+                previous.get(key, 0) * self.THROUGHPUT_DECAY if keep else 0
+            ) + self._throughput.get(key, 0)
+        throughput["updatedAt"] = time.time()
+
+        self.db.state.data["throughput"] = throughput
+        self.db.state.save()
+        self._throughput = {}
+
     async def index_file(
         self,
         file_path: Path,
         project_path: str
     ) -> tuple[int, List[str]]:
-        """단일 파일을 인덱싱합니다.
+        """단일 파일을 인덱싱합니다. 기존 청크는 새 청크와 함께 원자적으로 교체됩니다.
 
         Args:
             file_path: 파일 경로
@@ -91,144 +248,769 @@ class IndexingService:
         errors = []
 
         try:
-            # 파일 내용 읽기
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            chunks_data = self._prepare_file(file_path, project_path)
+            await self._embed_and_store(
+                [str(file_path)], chunks_data, reuse_paths=[str(file_path)]
+            )
+            return len(chunks_data), errors
+
+        except Exception as e:
+            error_msg = f"Error indexing {file_path}: {str(e)}"
+            errors.append(error_msg)
+            return 0, errors
+
+    def _is_indexable(self, file_path: Path) -> bool:
+        """파일이 포함 확장자와 제외 패턴 기준으로 인덱싱 대상인지 확인합니다.
+
+        Args:
+            file_path: 확인할 파일 경로
+
+        Returns:
+            인덱싱 대상이면 True
+        """
+        if self._should_exclude(file_path):
+            return False
+        return any(file_path.name.endswith(ext) for ext in self.config.included_extensions)
+
+    async def _detect_changes_with_git(
+        self,
+        project_root: Path,
+        project_id: str,
+        head_commit: Optional[str]
+    ) -> Optional[Tuple[List[Path], List[str], Set[str], Set[str]]]:
+        """git 기록으로 마지막 인덱싱 이후 변경된 파일을 계산합니다.
+
+        Args:
+            project_root: 프로젝트 루트 절대 경로
+            project_id: 프로젝트 ID
+            head_commit: 현재 HEAD 커밋 (git 저장소가 아니면 None)
+
+        Returns:
+            (인덱싱할 파일, 삭제할 파일 경로, 커밋되지 않은 파일, 수정이 확실한 파일 경로) 튜플
+            또는 git으로 계산할 수 없어 전체 스캔이 필요한 경우 None
+        """
+        project_state = self.db.state.get_project(project_id)
+        last_commit = project_state.get("commit")
+        if not head_commit or not last_commit:
+            return None
+
+        changes = vcs.detect_changes(project_root, last_commit, project_state.get("dirty", []))
+        if changes is None:
+            return None
+
+        files_to_index = sorted(
+            project_root / relative_path
+            for relative_path in changes.changed
+            if self._is_indexable(project_root / relative_path)
+        )
+        deleted_paths = sorted(
+            str(project_root / relative_path) for relative_path in changes.deleted
+        )
+        dirty = {
+            relative_path for relative_path in changes.dirty
+            if self._is_indexable(project_root / relative_path)
+        }
+        modified = {str(project_root / relative_path) for relative_path in changes.modified}
+        return files_to_index, deleted_paths, dirty, modified
+
+    async def _plan_project(self, project_path: str) -> Dict[str, Any]:
+        """프로젝트의 변경 사항을 감지하여 인덱싱 계획을 만듭니다.
 
-            # 빈 파일 건너뛰기
-            if not content.strip():
-                return 0, errors
+        Args:
+            project_path: 프로젝트의 루트 경로
 
-            # 파일 메타데이터 가져오기
-            file_stat = file_path.stat()
-            last_modified = file_stat.st_mtime
+        Returns:
+            처리할 파일, 삭제할 파일, 파일 수, 완료 시 기록할 상태를 담은 딕셔너리
+        """
+        project_id = self.db.compute_project_id(project_path)
+        project_root = Path(project_path).resolve()
+        head_commit = vcs.get_head_commit(project_root) if project_root.is_dir() else None
+
+        git_changes = await self._detect_changes_with_git(project_root, project_id, head_commit)
+
+        if git_changes is not None:
+            # git 기반 변경 감지 - 변경 후보 파일만 확인
+            files_to_index, deleted_paths, dirty, modified = git_changes
+            indexed_files = await self.db.get_file_mtimes(
+                [str(file_path) for file_path in files_to_index] + deleted_paths
+            )
+            previous_count = self.db.state.get_project(project_id).get("fileCount")
+            if previous_count is None:
+                previous_count = len(await self.db.get_indexed_files(project_id))
+        else:
+            # 전체 스캔 후 수정 시간 비교
+            files_to_index = self._scan_project(project_path)
+            indexed_files = await self.db.get_indexed_files(project_id)
+            dirty = (vcs.list_dirty_files(project_root) or set()) if head_commit else set()
+            modified = set()
+            previous_count = None
+
+        planned_files = []
+        current_files: Set[str] = set()
+        for file_path in files_to_index:
+            file_path_str = str(file_path)
+            current_files.add(file_path_str)
+
+            if file_path_str in indexed_files:
+                # 수정되지 않은 경우 건너뛰기 (git 감지 시에는 계속 커밋되지 않은 파일 등)
+                # git이 변경을 확인한 파일은 수정 시간 허용 오차와 관계없이 다시 인덱싱
+                current_mtime = file_path.stat().st_mtime
+                unchanged = abs(current_mtime - indexed_files[file_path_str]) < 1  # 1초 허용 오차
+                if unchanged and file_path_str not in modified:
+                    continue
+                planned_files.append(
+                    {"path": file_path_str, "projectPath": project_path, "update": True}
+                )
+            else:
+                planned_files.append(
+                    {"path": file_path_str, "projectPath": project_path, "update": False}
+                )
+
+        if git_changes is not None:
+            deletes = [path for path in deleted_paths if path in indexed_files]
+            new_count = sum(1 for item in planned_files if not item["update"])
+            file_count = previous_count + new_count - len(deletes)
+        else:
+            deletes = sorted(set(indexed_files.keys()) - current_files)
+            file_count = len(files_to_index)
+
+        return {
+            "files": planned_files,
+            "deletes": deletes,
+            "fileCount": file_count,
+            "state": {
+                "projectPath": project_path,
+                "commit": head_commit,
+                "dirty": sorted(dirty),
+                "fileCount": file_count
+            }
+        }
 
-            # 청크로 분할
-            chunks = self.chunker.split_file(str(file_path), content)
+    async def _plan_run(self) -> Tuple[Dict[str, Any], List[str]]:
+        """구성된 모든 프로젝트에 대한 인덱싱 실행 계획을 만듭니다.
 
-            if not chunks:
-                return 0, errors
+        Returns:
+            (실행 계획, 오류 리스트) 튜플
+        """
+        plan: Dict[str, Any] = {
+            "files": [],
+            "deletes": [],
+            "deletedProjects": [],
+            "projects": {},
+            "totalFiles": 0
+        }
+        errors = []
 
-            # 모든 청크에 대한 임베딩 생성
-            embeddings = await self.embeddings.generate_embeddings_batch(chunks)
+        configured_project_ids: Set[str] = set()
+        has_project_state = bool(self.db.state.project_ids())
 
-            # 데이터베이스용 데이터 준비
+        # 각 프로젝트 스캔 및 변경 감지
+        for project_path in self.config.project_paths:
             project_id = self.db.compute_project_id(project_path)
-            language = self.chunker.detect_language(str(file_path))
-
-            chunks_data = []
-            for chunk, embedding in zip(chunks, embeddings):
-                chunk_data = {
-                    "id": str(uuid.uuid4()),
-                    "vector": embedding,
-                    "content": chunk,
-                    "filePath": str(file_path),
-                    "projectId": project_id,
-                    "projectPath": project_path,
-                    "language": language,
-                    "lastModified": last_modified
-                }
-                chunks_data.append(chunk_data)
-
-            # 데이터베이스에 저장
-            await self.db.upsert_chunks(chunks_data)
-
-            return len(chunks), errors
+            configured_project_ids.add(project_id)
 
-        except Exception as e:
-            error_msg = f"Error indexing {file_path}: {str(e)}"
-            errors.append(error_msg)
-            return 0, errors
+            try:
+                project_plan = await self._plan_project(project_path)
+                plan["files"].extend(project_plan["files"])
+                plan["deletes"].extend(project_plan["deletes"])
+                plan["totalFiles"] += project_plan["fileCount"]
+                plan["projects"][project_id] = project_plan["state"]
+            except Exception as e:
+                error_msg = f"Error scanning project {project_path}: {str(e)}"
+                errors.append(error_msg)
+
+        # 구성에서 제거된 프로젝트 찾기
+        known_project_ids = set(self.db.state.project_ids())
+        if not has_project_state:
+            # 상태 기록 이전에 인덱싱된 프로젝트가 있을 수 있으므로 첫 실행 시 인덱스에서 직접 확인
+            known_project_ids |= set(await self.db.get_project_ids())
+        plan["deletedProjects"] = sorted(known_project_ids - configured_project_ids)
+
+        return plan, errors
+
+    async def _execute_plan(self, plan: Dict[str, Any], result: IndexingResult):
+        """실행 계획을 처리하며 커밋된 배치를 저널에 기록합니다.
+
+        저널에 이미 커밋으로 기록된 파일과 삭제는 건너뜁니다.
+
+        Args:
+            plan: 실행 계획 (재개 시 `committed`, `deleted` 집합 포함)
+            result: 통계와 오류를 누적할 결과 객체
+        """
+        committed: Set[str] = plan.get("committed", set())
+        deleted: Set[str] = plan.get("deleted", set())
+        failed_files: Set[str] = set()
+
+        # 구성에서 제거된 프로젝트의 파일 제거
+        for project_id in plan["deletedProjects"]:
+            try:
+                result.deleted_files += len(await self.db.get_indexed_files(project_id))
+                await self.db.delete_by_project_id(project_id)
+                self.db.state.remove_project(project_id)
+            except Exception as e:
+                error_msg = f"Error deleting project {project_id}: {str(e)}"
+                result.errors.append(error_msg)
+
+        # 삭제된 파일 제거
+        pending_deletes = [path for path in plan["deletes"] if path not in deleted]
+        result.deleted_files += len(plan["deletes"]) - len(pending_deletes)
+        for i in range(0, len(pending_deletes), self.db.FILTER_BATCH_SIZE):
+            batch = pending_deletes[i:i + self.db.FILTER_BATCH_SIZE]
+            try:
+                await self.db.delete_by_file_paths(batch)
+                self.journal.record_deleted(batch)
+                result.deleted_files += len(batch)
+            except Exception as e:
+                error_msg = f"Error deleting {len(batch)} files: {str(e)}"
+                result.errors.append(error_msg)
+
+        # 변경되거나 새로 추가된 파일을 체크포인트 단위로 처리
+        batch_paths: List[str] = []
+        batch_updates: List[str] = []
+        batch_chunks: List[Dict[str, Any]] = []
+
+        async def flush():
+            if not batch_paths:
+                return
+            try:
+                await self._embed_and_store(batch_paths, batch_chunks, reuse_paths=batch_updates)
+                self.journal.record_committed(list(batch_paths))
+                result.total_chunks += len(batch_chunks)
+            except Exception as e:
+                # 배치 전체가 커밋되지 않으므로 기존 청크는 그대로 유지됨
+                error_msg = f"Error indexing {len(batch_paths)} files: {str(e)}"
+                result.errors.append(error_msg)
+                failed_files.update(batch_paths)
+            batch_paths.clear()
+            batch_updates.clear()
+            batch_chunks.clear()
+
+        for item in plan["files"]:
+            if item["update"]:
+                result.updated_files += 1
+            else:
+                result.new_files += 1
+
+            if item["path"] in committed:
+                continue
+
+            file_path = Path(item["path"])
+            try:
+                chunks_data = await asyncio.to_thread(
+                    self._prepare_file, file_path, item["projectPath"]
+                )
+            except FileNotFoundError:
+                # 계획 이후 삭제된 파일 - 기존 청크 제거
+                chunks_data = []
+            except Exception as e:
+                error_msg = f"Error indexing {file_path}: {str(e)}"
+                result.errors.append(error_msg)
+                failed_files.add(item["path"])
+                continue
+
+            batch_paths.append(item["path"])
+            if item["update"]:
+                batch_updates.append(item["path"])
+            batch_chunks.extend(chunks_data)
+            if len(batch_chunks) >= self.config.checkpoint_chunks:
+                await flush()
+
+        await flush()
+
+        # 다음 실행을 위한 프로젝트 상태 기록 (실패한 파일은 다음에 다시 시도)
+        self._add_retry_files(plan["projects"], failed_files)
+        for project_id, project_state in plan["projects"].items():
+            self.db.state.set_project(project_id, project_state)
+
+    @staticmethod
+    def _add_retry_files(project_states: Dict[str, Dict[str, Any]], failed_files: Set[str]):
+        """실패한 파일을 프로젝트 상태의 커밋되지 않은 파일 목록에 추가합니다.
+
+        다음 증분 인덱싱에서 git 변경 여부와 관계없이 다시 처리됩니다.
+
+        Args:
+            project_states: 프로젝트 ID -> 프로젝트 상태 딕셔너리
+            failed_files: 실패한 파일 절대 경로 집합
+        """
+        for project_state in project_states.values():
+            project_root = Path(project_state["projectPath"]).resolve()
+            retry = {
+                str(Path(path).relative_to(project_root))
+                for path in failed_files
+                if Path(path).is_relative_to(project_root)
+            }
+            project_state["dirty"] = sorted(set(project_state["dirty"]) | retry)
 
     async def index_projects(self) -> IndexingResult:
         """구성에 정의된 모든 프로젝트를 인덱싱합니다.
 
         증분 인덱싱 전략 구현:
-        - lastModified 시간 비교
+        - git 저장소: 마지막 인덱싱 커밋 이후의 `git diff`와 작업 트리 상태로 변경 파일 계산
+        - 그 외 (또는 git 계산 실패 시): 전체 스캔 후 lastModified 시간 비교
         - 변경된 파일 재인덱싱
         - 새 파일 추가
         - 삭제된 파일 제거
 
+        진행 상황은 저널에 기록되며, 파일 배치는 기존 청크 교체와 함께 원자적으로 커밋됩니다.
+        이전 실행이 중단된 경우 스캔을 다시 하지 않고 완료되지 않은 파일만 이어서 처리합니다.
+        같은 LanceDB 경로를 공유하는 프로세스 중 하나만 인덱서 잠금을 얻어 실행합니다.
+
+        Returns:
+            통계가 포함된 IndexingResult
+
+        Raises:
+            RuntimeError: 이 프로세스에서 재인덱싱이 진행 중인 경우
+            IndexerLockError: 다른 프로세스가 인덱서 잠금을 보유하고 있는 경우
+        """
+        if self.rebuild_running:
+            raise RuntimeError("Index rebuild is in progress")
+
+        with self.lock.hold("index"):
+            # 잠금을 얻기 전에 다른 프로세스가 기록한 상태와 테이블 반영
+            self.db.refresh()
+            self.db.migrate_schema()
+            return await self._run_index()
+
+    async def _run_index(self) -> IndexingResult:
+        """인덱서 잠금을 보유한 상태에서 증분 인덱싱을 실행합니다.
+
         Returns:
             통계가 포함된 IndexingResult
         """
         start_time = time.time()
 
-        total_files = 0
-        new_files = 0
-        updated_files = 0
-        deleted_files = 0
-        total_chunks = 0
-        all_errors = []
-
-        # 현재 인덱싱된 파일 가져오기
-        indexed_files_metadata = await self.db.get_all_indexed_files()
-        indexed_files: Dict[str, float] = {
-            item["filePath"]: item["lastModified"]
-            for item in indexed_files_metadata
-        }
+        result = IndexingResult(
+            total_files=0,
+            new_files=0,
+            updated_files=0,
+            deleted_files=0,
+            total_chunks=0,
+            elapsed_time=0.0
+        )
 
-        # 현재 스캔에서 발견된 파일 추적
-        current_files: Set[str] = set()
+        plan = self.journal.load_pending()
+        if plan is not None:
+            # 중단된 실행 재개
+            result.resumed = True
+        else:
+            plan, errors = await self._plan_run()
+            result.errors.extend(errors)
+            self.journal.start_run(plan)
+
+        result.total_files = plan["totalFiles"]
+        await self._execute_plan(plan, result)
+        self.journal.finish_run()
+        self._save_throughput()
+
+        # 필터용 스칼라 인덱스와 파일 단위 벡터 생성, 임계값을 넘으면 테이블 압축과 이전 버전 정리
+        try:
+            await self.db.ensure_file_vectors()
+            result.errors.extend(await self.db.ensure_scalar_indexes())
+            if await self.db.needs_optimization():
+                result.maintenance = await self.db.optimize_table()
+        except Exception as e:
+            error_msg = f"Error maintaining table: {str(e)}"
+            result.errors.append(error_msg)
+
+        result.elapsed_time = time.time() - start_time
+        return result
+
+    async def _plan_rebuild(self) -> Tuple[Dict[str, Any], List[str], bool]:
+        """구성 변경으로 인한 전체 재인덱싱의 처리 대상을 계획합니다 (섀도 테이블은 만들지 않음).
 
-        # 각 프로젝트 스캔 및 인덱싱
+        Returns:
+            (실행 계획, 오류 리스트, 기존 벡터 재사용 여부) 튜플.
+            중단된 재인덱싱이 있으면 섀도 테이블에 이미 기록된 파일은
+            계획의 `committed`에 포함됩니다.
+        """
+        active_meta = self.db.get_table_meta() or {}
+        target_meta = self.db.expected_table_meta()
+        reuse_vectors = active_meta.get("embeddingModel") == target_meta["embeddingModel"]
+
+        migration = self.db.state.data.get("migration")
+        shadow = None
+        if migration and migration.get("meta") == target_meta:
+            shadow = self.db.for_table(migration["table"])
+
+        plan: Dict[str, Any] = {
+            "files": [], "deletes": [], "deletedProjects": [], "committed": set()
+        }
+        errors = []
         for project_path in self.config.project_paths:
             try:
-                # 파일 스캔
-                files = self._scan_project(project_path)
-                total_files += len(files)
-
-                # 각 파일 처리
-                for file_path in files:
-                    file_path_str = str(file_path)
-                    current_files.add(file_path_str)
-
-                    # 현재 파일 수정 시간 가져오기
-                    current_mtime = file_path.stat().st_mtime
-
-                    # 파일 인덱싱 필요 여부 확인
-                    if file_path_str in indexed_files:
-                        indexed_mtime = indexed_files[file_path_str]
-
-                        # 수정되지 않은 경우 건너뛰기
-                        if abs(current_mtime - indexed_mtime) < 1:  # 1초 허용 오차
-                            continue
-
-                        # 파일이 수정됨 - 이전 청크 삭제 후 재인덱싱
-                        await self.db.delete_by_file_path(file_path_str)
-                        chunks_created, errors = await self.index_file(file_path, project_path)
-                        updated_files += 1
-                        total_chunks += chunks_created
-                        all_errors.extend(errors)
-                    else:
-                        # 새 파일 - 인덱싱
-                        chunks_created, errors = await self.index_file(file_path, project_path)
-                        new_files += 1
-                        total_chunks += chunks_created
-                        all_errors.extend(errors)
-
+                files = await asyncio.to_thread(self._scan_project, project_path)
             except Exception as e:
                 error_msg = f"Error scanning project {project_path}: {str(e)}"
-                all_errors.append(error_msg)
+                errors.append(error_msg)
+                continue
+
+            plan["files"].extend(
+                {"path": str(file_path), "projectPath": project_path, "update": False}
+                for file_path in files
+            )
+            if shadow is not None:
+                plan["committed"].update(
+                    await shadow.get_indexed_files(self.db.compute_project_id(project_path))
+                )
+
+        return plan, errors, reuse_vectors
+
+    def _chunk_hashes(
+        self, items: List[Dict[str, Any]], errors: List[str]
+    ) -> List[List[Tuple[str, int]]]:
+        """계획된 파일을 읽고 청크로 분할하여 청크별 내용 해시와 길이를 계산합니다.
 
-        # 삭제된 파일 찾기 및 제거
-        deleted_file_paths = set(indexed_files.keys()) - current_files
-        for deleted_path in deleted_file_paths:
+        Args:
+            items: 실행 계획의 파일 항목 리스트
+            errors: 파일 오류를 추가할 리스트
+
+        Returns:
+            파일 항목별 (내용 해시, 문자 수) 리스트 (읽을 수 없는 파일은 빈 리스트)
+        """
+        chunk_hashes = []
+        for item in items:
             try:
-                await self.db.delete_by_file_path(deleted_path)
-                deleted_files += 1
+                chunks_data = self._prepare_file(Path(item["path"]), item["projectPath"])
+            except FileNotFoundError:
+                chunks_data = []
             except Exception as e:
-                error_msg = f"Error deleting {deleted_path}: {str(e)}"
-                all_errors.append(error_msg)
-
-        elapsed_time = time.time() - start_time
-
-        return IndexingResult(
-            total_files=total_files,
-            new_files=new_files,
-            updated_files=updated_files,
-            deleted_files=deleted_files,
-            total_chunks=total_chunks,
-            elapsed_time=elapsed_time,
-            errors=all_errors
+                error_msg = f"Error indexing {item['path']}: {str(e)}"
+                errors.append(error_msg)
+                chunks_data = []
+            chunk_hashes.append([
+                (chunk_data["contentHash"], len(chunk_data["content"]))
+                for chunk_data in chunks_data
+            ])
+        return chunk_hashes
+
+    async def estimate_index(self) -> IndexingEstimate:
+        """index_codebase가 처리할 작업량과 소요 시간을 추정합니다 (드라이런).
+
+        실제 실행과 같은 스캔, 변경 감지, 청킹 단계를 거치지만 임베딩 API를 호출하지 않고
+        LanceDB와 저널에도 기록하지 않습니다.
+
+        임베딩 대상은 실제 실행과 같은 체크포인트 배치 단위로 셉니다. 배치 파일의 기존 벡터를
+        재사용할 수 있는 청크와 같은 배치에서 이미 센 내용의 청크는 제외합니다.
+        소요 시간은 이번에 측정한 읽기/청킹 시간과 이전 실행에서 측정한 임베딩, 저장 처리량으로
+        추정합니다.
+
+        Returns:
+            프로젝트별 파일, 청크, 토큰 수와 추정 비용, 추정 소요 시간을 담은 IndexingEstimate
+        """
+        start_time = time.time()
+        self.db.refresh()
+
+        resumed = False
+        rebuild = self.rebuild_running or bool(self.db.table_meta_mismatches())
+        if rebuild:
+            plan, errors, reuse_vectors = await self._plan_rebuild()
+            resumed = bool(plan["committed"])
+        else:
+            plan = self.journal.load_pending()
+            if plan is not None:
+                resumed = True
+                errors = []
+            else:
+                plan, errors = await self._plan_run()
+            reuse_vectors = True
+
+        committed: Set[str] = plan.get("committed", set())
+        items = [item for item in plan["files"] if item["path"] not in committed]
+
+        # 읽기와 청킹은 실제 실행과 같은 작업이므로 직접 측정
+        prepare_start = time.time()
+        chunk_hashes = await asyncio.to_thread(self._chunk_hashes, items, errors)
+        prepare_seconds = time.time() - prepare_start
+
+        projects = {
+            project_path: ProjectEstimate(projectPath=project_path)
+            for project_path in self.config.project_paths
+        }
+        embed_chars = 0
+        batch: List[Tuple[Dict[str, Any], List[Tuple[str, int]]]] = []
+        batch_chunks = 0
+
+        async def flush():
+            # 실제 실행과 같이 체크포인트 배치마다 그 배치 파일의 기존 벡터만 재사용
+            # (증분 인덱싱은 수정된 파일, 재인덱싱은 모델이 같으면 모든 파일)
+            # 같은 내용은 배치 안에서만 한 번 임베딩
+            nonlocal embed_chars
+            reuse_paths = [
+                item["path"] for item, _ in batch if item["update"] or rebuild
+            ] if reuse_vectors else []
+            seen: Set[str] = set(await self.db.get_content_hashes(reuse_paths))
+            for item, hashes in batch:
+                estimate = projects[item["projectPath"]]
+                for content_hash, num_chars in hashes:
+                    if content_hash in seen:
+                        estimate.reused_chunks += 1
+                        continue
+                    seen.add(content_hash)
+                    estimate.chunks_to_embed += 1
+                    estimate.tokens += estimate_tokens(num_chars)
+                    embed_chars += num_chars
+            batch.clear()
+
+        for item, hashes in zip(items, chunk_hashes):
+            estimate = projects.setdefault(
+                item["projectPath"], ProjectEstimate(projectPath=item["projectPath"])
+            )
+            estimate.files += 1
+            if item["update"]:
+                estimate.updated_files += 1
+            else:
+                estimate.new_files += 1
+            estimate.chunks += len(hashes)
+
+            batch.append((item, hashes))
+            batch_chunks += len(hashes)
+            if batch_chunks >= self.config.checkpoint_chunks:
+                await flush()
+                batch_chunks = 0
+
+        if batch:
+            await flush()
+
+        deleted: Set[str] = plan.get("deleted", set())
+        for path in plan["deletes"]:
+            if path in deleted:
+                continue
+            for estimate in projects.values():
+                if Path(path).is_relative_to(Path(estimate.projectPath).resolve()):
+                    estimate.deleted_files += 1
+                    break
+
+        total = ProjectEstimate(projectPath="")
+        for estimate in projects.values():
+            for field in ("files", "new_files", "updated_files", "deleted_files",
+                          "chunks", "chunks_to_embed", "reused_chunks", "tokens"):
+                setattr(total, field, getattr(total, field) + getattr(estimate, field))
+
+        # 이전 실행에서 측정한 처리량으로 임베딩과 저장 시간 추정
+        throughput = self.db.state.data.get("throughput")
+        embed_seconds = store_seconds = None
+        if throughput:
+            same_model = throughput.get("embeddingModel") == self.config.embedding_model
+            if same_model and throughput.get("embedChars"):
+                embed_seconds = embed_chars * throughput["embedSeconds"] / throughput["embedChars"]
+            if throughput.get("storeChunks"):
+                store_seconds = (
+                    total.chunks * throughput["storeSeconds"] / throughput["storeChunks"]
+                )
+        if not total.chunks_to_embed:
+            embed_seconds = 0.0
+        if not total.chunks:
+            store_seconds = 0.0
+
+        stages = {"prepare": prepare_seconds, "embed": embed_seconds, "store": store_seconds}
+        estimated_time = {
+            stage: round(seconds, 2) if seconds is not None else None
+            for stage, seconds in stages.items()
+        }
+        estimated_time["total"] = (
+            round(sum(stages.values()), 2) if None not in stages.values() else None
+        )
+
+        cost = estimate_cost(self.config.embedding_model, total.tokens)
+        return IndexingEstimate(
+            mode="rebuild" if rebuild else "incremental",
+            resumed=resumed,
+            embedding_model=self.config.embedding_model,
+            projects=list(projects.values()),
+            total=total,
+            deleted_projects=len(plan["deletedProjects"]),
+            estimated_cost_usd=round(cost, 6) if cost is not None else None,
+            estimated_time=estimated_time,
+            throughput=throughput,
+            errors=errors,
+            elapsed_time=round(time.time() - start_time, 2)
+        )
+
+    @property
+    def rebuild_running(self) -> bool:
+        """백그라운드 재인덱싱이 진행 중인지 여부"""
+        return self._rebuild_task is not None and not self._rebuild_task.done()
+
+    def start_rebuild(self) -> bool:
+        """백그라운드에서 섀도 테이블 재인덱싱을 시작합니다.
+
+        Returns:
+            새로 시작했으면 True, 이미 진행 중이면 False
+        """
+        if self.rebuild_running:
+            return False
+        self.rebuild_status = {
+            "status": "running",
+            "reason": self.db.table_meta_mismatches(),
+            "startedAt": time.time()
+        }
+        self._rebuild_task = asyncio.create_task(self._run_rebuild())
+        return True
+
+    async def _run_rebuild(self):
+        """인덱서 잠금을 얻어 재인덱싱을 실행하고 결과를 상태에 기록합니다."""
+        try:
+            with self.lock.hold("rebuild"):
+                self.db.refresh()
+                self.db.migrate_schema()
+                if not self.db.table_meta_mismatches():
+                    # 다른 프로세스가 이미 같은 구성으로 재인덱싱을 마친 경우
+                    self.rebuild_status.update(status="completed")
+                    return
+                result = await self.rebuild_index()
+            self.rebuild_status.update(status="completed", result=result.model_dump())
+        except IndexerLockError as e:
+            # 다른 프로세스가 인덱싱 중 - 다음 index_codebase 호출 시 다시 시도
+            self.rebuild_status.update(status="waiting", error=str(e))
+        except Exception as e:
+            self.rebuild_status.update(status="failed", error=str(e))
+
+    def _begin_migration(self) -> Dict[str, Any]:
+        """현재 구성에 대한 재인덱싱 작업을 시작하거나 중단된 작업을 이어받습니다.
+
+        Returns:
+            섀도 테이블 이름, 대상 메타데이터, 교체 시 기록할 프로젝트 상태를 담은 딕셔너리
+        """
+        target_meta = self.db.expected_table_meta()
+        migration = self.db.state.data.get("migration")
+        if migration and migration.get("meta") == target_meta:
+            return migration
+
+        if migration:
+            # 다른 구성으로 진행되던 섀도 테이블 폐기
+            self.db.drop_table(migration["table"])
+
+        migration = {
+            "table": f"{self.db.TABLE_NAME}_{int(time.time())}",
+            "meta": target_meta,
+            "projects": {}
+        }
+
+        # 재인덱싱 시작 시점의 git 상태 기록 - 이후 변경은 교체 후 증분 인덱싱으로 반영됨
+        for project_path in self.config.project_paths:
+            project_root = Path(project_path).resolve()
+            head_commit = vcs.get_head_commit(project_root) if project_root.is_dir() else None
+            dirty = (vcs.list_dirty_files(project_root) or set()) if head_commit else set()
+            migration["projects"][self.db.compute_project_id(project_path)] = {
+                "projectPath": project_path,
+                "commit": head_commit,
+                "dirty": sorted(
+                    relative_path for relative_path in dirty
+                    if self._is_indexable(project_root / relative_path)
+                ),
+                "fileCount": 0
+            }
+
+        self.db.state.data["migration"] = migration
+        self.db.state.save()
+        return migration
+
+    async def rebuild_index(self) -> IndexingResult:
+        """현재 구성(임베딩 모델, 청킹 파라미터)으로 섀도 테이블을 만들고 완료되면 교체합니다.
+
+        재인덱싱 중에도 검색은 기존 활성 테이블에서 계속 동작합니다. 임베딩 모델이 같으면
+        내용이 같은 청크의 벡터를 재사용하며, 서버가 재시작되면 섀도 테이블에 이미 기록된
+        파일은 건너뛰고 이어서 진행합니다. 완료 후 활성 테이블 포인터를 원자적으로 교체합니다.
+
+        Returns:
+            통계가 포함된 IndexingResult
+        """
+        start_time = time.time()
+
+        result = IndexingResult(
+            total_files=0,
+            new_files=0,
+            updated_files=0,
+            deleted_files=0,
+            total_chunks=0,
+            elapsed_time=0.0
         )
+
+        active_meta = self.db.get_table_meta() or {}
+        migration = self._begin_migration()
+        shadow = self.db.for_table(migration["table"])
+        # 이전 버전에서 시작된 재인덱싱의 섀도 테이블에도 새 컬럼 추가
+        shadow.migrate_schema()
+
+        # 모델이 같으면 기존 벡터를 내용 해시로 재사용
+        reuse_vectors = active_meta.get("embeddingModel") == migration["meta"]["embeddingModel"]
+
+        self.rebuild_status.update(table=migration["table"], processedFiles=0, totalFiles=0)
+        failed_files: Set[str] = set()
+
+        batch_paths: List[str] = []
+        batch_chunks: List[Dict[str, Any]] = []
+
+        async def flush():
+            if not batch_paths:
+                return
+            try:
+                embedded = await self._embed_and_store(
+                    batch_paths,
+                    batch_chunks,
+                    reuse_paths=batch_paths if reuse_vectors else None,
+                    target=shadow
+                )
+                result.total_chunks += len(batch_chunks)
+                self.rebuild_status["embeddedChunks"] = (
+                    self.rebuild_status.get("embeddedChunks", 0) + embedded
+                )
+            except Exception as e:
+                error_msg = f"Error indexing {len(batch_paths)} files: {str(e)}"
+                result.errors.append(error_msg)
+                failed_files.update(batch_paths)
+            batch_paths.clear()
+            batch_chunks.clear()
+
+        for project_id, project_state in migration["projects"].items():
+            project_path = project_state["projectPath"]
+            try:
+                files = await asyncio.to_thread(self._scan_project, project_path)
+            except Exception as e:
+                error_msg = f"Error scanning project {project_path}: {str(e)}"
+                result.errors.append(error_msg)
+                continue
+
+            project_state["fileCount"] = len(files)
+            result.total_files += len(files)
+            self.rebuild_status["totalFiles"] += len(files)
+
+            # 중단된 재인덱싱을 재개하는 경우 이미 기록된 파일 건너뛰기
+            completed = await shadow.get_indexed_files(project_id)
+
+            for file_path in files:
+                self.rebuild_status["processedFiles"] += 1
+                if str(file_path) in completed:
+                    continue
+
+                try:
+                    chunks_data = await asyncio.to_thread(
+                        self._prepare_file, file_path, project_path
+                    )
+                except Exception as e:
+                    error_msg = f"Error indexing {file_path}: {str(e)}"
+                    result.errors.append(error_msg)
+                    failed_files.add(str(file_path))
+                    continue
+
+                result.new_files += 1
+                batch_paths.append(str(file_path))
+                batch_chunks.extend(chunks_data)
+                if len(batch_chunks) >= self.config.checkpoint_chunks:
+                    await flush()
+
+        await flush()
+
+        if await shadow.count_chunks() == 0:
+            raise RuntimeError("No files were indexed into the rebuilt table")
+
+        result.errors.extend(await shadow.ensure_scalar_indexes())
+
+        # 활성 테이블 교체 (실패한 파일은 다음 증분 인덱싱에서 다시 시도)
+        self._add_retry_files(migration["projects"], failed_files)
+        self.db.activate_table(migration["table"], migration["projects"])
+        self.journal.finish_run()
+        self._save_throughput()
+
+        result.elapsed_time = time.time() - start_time
+        return result
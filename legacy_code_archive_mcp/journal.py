@@ -0,0 +1,101 @@
+"""재개 가능한 인덱싱을 위한 진행 저널
+
+인덱싱 실행 계획과 원자적으로 커밋된 파일 배치를 JSON Lines 파일에 순서대로 기록합니다.
+실행이 중단되면 다음 실행은 저널을 읽어 완료되지 않은 작업만 이어서 처리합니다.
+"""
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class IndexJournal:
+    """인덱싱 진행 상황을 기록하는 추가 전용(append-only) 저널"""
+
+    FILE_NAME = "index_journal.jsonl"
+
+    def __init__(self, base_path: str):
+        """저널을 초기화합니다.
+
+        Args:
+            base_path: 저널 파일을 저장할 디렉토리 (LanceDB 경로)
+        """
+        self.path = Path(base_path) / self.FILE_NAME
+
+    def _append(self, record: Dict[str, Any]):
+        """레코드 한 줄을 추가하고 디스크에 동기화합니다.
+
+        Args:
+            record: 기록할 레코드
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start_run(self, plan: Dict[str, Any]) -> str:
+        """새 실행을 시작하고 실행 계획을 기록합니다. 이전 저널 내용은 버려집니다.
+
+        Args:
+            plan: 처리할 파일, 삭제할 파일, 완료 시 기록할 프로젝트 상태를 담은 계획
+
+        Returns:
+            실행 ID
+        """
+        run_id = str(uuid.uuid4())
+        self.path.unlink(missing_ok=True)
+        self._append({"type": "run", "runId": run_id, "startedAt": time.time(), **plan})
+        return run_id
+
+    def record_committed(self, file_paths: List[str]):
+        """데이터베이스에 원자적으로 커밋된 파일 배치를 기록합니다.
+
+        Args:
+            file_paths: 커밋된 파일 경로 리스트
+        """
+        self._append({"type": "commit", "files": file_paths})
+
+    def record_deleted(self, file_paths: List[str]):
+        """인덱스에서 제거된 파일 배치를 기록합니다.
+
+        Args:
+            file_paths: 제거된 파일 경로 리스트
+        """
+        self._append({"type": "delete", "files": file_paths})
+
+    def finish_run(self):
+        """실행이 완료되었음을 표시합니다 (저널 파일 제거)."""
+        self.path.unlink(missing_ok=True)
+
+    def load_pending(self) -> Optional[Dict[str, Any]]:
+        """완료되지 않은 실행이 있으면 계획과 진행 상황을 불러옵니다.
+
+        마지막 줄이 기록 도중 잘린 경우 해당 줄은 무시합니다.
+
+        Returns:
+            실행 계획 딕셔너리 (`committed`, `deleted` 집합 포함) 또는 None
+        """
+        if not self.path.exists():
+            return None
+
+        run: Optional[Dict[str, Any]] = None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                record_type = record.get("type")
+                if record_type == "run":
+                    run = {**record, "committed": set(), "deleted": set()}
+                elif run is not None and record_type == "commit":
+                    run["committed"].update(record.get("files", []))
+                elif run is not None and record_type == "delete":
+                    run["deleted"].update(record.get("files", []))
+
+        return run
@@ -0,0 +1,169 @@
+"""프로세스 간 인덱서 잠금
+
+같은 LanceDB 경로를 여러 서버 프로세스가 공유할 때, 한 번에 하나의 프로세스만
+인덱싱, 재인덱싱, 최적화 같은 쓰기 작업을 하도록 파일 잠금으로 조정합니다.
+다른 프로세스는 잠금 없이 읽기(검색)를 계속합니다.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import ctypes
+    import msvcrt
+
+# Windows OpenProcess 접근 권한 (프로세스 존재 확인용)
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+class IndexerLockError(RuntimeError):
+    """다른 프로세스가 인덱서 잠금을 보유하고 있는 경우"""
+
+
+class IndexerLock:
+    """비차단(non-blocking) 방식의 배타적 파일 잠금
+
+    잠금은 열린 파일에 걸리므로 프로세스가 비정상 종료되면 운영체제가 자동으로 해제합니다.
+    같은 프로세스 안에서도 잠금 파일을 따로 열기 때문에 동시에 두 번 획득할 수 없습니다.
+    """
+
+    FILE_NAME = ".indexer.lock"
+
+    def __init__(self, base_path: str):
+        """잠금을 초기화합니다.
+
+        Args:
+            base_path: 잠금 파일을 둘 디렉토리 (LanceDB 경로)
+        """
+        self.path = Path(base_path) / self.FILE_NAME
+
+    @staticmethod
+    def _try_lock(fd: int) -> bool:
+        """파일 디스크립터에 배타적 잠금을 시도합니다.
+
+        Args:
+            fd: 잠금 파일 디스크립터
+
+        Returns:
+            잠금을 얻었으면 True
+        """
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                # 첫 바이트만 잠그고 보유자 정보는 그 뒤에 기록
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def _unlock(fd: int):
+        """파일 디스크립터의 잠금을 해제합니다.
+
+        Args:
+            fd: 잠금 파일 디스크립터
+        """
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def hold(self, operation: str) -> Iterator[None]:
+        """잠금을 획득하고 블록이 끝나면 해제합니다.
+
+        Args:
+            operation: 보유자 정보에 기록할 작업 이름 (예: "index", "rebuild")
+
+        Raises:
+            IndexerLockError: 다른 프로세스(또는 작업)가 잠금을 보유하고 있는 경우
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if not self._try_lock(fd):
+                holder = self.holder()
+                detail = f" ({holder['operation']}, pid {holder['pid']})" if holder else ""
+                raise IndexerLockError(f"Another indexer holds the lock{detail}")
+
+            # 보유자 정보 기록 (첫 바이트는 잠금 영역)
+            info = json.dumps({"pid": os.getpid(), "operation": operation, "since": time.time()})
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, ("\n" + info).encode("utf-8"))
+            try:
+                yield
+            finally:
+                os.ftruncate(fd, 1)
+                self._unlock(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        """프로세스가 실행 중인지 확인합니다.
+
+        Args:
+            pid: 프로세스 ID
+
+        Returns:
+            실행 중이면 True (확인할 수 없으면 True)
+        """
+        if fcntl is None:
+            # Windows에서 os.kill은 프로세스를 종료시키므로 핸들을 열어 확인
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if not handle:
+                return False
+            kernel32.CloseHandle(handle)
+            return True
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # 다른 사용자의 프로세스
+            return True
+        return True
+
+    def holder(self) -> Optional[Dict[str, Any]]:
+        """현재 잠금 보유자 정보를 가져옵니다.
+
+        잠금을 시도하지 않고 보유자 정보만 읽으므로, 상태 조회가 같은 순간 시작하는
+        인덱서의 잠금 획득을 방해하지 않습니다. 잠금 해제 시 정보가 지워지며,
+        비정상 종료로 남은 정보는 기록된 프로세스가 없으면 무시합니다.
+
+        Returns:
+            pid, 작업 이름, 시작 시각을 담은 딕셔너리 또는 잠금이 비어 있으면 None
+        """
+        try:
+            with open(self.path, "rb") as f:
+                # 첫 바이트는 잠금 영역
+                f.seek(1)
+                data = f.read(4096)
+        except FileNotFoundError:
+            return None
+
+        if not data.strip():
+            return None
+        try:
+            info = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            # 보유자가 정보를 기록하는 중
+            return {}
+
+        pid = info.get("pid")
+        if isinstance(pid, int) and not self._process_alive(pid):
+            return None
+        return info
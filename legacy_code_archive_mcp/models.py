@@ -1,6 +1,6 @@
 """레거시 코드 아카이브 MCP 서버의 데이터 모델"""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -9,12 +9,29 @@ class CodeSnippet(BaseModel):
 
     id: str = Field(..., description="고유 식별자 (UUID)")
     vector: List[float] = Field(..., description="OpenAI 임베딩 벡터 (1536차원)")
-    content: str = Field(..., description="코드 내용 (청크)")
+    content: str = Field(
+        ...,
+        description="코드 내용 (청크, 참조 저장 시 원본에서 재현 가능하면 빈 문자열)"
+    )
     filePath: str = Field(..., description="절대 파일 경로")
     projectId: str = Field(..., description="프로젝트 경로의 MD5 해시")
     projectPath: str = Field(..., description="프로젝트 루트 절대 경로")
     language: str = Field(..., description="프로그래밍 언어 (java, ts, vue 등)")
     lastModified: float = Field(..., description="파일 수정 시간 (Unix 타임스탬프)")
+    startLine: int = Field(..., description="청크 시작 줄 번호 (1부터 시작, 알 수 없으면 0)")
+    endLine: int = Field(..., description="청크 끝 줄 번호 (1부터 시작, 알 수 없으면 0)")
+    startOffset: int = Field(..., description="원본 파일에서 청크 시작 바이트 오프셋")
+    endOffset: int = Field(
+        ...,
+        description="원본 파일에서 청크 끝 바이트 오프셋 (포함하지 않음, 알 수 없으면 0)"
+    )
+    contentHash: str = Field(..., description="청크 내용의 MD5 해시")
+    project_id: str = Field(..., description="projectId 복사본 (스칼라 인덱스용 소문자 컬럼)")
+    file_path: str = Field(..., description="filePath 복사본 (스칼라 인덱스용 소문자 컬럼)")
+    last_modified: float = Field(
+        ...,
+        description="lastModified 복사본 (스칼라 인덱스용 소문자 컬럼)"
+    )
 
 
 class IndexingResult(BaseModel):
@@ -27,6 +44,68 @@ class IndexingResult(BaseModel):
     total_chunks: int = Field(..., description="생성된 전체 청크 수")
     elapsed_time: float = Field(..., description="소요 시간(초)")
     errors: List[str] = Field(default_factory=list, description="발생한 오류 목록")
+    resumed: bool = Field(default=False, description="중단된 이전 실행을 이어서 처리했는지 여부")
+    maintenance: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="인덱싱 후 자동 최적화가 실행된 경우 최적화 전후 통계"
+    )
+
+
+class ProjectEstimate(BaseModel):
+    """프로젝트별 인덱싱 작업량 추정"""
+
+    projectPath: str = Field(..., description="프로젝트 루트 경로")
+    files: int = Field(default=0, description="처리할 파일 수")
+    new_files: int = Field(default=0, description="새로 인덱싱할 파일 수")
+    updated_files: int = Field(default=0, description="재인덱싱할 업데이트 파일 수")
+    deleted_files: int = Field(default=0, description="인덱스에서 제거할 파일 수")
+    chunks: int = Field(default=0, description="기록할 전체 청크 수")
+    chunks_to_embed: int = Field(
+        default=0,
+        description="임베딩 API로 보낼 청크 수 (재사용 벡터와 중복 내용 제외)"
+    )
+    reused_chunks: int = Field(
+        default=0,
+        description="기존 벡터를 재사용하거나 같은 내용을 공유하는 청크 수"
+    )
+    tokens: int = Field(default=0, description="임베딩할 추정 토큰 수")
+
+
+class IndexingEstimate(BaseModel):
+    """index_codebase 드라이런 결과"""
+
+    mode: str = Field(
+        ...,
+        description=(
+            "실행될 작업 "
+            "(incremental: 증분 인덱싱, rebuild: 구성 변경으로 인한 전체 재인덱싱)"
+        )
+    )
+    resumed: bool = Field(
+        default=False,
+        description="중단된 이전 실행의 남은 파일만 추정했는지 여부"
+    )
+    embedding_model: str = Field(..., description="임베딩 모델")
+    projects: List[ProjectEstimate] = Field(default_factory=list, description="프로젝트별 추정")
+    total: ProjectEstimate = Field(..., description="전체 합계")
+    deleted_projects: int = Field(
+        default=0,
+        description="구성에서 제거되어 인덱스에서 삭제할 프로젝트 수"
+    )
+    estimated_cost_usd: Optional[float] = Field(
+        default=None,
+        description="추정 임베딩 비용 (가격을 알 수 없는 모델이면 None)"
+    )
+    estimated_time: Dict[str, Optional[float]] = Field(
+        default_factory=dict,
+        description="단계별 추정 소요 시간(초) (처리량 측정값이 없으면 None)"
+    )
+    throughput: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="추정에 사용한 이전 실행의 측정 처리량"
+    )
+    errors: List[str] = Field(default_factory=list, description="발생한 오류 목록")
+    elapsed_time: float = Field(..., description="드라이런 소요 시간(초)")
 
 
 class SearchResult(BaseModel):
@@ -37,3 +116,17 @@ class SearchResult(BaseModel):
     projectPath: str = Field(..., description="프로젝트 경로")
     language: str = Field(..., description="프로그래밍 언어")
     score: float = Field(..., description="유사도 점수")
+    id: str = Field(default="", description="청크 식별자")
+    startLine: int = Field(default=0, description="청크 시작 줄 번호 (알 수 없으면 0)")
+    endLine: int = Field(default=0, description="청크 끝 줄 번호 (알 수 없으면 0)")
+    chunkIds: List[str] = Field(
+        default_factory=list,
+        description="겹치거나 인접한 결과를 병합한 경우 포함된 청크 식별자 목록"
+    )
+    stale: bool = Field(
+        default=False,
+        description=(
+            "인덱싱 이후 원본 파일이 바뀌어 현재 파일의 같은 줄 범위(또는 빈 내용)를 "
+            "반환했는지 여부"
+        )
+    )
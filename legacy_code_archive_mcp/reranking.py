@@ -0,0 +1,141 @@
+"""검색 결과 다양화 재순위화
+
+벡터 검색으로 넉넉히 가져온 후보를 MMR(maximal marginal relevance)과 파일별 상한으로
+다시 골라, 같은 파일의 겹치는 청크 대신 서로 다른 관련 결과가 상위에 오도록 합니다.
+후보 벡터 행렬에 대한 NumPy 행렬 연산으로 계산하므로 후보가 수백 개여도 수 밀리초 안에 끝납니다.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pyarrow as pa
+
+# 재순위화할 최대 후보 수 (후보 간 유사도 행렬 크기 제한)
+MAX_CANDIDATES = 200
+
+
+def needs_rerank(limit: int, mmr_lambda: float, max_per_file: int) -> bool:
+    """재순위화가 결과를 바꿀 수 있는지 확인합니다.
+
+    Args:
+        limit: 반환할 결과 수
+        mmr_lambda: 관련성 가중치 (1이면 관련성만 사용)
+        max_per_file: 파일별 최대 결과 수 (0이면 제한 없음)
+
+    Returns:
+        후보를 더 가져와 재순위화해야 하면 True
+    """
+    return limit > 1 and (mmr_lambda < 1 or max_per_file > 0)
+
+
+def candidate_limit(limit: int, fetch_factor: int) -> int:
+    """재순위화를 위해 가져올 후보 수를 계산합니다.
+
+    Args:
+        limit: 반환할 결과 수
+        fetch_factor: 결과 수 대비 후보 배수
+
+    Returns:
+        가져올 후보 수
+    """
+    return max(limit, min(limit * max(fetch_factor, 1), MAX_CANDIDATES))
+
+
+def vector_matrix(column: pa.ChunkedArray) -> np.ndarray:
+    """고정 길이 리스트 벡터 컬럼을 행 단위로 정규화한 float32 행렬로 변환합니다.
+
+    Args:
+        column: 벡터 컬럼
+
+    Returns:
+        (행 수 x 차원) 행렬
+    """
+    vectors = column.combine_chunks()
+    matrix = (
+        vectors.flatten().to_numpy(zero_copy_only=False)
+        .astype(np.float32, copy=False).reshape(len(vectors), -1)
+    )
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def mmr_rerank(
+    query_vector: Sequence[float],
+    vectors: np.ndarray,
+    groups: Sequence[str],
+    limit: int,
+    mmr_lambda: float,
+    max_per_file: int = 0
+) -> List[int]:
+    """MMR로 관련성과 다양성의 균형을 맞춰 후보를 고릅니다.
+
+    각 단계에서 `lambda * 쿼리 유사도 - (1 - lambda) * 이미 고른 결과와의 최대 유사도`가
+    가장 큰 후보를 고릅니다. 파일별 상한에 도달한 파일의 후보는 제외하되, 상한 때문에
+    남은 후보가 없으면 limit을 채우기 위해 상한을 풀고 계속 고릅니다.
+
+    Args:
+        query_vector: 쿼리 벡터
+        vectors: 정규화된 후보 벡터 행렬 (후보 수 x 차원)
+        groups: 후보별 파일 경로 (vectors와 같은 순서)
+        limit: 고를 결과 수
+        mmr_lambda: 관련성 가중치 (0~1, 작을수록 다양성 우선)
+        max_per_file: 파일별 최대 결과 수 (0이면 제한 없음)
+
+    Returns:
+        고른 후보의 인덱스 리스트 (선택 순서)
+    """
+    num_candidates = len(vectors)
+    if num_candidates == 0:
+        return []
+
+    query = np.asarray(query_vector, dtype=np.float32)
+    norm = np.linalg.norm(query)
+    if norm > 0:
+        query = query / norm
+
+    relevance = vectors @ query
+    similarity = vectors @ vectors.T
+    _, group_ids = np.unique(np.asarray(groups), return_inverse=True)
+    group_counts = np.zeros(group_ids.max() + 1, dtype=np.int64)
+
+    redundancy = np.zeros(num_candidates, dtype=np.float32)
+    available = np.ones(num_candidates, dtype=bool)
+    selected: List[int] = []
+
+    while len(selected) < min(limit, num_candidates):
+        eligible = available
+        if max_per_file > 0:
+            under_cap = available & (group_counts[group_ids] < max_per_file)
+            if under_cap.any():
+                eligible = under_cap
+
+        scores = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+        index = int(np.argmax(np.where(eligible, scores, -np.inf)))
+
+        selected.append(index)
+        available[index] = False
+        group_counts[group_ids[index]] += 1
+        np.maximum(redundancy, similarity[index], out=redundancy)
+
+    return selected
+
+
+def resolve_settings(
+    mmr_lambda: Optional[float],
+    max_per_file: Optional[int],
+    default_lambda: float,
+    default_max_per_file: int
+) -> Tuple[float, int]:
+    """요청 값이 없으면 구성 기본값을 사용하고 범위를 보정합니다.
+
+    Args:
+        mmr_lambda: 요청한 관련성 가중치 (선택 사항)
+        max_per_file: 요청한 파일별 최대 결과 수 (선택 사항)
+        default_lambda: 구성된 관련성 가중치
+        default_max_per_file: 구성된 파일별 최대 결과 수
+
+    Returns:
+        (관련성 가중치, 파일별 최대 결과 수) 튜플
+    """
+    mmr_lambda = default_lambda if mmr_lambda is None else mmr_lambda
+    max_per_file = default_max_per_file if max_per_file is None else max_per_file
+    return min(max(mmr_lambda, 0.0), 1.0), max(max_per_file, 0)
@@ -0,0 +1,159 @@
+"""검색 결과 후처리 유틸리티
+
+같은 파일에서 겹치거나 인접한 결과를 병합하고, 응답 크기 예산에 맞게 스니펫을 줄입니다.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from legacy_code_archive_mcp.models import SearchResult
+
+# 응답 예산이 작아도 결과마다 보장하는 최소 스니펫 길이
+MIN_SNIPPET_CHARS = 200
+# JSON 출력에서 결과별 기본 스니펫 길이
+DEFAULT_SNIPPET_CHARS = 600
+
+
+def merge_results(results: List[SearchResult]) -> List[SearchResult]:
+    """같은 파일에서 줄 범위가 겹치거나 인접한 결과를 하나로 병합합니다.
+
+    병합된 결과는 가장 높은 점수(가장 작은 거리)를 가지며, 내용은 줄 범위 순서로 이어 붙이되
+    겹치는 줄은 한 번만 포함합니다. 줄 정보가 없는 결과는 병합하지 않습니다.
+
+    Args:
+        results: 점수 순으로 정렬된 검색 결과 리스트
+
+    Returns:
+        점수 순으로 정렬된 병합 결과 리스트
+    """
+    groups: Dict[str, List[SearchResult]] = {}
+    for result in results:
+        groups.setdefault(result.filePath, []).append(result)
+
+    merged: List[SearchResult] = []
+    for file_results in groups.values():
+        ranged = sorted((r for r in file_results if r.endLine), key=lambda r: r.startLine)
+        merged.extend(
+            r.model_copy(update={"chunkIds": [r.id]}) for r in file_results if not r.endLine
+        )
+
+        current: Optional[SearchResult] = None
+        for result in ranged:
+            if current is not None and result.startLine <= current.endLine + 1:
+                # 현재 범위 뒤로 이어지는 줄만 추가
+                lines = result.content.split("\n")
+                skip = current.endLine - result.startLine + 1
+                extra = lines[skip:] if result.endLine > current.endLine else []
+                current = current.model_copy(update={
+                    "content": "\n".join([current.content, *extra]) if extra else current.content,
+                    "endLine": max(current.endLine, result.endLine),
+                    "score": min(current.score, result.score),
+                    "id": current.id if current.score <= result.score else result.id,
+                    "chunkIds": [*current.chunkIds, result.id],
+                    "stale": current.stale or result.stale
+                })
+                continue
+
+            if current is not None:
+                merged.append(current)
+            current = result.model_copy(update={"chunkIds": [result.id]})
+
+        if current is not None:
+            merged.append(current)
+
+    return sorted(merged, key=lambda r: r.score)
+
+
+def trim_snippet(content: str, max_chars: int) -> Tuple[str, bool]:
+    """스니펫을 최대 길이 이하로 줄 단위로 자릅니다.
+
+    Args:
+        content: 스니펫 내용
+        max_chars: 최대 문자 수
+
+    Returns:
+        (잘린 스니펫, 잘렸는지 여부) 튜플
+    """
+    if len(content) <= max_chars:
+        return content, False
+
+    cut = content.rfind("\n", 0, max_chars)
+    if cut <= 0:
+        cut = max_chars
+    return content[:cut], True
+
+
+def snippet_budget(
+    num_results: int,
+    max_chars: Optional[int],
+    default: Optional[int]
+) -> Optional[int]:
+    """결과별 스니펫 최대 길이를 계산합니다.
+
+    Args:
+        num_results: 결과 수
+        max_chars: 전체 응답 예산 (없으면 None)
+        default: 예산이 없을 때의 결과별 기본 길이 (None이면 자르지 않음)
+
+    Returns:
+        결과별 최대 문자 수 또는 자르지 않으면 None
+    """
+    if not max_chars:
+        return default
+    per_result = max(MIN_SNIPPET_CHARS, max_chars // max(num_results, 1))
+    return min(per_result, default) if default else per_result
+
+
+def build_json_response(
+    results: List[SearchResult],
+    total_hits: int,
+    max_chars: Optional[int] = None,
+    **fields: Any
+) -> str:
+    """검색 결과를 구조화된 JSON 응답으로 만듭니다.
+
+    스니펫은 결과별 예산으로 자르며, 전체 응답이 max_chars를 넘으면
+    점수가 낮은 결과부터 생략합니다 (최소 1개는 포함).
+
+    Args:
+        results: 병합된 검색 결과 리스트
+        total_hits: 병합 전 결과 수
+        max_chars: 전체 응답 최대 문자 수 (선택 사항)
+        **fields: 응답 최상위에 추가할 필드 (예: query)
+
+    Returns:
+        JSON 문자열
+    """
+    limit = snippet_budget(len(results), max_chars, DEFAULT_SNIPPET_CHARS)
+    payload: Dict[str, Any] = {
+        **fields,
+        "total_hits": total_hits,
+        "omitted": 0,
+        "results": []
+    }
+
+    for i, result in enumerate(results):
+        snippet, truncated = (
+            trim_snippet(result.content, limit) if limit else (result.content, False)
+        )
+        payload["results"].append({
+            "id": result.id,
+            "chunkIds": result.chunkIds,
+            "filePath": result.filePath,
+            "projectPath": result.projectPath,
+            "language": result.language,
+            "startLine": result.startLine,
+            "endLine": result.endLine,
+            "score": round(result.score, 4),
+            "snippet": snippet,
+            "truncated": truncated,
+            "stale": result.stale
+        })
+
+        if max_chars and i > 0 and (
+            len(json.dumps(payload, indent=2, ensure_ascii=False)) > max_chars
+        ):
+            payload["results"].pop()
+            payload["omitted"] = len(results) - i
+            break
+
+    return json.dumps(payload, indent=2, ensure_ascii=False)
@@ -5,17 +5,58 @@ OpenAI 임베딩과 LanceDB 벡터 저장소를 활용한 시맨틱 검색으로
 레거시 코드 프로젝트를 인덱싱하고 검색하는 Model Context Protocol 서버입니다.
 """
 
+import argparse
+import asyncio
 import json
-from typing import Optional
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
 from fastmcp import FastMCP, Context
 from legacy_code_archive_mcp.config import load_config
 from legacy_code_archive_mcp.database import DatabaseService
 from legacy_code_archive_mcp.embeddings import EmbeddingService
 from legacy_code_archive_mcp.chunking import ChunkingService
 from legacy_code_archive_mcp.indexing import IndexingService
+from legacy_code_archive_mcp.locking import IndexerLockError
+from legacy_code_archive_mcp.models import SearchResult
+from legacy_code_archive_mcp.results import (
+    build_json_response, merge_results, snippet_budget, trim_snippet
+)
+from legacy_code_archive_mcp.snapshot import SnapshotService
+from legacy_code_archive_mcp.source_reader import read_lines
+
+OUTPUT_FORMATS = ("markdown", "json")
+STALE_NOTICE = "**주의:** 인덱싱 이후 파일이 변경되어 현재 파일의 같은 줄 범위를 표시합니다."
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """서버 시작 시 활성 테이블과 현재 구성의 호환성을 확인합니다.
+
+    이전 버전에서 만든 테이블에 새 컬럼을 추가하고, 임베딩 모델이나 청킹 파라미터가
+    바뀌었으면 백그라운드에서 섀도 재인덱싱을 시작합니다.
+    """
+    # 스키마 변경과 섀도 테이블 정리는 인덱서 잠금을 보유한 상태에서만 수행
+    # (다른 프로세스가 인덱싱 중이면 그 프로세스가 스키마를 변경하므로 건너뜀)
+    try:
+        with indexing_service.lock.hold("startup"):
+            db_service.refresh()
+            db_service.migrate_schema()
+            if not db_service.table_meta_mismatches():
+                # 구성이 원래대로 돌아온 경우 남아 있는 섀도 테이블 정리
+                db_service.discard_migration()
+    except IndexerLockError:
+        db_service.refresh()
+
+    if db_service.table_meta_mismatches():
+        indexing_service.start_rebuild()
+    yield
+
 
 # FastMCP 서버 초기화
-mcp = FastMCP("legacy_code_archive_mcp")
+mcp = FastMCP("legacy_code_archive_mcp", lifespan=lifespan)
 
 # 설정 로드
 config = load_config()
@@ -30,6 +71,146 @@ indexing_service = IndexingService(
     embedding_service,
     chunking_service
 )
+snapshot_service = SnapshotService(config, db_service)
+
+
+def _format_results_markdown(
+    title: str,
+    results: List[SearchResult],
+    max_chars: Optional[int] = None
+) -> str:
+    """검색 결과를 Markdown 형식으로 포맷팅합니다.
+
+    Args:
+        title: 결과 제목
+        results: SearchResult 객체 리스트
+        max_chars: 전체 응답 최대 문자 수.
+            넘으면 스니펫을 줄이고 점수가 낮은 결과를 생략 (선택 사항)
+
+    Returns:
+        Markdown 형식 문자열
+    """
+    output_lines = [f"# {title}", ""]
+    output_lines.append(f"{len(results)}개의 관련 코드 스니펫을 찾았습니다:")
+    output_lines.append("")
+
+    limit = snippet_budget(len(results), max_chars, None)
+    for i, result in enumerate(results, 1):
+        section = [f"## 결과 {i} - {result.language.upper()}"]
+        if result.endLine:
+            section.append(
+                f"**파일:** `{result.filePath}` (줄 {result.startLine}-{result.endLine})"
+            )
+        else:
+            section.append(f"**파일:** `{result.filePath}`")
+        section.append(f"**프로젝트:** `{result.projectPath}`")
+        section.append(f"**유사도 점수:** {result.score:.4f}")
+        section.append(f"**청크 ID:** `{result.id}`")
+        if len(result.chunkIds) > 1:
+            section.append(f"**병합된 청크:** {len(result.chunkIds)}개")
+        if result.stale:
+            section.append(STALE_NOTICE)
+        section.append("")
+
+        content, truncated = (
+            trim_snippet(result.content, limit) if limit else (result.content, False)
+        )
+        section.append("```" + result.language)
+        section.append(content)
+        section.append("```")
+        if truncated:
+            section.append("*(일부 생략됨 - `get_code` 도구로 전체 내용을 확인하세요)*")
+        section.append("")
+        section.append("---")
+        section.append("")
+
+        if max_chars and i > 1 and len("\n".join(output_lines + section)) > max_chars:
+            omitted = len(results) - i + 1
+            output_lines.append(f"*응답 크기 제한으로 {omitted}개 결과를 생략했습니다.*")
+            break
+        output_lines.extend(section)
+
+    return "\n".join(output_lines)
+
+
+def _format_results(
+    title: str,
+    results: List[SearchResult],
+    output_format: str,
+    max_chars: Optional[int],
+    **fields
+) -> str:
+    """겹치는 결과를 병합한 뒤 요청한 형식으로 포맷팅합니다.
+
+    Args:
+        title: Markdown 결과 제목
+        results: 점수 순 SearchResult 객체 리스트
+        output_format: "markdown" 또는 "json"
+        max_chars: 전체 응답 최대 문자 수 (선택 사항)
+        **fields: JSON 응답 최상위에 추가할 필드
+
+    Returns:
+        포맷팅된 문자열
+    """
+    merged = merge_results(results)
+    if output_format == "json":
+        return build_json_response(merged, len(results), max_chars, **fields)
+    return _format_results_markdown(title, merged, max_chars)
+
+
+def _format_empty(message: str, output_format: str, **fields) -> str:
+    """결과가 없을 때의 응답을 요청한 형식으로 만듭니다.
+
+    Args:
+        message: 결과가 없는 이유를 설명하는 메시지
+        output_format: "markdown" 또는 "json"
+        **fields: JSON 응답 최상위에 추가할 필드
+
+    Returns:
+        메시지 또는 빈 결과 목록과 메시지를 담은 JSON 문자열
+    """
+    if output_format == "json":
+        return json.dumps({
+            **fields,
+            "total_hits": 0,
+            "omitted": 0,
+            "results": [],
+            "message": message
+        }, indent=2, ensure_ascii=False)
+    return message
+
+
+def _format_error(message: str, output_format: str) -> str:
+    """오류 응답을 요청한 형식으로 만듭니다.
+
+    Args:
+        message: 오류 메시지
+        output_format: "markdown" 또는 "json"
+
+    Returns:
+        "오류: " 접두사가 붙은 메시지 또는 {"error": 메시지} JSON 문자열
+    """
+    if output_format == "json":
+        return json.dumps({"error": message}, indent=2, ensure_ascii=False)
+    return f"오류: {message}"
+
+
+def _parse_timestamp(value: str) -> float:
+    """ISO 8601 날짜/시각 또는 Unix 타임스탬프 문자열을 Unix 타임스탬프로 변환합니다.
+
+    Args:
+        value: 변환할 문자열
+
+    Returns:
+        Unix 타임스탬프
+
+    Raises:
+        ValueError: 형식을 해석할 수 없는 경우
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
 
 
 @mcp.tool(
@@ -42,19 +223,27 @@ indexing_service = IndexingService(
         "openWorldHint": False
     }
 )
-async def index_codebase(ctx: Context) -> str:
+async def index_codebase(ctx: Context, dry_run: bool = False) -> str:
     """PROJECT_PATHS 환경 변수에 정의된 모든 프로젝트를 스캔하고 인덱싱합니다.
 
     이 도구는 다음과 같은 증분 인덱싱을 수행합니다:
-    - 이전에 인덱싱된 파일과 파일 수정 시간 비교
+    - git 저장소는 마지막 인덱싱 커밋 이후의 변경 사항만 확인 (그 외에는 파일 수정 시간 비교)
     - 변경된 파일만 재인덱싱
     - 새 파일을 인덱스에 추가
     - 삭제된 파일을 인덱스에서 제거
 
     이 접근 방식은 OpenAI API 비용과 인덱싱 시간을 최소화합니다.
 
+    진행 상황은 LANCEDB_PATH의 저널에 기록됩니다. 이전 실행이 중단되었다면
+    전체 스캔 없이 완료되지 않은 파일만 이어서 처리합니다.
+
+    dry_run=True이면 스캔, 변경 감지, 청킹까지만 수행하고 임베딩 API 호출이나
+    LanceDB 기록 없이 처리할 파일, 청크, 토큰 수와 추정 비용, 추정 소요 시간을 반환합니다.
+    큰 인덱싱 작업을 나누거나 일정을 잡기 전에 사용하세요.
+
     Args:
         ctx: 로깅 및 진행률 보고를 위한 FastMCP 컨텍스트
+        dry_run: 인덱싱하지 않고 작업량과 소요 시간만 추정 (기본값: False)
 
     Returns:
         str: 다음 내용을 포함하는 JSON 형식 문자열:
@@ -65,7 +254,22 @@ async def index_codebase(ctx: Context) -> str:
             "deleted_files": int,      # 제거된 삭제된 파일 수
             "total_chunks": int,       # 생성된 전체 청크 수
             "elapsed_time": float,     # 소요 시간(초)
-            "errors": [str]            # 발생한 오류 목록
+            "errors": [str],           # 발생한 오류 목록
+            "resumed": bool,           # 중단된 이전 실행을 이어서 처리했는지 여부
+            "maintenance": dict | null # 자동 최적화가 실행된 경우 최적화 전후 통계
+        }
+        dry_run=True이면:
+        {
+            "mode": str,                       # incremental 또는 rebuild (구성 변경 시 재인덱싱)
+            "resumed": bool,                   # 중단된 실행의 남은 파일만 추정했는지 여부
+            "projects": [{"projectPath", "files", "new_files", "updated_files", "deleted_files",
+                          "chunks", "chunks_to_embed", "reused_chunks", "tokens"}],
+            "total": {...},                    # 전체 합계
+            "estimated_cost_usd": float | null,
+            "estimated_time": {"prepare", "embed", "store", "total"},
+                                               # 초 (측정 처리량이 없으면 null)
+            "throughput": dict | null,         # 추정에 사용한 이전 실행의 측정 처리량
+            ...
         }
 
     Example:
@@ -75,8 +279,34 @@ async def index_codebase(ctx: Context) -> str:
     await ctx.info("코드베이스 인덱싱 시작...")
 
     try:
-        # 데이터베이스 테이블이 존재하는지 확인
-        db_service._ensure_table()
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
+
+        if dry_run:
+            await ctx.report_progress(0.1, "변경 감지 및 청킹 중 (드라이런)...")
+            estimate = await indexing_service.estimate_index()
+            await ctx.info(
+                f"드라이런 완료: {estimate.total.files}개 파일, "
+                f"{estimate.total.chunks_to_embed}개 청크 임베딩 예정 "
+                f"(약 {estimate.total.tokens} 토큰)"
+            )
+            return json.dumps({
+                "dry_run": True,
+                **estimate.model_dump(),
+                "indexer": indexing_service.lock.holder()
+            }, indent=2, ensure_ascii=False)
+
+        # 임베딩 모델이나 청킹 파라미터가 바뀐 경우 섀도 재인덱싱으로 처리
+        if indexing_service.rebuild_running or db_service.table_meta_mismatches():
+            indexing_service.start_rebuild()
+            await ctx.info("구성이 변경되어 백그라운드 재인덱싱이 진행 중입니다.")
+            return json.dumps({
+                "error": (
+                    "구성 변경으로 인한 재인덱싱이 진행 중입니다. "
+                    "`index_status` 도구로 진행 상황을 확인하세요."
+                ),
+                "rebuild": indexing_service.rebuild_status
+            }, indent=2, ensure_ascii=False)
 
         # 진행률 보고
         await ctx.report_progress(0.1, "프로젝트 디렉토리 스캔 중...")
@@ -103,9 +333,19 @@ async def index_codebase(ctx: Context) -> str:
             "deleted_files": result.deleted_files,
             "total_chunks": result.total_chunks,
             "elapsed_time": round(result.elapsed_time, 2),
-            "errors": result.errors
+            "errors": result.errors,
+            "resumed": result.resumed,
+            "maintenance": result.maintenance
         }, indent=2)
 
+    except IndexerLockError as e:
+        error_msg = f"다른 프로세스가 인덱싱 중입니다. 완료 후 다시 시도하세요. ({str(e)})"
+        await ctx.error(error_msg)
+        return json.dumps({
+            "error": error_msg,
+            "indexer": indexing_service.lock.holder()
+        }, indent=2, ensure_ascii=False)
+
     except Exception as e:
         error_msg = f"인덱싱 중 오류 발생: {str(e)}"
         await ctx.error(error_msg)
@@ -128,6 +368,14 @@ async def search_legacy_code(
     query: str,
     limit: int = 5,
     project_filter: Optional[str] = None,
+    language: Optional[str] = None,
+    path_prefix: Optional[str] = None,
+    modified_since: Optional[str] = None,
+    search_mode: Optional[str] = None,
+    output_format: str = "markdown",
+    max_chars: Optional[int] = None,
+    mmr_lambda: Optional[float] = None,
+    max_per_file: Optional[int] = None,
     ctx: Optional[Context] = None
 ) -> str:
     """시맨틱 유사도를 사용하여 코드 스니펫을 검색합니다.
@@ -145,8 +393,35 @@ async def search_legacy_code(
         limit (int): 반환할 최대 결과 수 (기본값: 5, 범위: 1-20)
         project_filter (Optional[str]): 특정 프로젝트 경로로 결과 필터링
             예시: "/Users/me/old-java-project"
+        language (Optional[str]): 언어로 결과 필터링 (java, js, ts, vue)
+        path_prefix (Optional[str]): 파일 경로 접두사로 결과 필터링
+            절대 경로이거나, project_filter가 있으면 프로젝트 기준 상대 경로
+            예시: "src/main/java/com/example/util"
+        modified_since (Optional[str]): 이 시각 이후 수정된 파일만 포함
+            ISO 8601 날짜/시각 또는 Unix 타임스탬프
+            예시: "2024-01-01", "2024-01-01T09:00:00+09:00"
+        search_mode (Optional[str]): 검색 모드 (기본값: SEARCH_MODE 설정, 기본 "flat")
+            - "flat": 모든 청크를 대상으로 검색
+            - "two_stage": 파일 단위 벡터로 후보 파일을 먼저 고른 뒤 그 파일의 청크만 검색
+              (대규모 인덱스에서 더 빠름, 재현율은 `compare_search_modes`로 확인)
+        output_format (str): 출력 형식 (기본값: "markdown")
+            - "markdown": 스니펫 전체를 포함한 Markdown
+            - "json": 파일, 줄 범위, 점수, 잘린 스니펫을 담은 구조화된 JSON
+        max_chars (Optional[int]): 전체 응답 최대 문자 수
+            넘으면 스니펫을 줄이고 점수가 낮은 결과부터 생략합니다.
+        mmr_lambda (Optional[float]): 결과 재순위화의 관련성 가중치
+            (0~1, 기본값: MMR_LAMBDA 설정, 기본 0.7)
+            작을수록 서로 다른 코드를 우선하고, 1이면 유사도 순서 그대로 반환합니다.
+        max_per_file (Optional[int]): 파일별 최대 결과 수
+            (기본값: MAX_CHUNKS_PER_FILE 설정, 기본 2, 0이면 제한 없음)
+            한 파일 안을 자세히 보려면 path_prefix와 함께 0으로 지정하세요.
         ctx: 로깅을 위한 FastMCP 컨텍스트
 
+    후보를 limit보다 많이 가져와 MMR(maximal marginal relevance)과 파일별 상한으로 다시 고르므로,
+    같은 파일의 비슷한 청크 대신 서로 다른 관련 코드가 반환됩니다.
+    같은 파일에서 줄 범위가 겹치거나 인접한 결과는 하나로 병합됩니다.
+    잘린 스니펫의 전체 내용은 `get_code` 도구로 가져올 수 있습니다.
+
     Returns:
         str: 다음을 포함하는 Markdown 형식 문자열:
         - 코드 스니펫 내용
@@ -155,68 +430,677 @@ async def search_legacy_code(
         - 프로그래밍 언어
         - 유사도 점수
 
+        output_format="json"이면 다음 형식의 JSON 문자열:
+        {
+            "query": str,
+            "total_hits": int,         # 병합 전 결과 수
+            "omitted": int,            # 응답 크기 제한으로 생략된 결과 수
+            "results": [{
+                "id": str,             # 가장 점수가 높은 청크 ID
+                "chunkIds": [str],     # 병합된 청크 ID 목록
+                "filePath": str,
+                "projectPath": str,
+                "language": str,
+                "startLine": int,
+                "endLine": int,
+                "score": float,
+                "snippet": str,
+                "truncated": bool,     # 스니펫이 잘렸는지 여부
+                "stale": bool          # 인덱싱 이후 파일이 변경되었는지 여부
+            }]
+        }
+
     Example:
         사용 시기: "Java 프로젝트에서 Excel 파일 파싱 코드 찾아줘"
         query="java excel 파싱"
         반환값: 관련 코드 스니펫의 Markdown 형식 목록
 
     Error Handling:
-        - 검색 결과가 없으면 "결과 없음" 반환
-        - 먼저 인덱싱이 필요한 경우 오류 메시지 반환
+        - 검색 결과가 없으면 "결과 없음" 반환 (JSON이면 빈 results와 message)
+        - 먼저 인덱싱이 필요한 경우 오류 메시지 반환 (JSON이면 {"error": str})
     """
+    if output_format not in OUTPUT_FORMATS:
+        return f"오류: output_format은 {', '.join(OUTPUT_FORMATS)} 중 하나여야 합니다."
+
     if ctx:
         await ctx.info(f"검색 중: {query}")
 
     try:
-        # 데이터베이스 테이블이 존재하는지 확인
-        db_service._ensure_table()
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
 
         # limit 값 검증
         limit = max(1, min(20, limit))
 
-        # 쿼리 임베딩 생성
-        query_embedding = await embedding_service.generate_embedding(query)
+        # 필터 값 정규화
+        if path_prefix and project_filter and not Path(path_prefix).is_absolute():
+            path_prefix = str(Path(project_filter).resolve() / path_prefix)
+        since_timestamp = _parse_timestamp(modified_since) if modified_since else None
+
+        # 쿼리 임베딩 생성 (재인덱싱 중에도 활성 테이블을 만든 모델 사용)
+        query_embedding = await embedding_service.generate_embedding(
+            query, model=db_service.active_embedding_model
+        )
 
         # 데이터베이스 검색
         results = await db_service.search_similar(
             query_vector=query_embedding,
             limit=limit,
-            project_filter=project_filter
+            project_filter=project_filter,
+            language=language,
+            path_prefix=path_prefix,
+            modified_since=since_timestamp,
+            search_mode=search_mode,
+            mmr_lambda=mmr_lambda,
+            max_per_file=max_per_file
         )
 
         if not results:
-            return "검색 결과가 없습니다. 먼저 `index_codebase` 도구를 사용하여 코드베이스를 인덱싱하세요."
-
-        # Markdown 형식으로 결과 포맷팅
-        output_lines = [f"# '{query}' 검색 결과", ""]
-        output_lines.append(f"{len(results)}개의 관련 코드 스니펫을 찾았습니다:")
-        output_lines.append("")
-
-        for i, result in enumerate(results, 1):
-            output_lines.append(f"## 결과 {i} - {result.language.upper()}")
-            output_lines.append(f"**파일:** `{result.filePath}`")
-            output_lines.append(f"**프로젝트:** `{result.projectPath}`")
-            output_lines.append(f"**유사도 점수:** {result.score:.4f}")
-            output_lines.append("")
-            output_lines.append("```" + result.language)
-            output_lines.append(result.content)
-            output_lines.append("```")
-            output_lines.append("")
-            output_lines.append("---")
-            output_lines.append("")
-
-        return "\n".join(output_lines)
+            return _format_empty(
+                "검색 결과가 없습니다. "
+                "먼저 `index_codebase` 도구를 사용하여 코드베이스를 인덱싱하세요.",
+                output_format,
+                query=query
+            )
+
+        # 겹치는 결과를 병합하여 요청한 형식으로 포맷팅
+        return _format_results(
+            f"'{query}' 검색 결과", results, output_format, max_chars, query=query
+        )
 
     except Exception as e:
         error_msg = f"검색 중 오류 발생: {str(e)}"
         if ctx:
             await ctx.error(error_msg)
-        return f"오류: {error_msg}"
+        return _format_error(error_msg, output_format)
+
+
+@mcp.tool(
+    name="find_similar",
+    annotations={
+        "title": "Find Similar Legacy Code",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+async def find_similar(
+    file_path: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    chunk_id: Optional[str] = None,
+    limit: int = 5,
+    project_filter: Optional[str] = None,
+    language: Optional[str] = None,
+    output_format: str = "markdown",
+    max_chars: Optional[int] = None,
+    mmr_lambda: Optional[float] = None,
+    max_per_file: Optional[int] = None,
+    ctx: Optional[Context] = None
+) -> str:
+    """인덱싱된 코드와 유사한 코드를 다른 파일에서 찾습니다 ("more like this").
+
+    코드를 다시 임베딩하지 않고 인덱스에 이미 저장된 벡터를 쿼리로 사용하므로
+    OpenAI API 호출 없이 빠르게 동작합니다. 줄 범위를 지정하면 해당 범위와 겹치는
+    청크 벡터의 평균을, 지정하지 않으면 파일 전체 청크 벡터의 평균을 사용합니다.
+    원본 파일은 결과에서 제외됩니다.
+
+    Args:
+        file_path (Optional[str]): 원본 파일의 절대 경로 (chunk_id가 없으면 필수)
+            예시: "/Users/me/old-java-project/src/ExcelUtil.java"
+        start_line (Optional[int]): 원본 줄 범위 시작 (1부터 시작)
+        end_line (Optional[int]): 원본 줄 범위 끝
+        chunk_id (Optional[str]): 검색 결과에 표시된 청크 ID (file_path 대신 사용 가능)
+        limit (int): 반환할 최대 결과 수 (기본값: 5, 범위: 1-20)
+        project_filter (Optional[str]): 특정 프로젝트 경로로 결과 필터링
+        language (Optional[str]): 언어로 결과 필터링 (java, js, ts, vue)
+        output_format (str): 출력 형식 ("markdown" 또는 "json", 기본값: "markdown")
+        max_chars (Optional[int]): 전체 응답 최대 문자 수
+        mmr_lambda (Optional[float]): 결과 재순위화의 관련성 가중치 (search_legacy_code와 동일)
+        max_per_file (Optional[int]): 파일별 최대 결과 수 (search_legacy_code와 동일)
+        ctx: 로깅을 위한 FastMCP 컨텍스트
+
+    Returns:
+        str: search_legacy_code와 동일한 형식의 Markdown 또는 JSON 문자열
+
+    Example:
+        사용 시기: "ExcelUtil.java의 parse 메서드와 비슷한 코드 다른 프로젝트에서 찾아줘"
+        file_path="/Users/me/old-java-project/src/ExcelUtil.java", start_line=40, end_line=85
+        반환값: 유사한 코드 스니펫의 Markdown 형식 목록
+
+    Error Handling:
+        - 원본 파일이나 청크가 인덱싱되어 있지 않으면 오류 메시지 반환 (JSON이면 {"error": str})
+        - 유사한 코드가 없으면 안내 메시지 반환 (JSON이면 빈 results와 message)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return f"오류: output_format은 {', '.join(OUTPUT_FORMATS)} 중 하나여야 합니다."
+
+    if not file_path and not chunk_id:
+        return _format_error("file_path 또는 chunk_id 중 하나를 지정해야 합니다.", output_format)
+
+    if ctx:
+        await ctx.info(f"유사 코드 검색 중: {chunk_id or file_path}")
+
+    try:
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
+
+        # limit 값 검증
+        limit = max(1, min(20, limit))
+
+        source_path = str(Path(file_path).resolve()) if file_path else None
+        try:
+            results = await db_service.find_similar(
+                file_path=source_path,
+                start_line=start_line,
+                end_line=end_line,
+                chunk_id=chunk_id,
+                limit=limit,
+                project_filter=project_filter,
+                language=language,
+                mmr_lambda=mmr_lambda,
+                max_per_file=max_per_file
+            )
+        except ValueError:
+            return _format_error(
+                "원본 코드를 인덱스에서 찾을 수 없습니다. 경로나 청크 ID를 확인하거나 "
+                "`index_codebase` 도구로 먼저 인덱싱하세요.",
+                output_format
+            )
+
+        source = chunk_id or source_path
+        if start_line or end_line:
+            source = f"{source} (줄 {start_line or 1}-{end_line or '끝'})"
+
+        if not results:
+            return _format_empty("유사한 코드를 찾지 못했습니다.", output_format, source=source)
+
+        return _format_results(
+            f"`{source}`와 유사한 코드", results, output_format, max_chars, source=source
+        )
+
+    except Exception as e:
+        error_msg = f"유사 코드 검색 중 오류 발생: {str(e)}"
+        if ctx:
+            await ctx.error(error_msg)
+        return _format_error(error_msg, output_format)
+
+
+@mcp.tool(
+    name="get_code",
+    annotations={
+        "title": "Get Indexed Code",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+async def get_code(
+    chunk_id: Optional[str] = None,
+    file_path: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None
+) -> str:
+    """검색 결과의 전체 코드를 가져옵니다.
+
+    `search_legacy_code`나 `find_similar`의 스니펫이 잘렸거나 병합된 결과의
+    전체 내용이 필요할 때 사용합니다. 청크 ID로 청크 하나를, 또는 파일 경로와
+    줄 범위로 현재 파일의 해당 부분을 가져옵니다. 인덱싱된 파일만 읽을 수 있습니다.
+
+    Args:
+        chunk_id (Optional[str]): 검색 결과의 청크 ID
+        file_path (Optional[str]): 인덱싱된 파일의 절대 경로 (chunk_id가 없으면 필수)
+        start_line (Optional[int]): 줄 범위 시작 (기본값: 1)
+        end_line (Optional[int]): 줄 범위 끝 (기본값: 파일 끝)
+
+    Returns:
+        str: 파일 경로와 줄 범위가 표시된 Markdown 코드 블록
+
+    Example:
+        사용 시기: 병합된 검색 결과(줄 40-120)의 전체 코드를 보고 싶을 때
+        file_path="/Users/me/old-java-project/src/ExcelUtil.java", start_line=40, end_line=120
+    """
+    if not chunk_id and not file_path:
+        return "오류: chunk_id 또는 file_path 중 하나를 지정해야 합니다."
+
+    try:
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
+
+        if chunk_id:
+            result = await db_service.get_chunk(chunk_id)
+            if result is None:
+                return "청크를 인덱스에서 찾을 수 없습니다. 청크 ID를 확인하세요."
+        else:
+            # 인덱싱된 파일만 읽도록 제한
+            source_path = str(Path(file_path).resolve())
+            indexed = await db_service.get_file_mtimes([source_path])
+            if source_path not in indexed:
+                return (
+                    "인덱싱된 파일이 아닙니다. "
+                    "경로를 확인하거나 `index_codebase` 도구로 먼저 인덱싱하세요."
+                )
+
+            first_line = max(start_line or 1, 1)
+            content = read_lines(source_path, first_line, end_line or sys.maxsize)
+            if content is None:
+                return "파일을 읽을 수 없습니다. 인덱싱 이후 삭제되었을 수 있습니다."
+            last_line = end_line or first_line + content.count("\n")
+            language = Path(source_path).suffix.lstrip(".")
+            result = SearchResult(
+                content=content,
+                filePath=source_path,
+                projectPath="",
+                language=language,
+                score=0.0,
+                startLine=first_line,
+                endLine=last_line
+            )
+
+        lines = [f"**파일:** `{result.filePath}` (줄 {result.startLine}-{result.endLine})"]
+        if result.stale:
+            lines.append(STALE_NOTICE)
+        lines.extend(["", "```" + result.language, result.content, "```"])
+        return "\n".join(lines)
+
+    except Exception as e:
+        return f"오류: 코드 조회 중 오류 발생: {str(e)}"
+
+
+@mcp.tool(
+    name="index_status",
+    annotations={
+        "title": "Show Code Index Status",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+async def index_status() -> str:
+    """활성 인덱스 테이블의 구성과 재인덱싱 진행 상황을 보여줍니다.
+
+    활성 테이블은 자신을 만든 임베딩 모델, 벡터 차원, 청킹 파라미터를 기록합니다.
+    현재 구성과 다르면 서버 시작 시(또는 `index_codebase` 호출 시) 백그라운드에서
+    섀도 테이블 재인덱싱이 시작되며, 완료되면 활성 테이블이 원자적으로 교체됩니다.
+    그동안 검색은 기존 테이블에서 계속 동작합니다.
+
+    Returns:
+        str: 다음 내용을 포함하는 JSON 형식 문자열:
+        {
+            "table": {                 # 활성 테이블 메타데이터 (없으면 null)
+                "name": str,
+                "embeddingModel": str,
+                "dimensions": int,
+                "chunkSize": int,
+                "chunkOverlap": int,
+                "schemaVersion": int
+            },
+            "total_chunks": int,       # 활성 테이블의 전체 청크 수
+            "mismatches": [str],       # 현재 구성과 다른 메타데이터 항목
+            "rebuild": {               # 이 프로세스의 재인덱싱 상태
+                "status": str,         # idle, running, waiting, completed, failed
+                "processedFiles": int,
+                "totalFiles": int,
+                "embeddedChunks": int
+            },
+            "indexer": {               # 인덱서 잠금 보유자 (없으면 null)
+                "pid": int,
+                "operation": str,      # index, rebuild, optimize 등
+                "since": float
+            }
+        }
+    """
+    try:
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
+
+        return json.dumps({
+            "table": db_service.get_table_meta(),
+            "total_chunks": await db_service.count_chunks(),
+            "mismatches": db_service.table_meta_mismatches(),
+            "rebuild": indexing_service.rebuild_status,
+            "indexer": indexing_service.lock.holder()
+        }, indent=2, ensure_ascii=False)
+
+    except Exception as e:
+        return json.dumps({
+            "error": f"상태 조회 중 오류 발생: {str(e)}"
+        }, indent=2, ensure_ascii=False)
+
+
+@mcp.tool(
+    name="compare_search_modes",
+    annotations={
+        "title": "Compare Flat and Two-Stage Search",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False
+    }
+)
+async def compare_search_modes(sample_size: int = 50, limit: int = 10) -> str:
+    """2단계(파일 → 청크) 검색의 재현율과 지연 시간을 전체(flat) 검색과 비교합니다.
+
+    인덱스에서 무작위로 뽑은 청크 벡터를 쿼리로 사용하므로 임베딩 API를 호출하지 않습니다.
+    재현율은 전체 검색의 상위 `limit`개 결과 중 2단계 검색에서도 찾은 비율입니다.
+    2단계 검색은 후보 파일의 청크만 읽으므로 청크가 많은 인덱스일수록 유리하며,
+    작은 인덱스에서는 파일 벡터 검색 비용 때문에 전체 검색보다 느릴 수 있습니다.
+
+    Args:
+        sample_size (int): 사용할 쿼리 수 (기본값: 50, 범위: 1-500)
+        limit (int): 비교할 상위 결과 수 (기본값: 10, 범위: 1-100)
+
+    Returns:
+        str: 다음 내용을 포함하는 JSON 형식 문자열:
+        {
+            "sample_size": int,        # 실제 사용한 쿼리 수
+            "limit": int,              # recall@limit
+            "candidate_files": int,    # 1단계에서 고르는 후보 파일 수
+            "total_chunks": int,       # 전체 청크 수
+            "total_files": int,        # 파일 벡터 수
+            "file_filter_indexed": bool,  # 2단계 파일 필터가 스칼라 인덱스를 사용하는지 여부
+            "recall": float,           # 평균 재현율 (0-1)
+            "flat_ms": float,          # 전체 검색 평균 지연 시간(ms)
+            "two_stage_ms": float      # 2단계 검색 평균 지연 시간(ms)
+        }
+    """
+    try:
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
+
+        result = await db_service.compare_search_modes(
+            sample_size=max(1, min(500, sample_size)),
+            limit=max(1, min(100, limit))
+        )
+        if not result:
+            return json.dumps({
+                "error": (
+                    "인덱스가 없습니다. "
+                    "먼저 `index_codebase` 도구를 사용하여 코드베이스를 인덱싱하세요."
+                )
+            }, indent=2, ensure_ascii=False)
+        return json.dumps(result, indent=2)
+
+    except Exception as e:
+        return json.dumps({
+            "error": f"검색 모드 비교 중 오류 발생: {str(e)}"
+        }, indent=2, ensure_ascii=False)
+
+
+@mcp.tool(
+    name="optimize_index",
+    annotations={
+        "title": "Optimize Code Index Storage",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+async def optimize_index(ctx: Context) -> str:
+    """인덱스 테이블을 압축하고 오래된 버전을 정리합니다.
+
+    증분 인덱싱의 추가/삭제마다 작은 프래그먼트와 새 버전이 쌓이므로,
+    이 도구는 다음 유지 보수 작업을 수행합니다:
+    - 작은 프래그먼트를 큰 파일로 병합
+    - 보존 기간(version_retention_days)이 지난 이전 버전 정리
+    - 새로 추가된 데이터를 인덱스에 반영
+
+    인덱싱 후 구성된 임계값을 넘으면 자동으로도 실행됩니다.
+
+    Args:
+        ctx: 로깅을 위한 FastMCP 컨텍스트
+
+    Returns:
+        str: 다음 내용을 포함하는 JSON 형식 문자열:
+        {
+            "before": {                # 최적화 전 통계
+                "version": int,
+                "num_versions": int,
+                "num_rows": int,
+                "num_fragments": int,
+                "num_small_fragments": int,
+                "data_bytes": int,
+                "disk_bytes": int
+            },
+            "after": {...}             # 최적화 후 통계 (동일한 형식)
+        }
+
+    Example:
+        사용 시기: 사용자가 "인덱스 정리해줘" 또는 "인덱스 용량 줄여줘"라고 요청할 때
+        반환값: 최적화 전후 프래그먼트 수와 크기
+    """
+    await ctx.info("인덱스 최적화 시작...")
+
+    try:
+        # 활성 테이블 핸들 확인 (상태가 바뀐 경우에만 다시 열기)
+        db_service.refresh()
+
+        with indexing_service.lock.hold("optimize"):
+            db_service.refresh()
+            result = await db_service.optimize_table()
+        if not result:
+            return json.dumps({
+                "error": (
+                    "인덱스가 없습니다. "
+                    "먼저 `index_codebase` 도구를 사용하여 코드베이스를 인덱싱하세요."
+                )
+            }, indent=2, ensure_ascii=False)
+
+        await ctx.info(
+            f"최적화 완료: 프래그먼트 {result['before']['num_fragments']}개 → "
+            f"{result['after']['num_fragments']}개"
+        )
+        return json.dumps(result, indent=2)
+
+    except IndexerLockError as e:
+        error_msg = f"다른 프로세스가 인덱싱 중입니다. 완료 후 다시 시도하세요. ({str(e)})"
+        await ctx.error(error_msg)
+        return json.dumps({
+            "error": error_msg,
+            "indexer": indexing_service.lock.holder()
+        }, indent=2, ensure_ascii=False)
+
+    except Exception as e:
+        error_msg = f"최적화 중 오류 발생: {str(e)}"
+        await ctx.error(error_msg)
+        return json.dumps({
+            "error": error_msg
+        }, indent=2)
+
+
+@mcp.tool(
+    name="export_index",
+    annotations={
+        "title": "Export Code Index Snapshot",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+async def export_index(output_path: str, ctx: Context) -> str:
+    """현재 인덱스를 이식 가능한 스냅샷 파일로 내보냅니다.
+
+    청크 테이블(벡터 포함), 임베딩 모델과 청킹 파라미터, 프로젝트별 인덱싱 상태를
+    zstd로 압축한 Arrow IPC 스트림 파일 하나로 기록합니다. 다른 머신이나 CI에서
+    `import_index`로 가져오면 임베딩 API 호출 없이 바로 검색할 수 있습니다.
+
+    Args:
+        output_path (str): 기록할 스냅샷 파일 경로
+            예시: "/shared/archive-index.arrow"
+        ctx: 로깅을 위한 FastMCP 컨텍스트
+
+    Returns:
+        str: 다음 내용을 포함하는 JSON 형식 문자열:
+        {
+            "path": str,               # 스냅샷 파일 경로
+            "num_rows": int,           # 내보낸 청크 수
+            "bytes": int,              # 스냅샷 파일 크기
+            "table": dict,             # 테이블 메타데이터 (임베딩 모델, 청킹 파라미터 등)
+            "projects": [str],         # 포함된 프로젝트 경로
+            "elapsed_time": float
+        }
+    """
+    await ctx.info(f"인덱스 내보내기: {output_path}")
+
+    try:
+        result = await snapshot_service.export_snapshot(output_path)
+        return json.dumps(result, indent=2, ensure_ascii=False)
+
+    except IndexerLockError as e:
+        return json.dumps({
+            "error": f"다른 프로세스가 인덱싱 중입니다. 완료 후 다시 시도하세요. ({str(e)})",
+            "indexer": indexing_service.lock.holder()
+        }, indent=2, ensure_ascii=False)
+
+    except Exception as e:
+        error_msg = f"내보내기 중 오류 발생: {str(e)}"
+        await ctx.error(error_msg)
+        return json.dumps({
+            "error": error_msg
+        }, indent=2, ensure_ascii=False)
+
+
+@mcp.tool(
+    name="import_index",
+    annotations={
+        "title": "Import Code Index Snapshot",
+        "readOnlyHint": False,
+        "destructiveHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False
+    }
+)
+async def import_index(
+    snapshot_path: str,
+    path_map: Optional[Dict[str, str]] = None,
+    ctx: Optional[Context] = None
+) -> str:
+    """스냅샷 파일을 가져와 현재 인덱스를 교체합니다.
+
+    스냅샷을 새 테이블로 스트리밍하며 프로젝트 경로를 이 머신의 경로로 바꾸고,
+    완료되면 활성 테이블을 원자적으로 교체합니다. 스냅샷의 임베딩 모델은 현재
+    EMBEDDING_MODEL과 같아야 합니다. 가져온 뒤 `index_codebase`를 실행하면
+    스냅샷 이후 변경된 파일만 인덱싱됩니다 (내용이 같은 청크는 벡터 재사용).
+
+    Args:
+        snapshot_path (str): 가져올 스냅샷 파일 경로
+        path_map (Optional[Dict[str, str]]): 스냅샷의 프로젝트 경로 -> 이 머신의 프로젝트 경로
+            예시: {"/home/ci/old-java": "/Users/me/old-java"}
+        ctx: 로깅을 위한 FastMCP 컨텍스트
+
+    Returns:
+        str: 다음 내용을 포함하는 JSON 형식 문자열:
+        {
+            "num_rows": int,           # 가져온 청크 수
+            "table": str,              # 새 활성 테이블 이름
+            "projects": [str],         # 가져온 프로젝트 경로
+            "unmapped_projects": [str],# PROJECT_PATHS에 없는 프로젝트 경로
+            "mismatches": [str],       # 현재 구성과 다른 항목 (있으면 재인덱싱 시작)
+            "unmapped_rows": int,      # 파일 경로가 프로젝트 루트 아래에 없어 바꾸지 못한 청크 수
+            "errors": [str],           # 만들지 못한 스칼라 인덱스 등의 오류
+            "elapsed_time": float
+        }
+    """
+    if ctx:
+        await ctx.info(f"인덱스 가져오기: {snapshot_path}")
+
+    if indexing_service.rebuild_running:
+        return json.dumps({
+            "error": (
+                "재인덱싱이 진행 중입니다. "
+                "`index_status` 도구로 진행 상황을 확인한 뒤 다시 시도하세요."
+            )
+        }, indent=2, ensure_ascii=False)
+
+    try:
+        result = await snapshot_service.import_snapshot(snapshot_path, path_map)
+
+        # 청킹 파라미터 등이 현재 구성과 다르면 벡터를 재사용하는 재인덱싱 시작
+        if result["mismatches"]:
+            indexing_service.start_rebuild()
+        return json.dumps(result, indent=2, ensure_ascii=False)
+
+    except IndexerLockError as e:
+        return json.dumps({
+            "error": f"다른 프로세스가 인덱싱 중입니다. 완료 후 다시 시도하세요. ({str(e)})",
+            "indexer": indexing_service.lock.holder()
+        }, indent=2, ensure_ascii=False)
+
+    except Exception as e:
+        error_msg = f"가져오기 중 오류 발생: {str(e)}"
+        if ctx:
+            await ctx.error(error_msg)
+        return json.dumps({
+            "error": error_msg
+        }, indent=2, ensure_ascii=False)
+
+
+def _parse_path_map(items: List[str]) -> Dict[str, str]:
+    """`이전경로=새경로` 형식의 인자를 경로 매핑으로 변환합니다.
+
+    Args:
+        items: 명령줄 인자 리스트
+
+    Returns:
+        경로 매핑 딕셔너리
+
+    Raises:
+        ValueError: 형식이 잘못된 경우
+    """
+    path_map = {}
+    for item in items:
+        old, separator, new = item.partition("=")
+        if not separator or not old or not new:
+            raise ValueError(f"Invalid path mapping (expected OLD=NEW): {item}")
+        path_map[old] = new
+    return path_map
 
 
 def main():
-    """패키지 진입점"""
-    mcp.run()
+    """패키지 진입점
+
+    인자 없이 실행하면 MCP 서버를 시작하고, `export`/`import` 하위 명령은
+    서버 없이 스냅샷을 내보내거나 가져옵니다.
+    """
+    parser = argparse.ArgumentParser(prog="legacy-code-archive-mcp")
+    subparsers = parser.add_subparsers(dest="command")
+
+    export_parser = subparsers.add_parser("export", help="인덱스를 스냅샷 파일로 내보내기")
+    export_parser.add_argument("output_path", help="기록할 스냅샷 파일 경로")
+
+    import_parser = subparsers.add_parser("import", help="스냅샷 파일을 가져와 인덱스 교체")
+    import_parser.add_argument("snapshot_path", help="가져올 스냅샷 파일 경로")
+    import_parser.add_argument(
+        "--map",
+        action="append",
+        default=[],
+        metavar="OLD=NEW",
+        help="스냅샷의 프로젝트 경로를 이 머신의 경로로 바꾸기 (여러 번 지정 가능)"
+    )
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        mcp.run()
+        return
+
+    try:
+        if args.command == "export":
+            result = asyncio.run(snapshot_service.export_snapshot(args.output_path))
+        else:
+            result = asyncio.run(
+                snapshot_service.import_snapshot(args.snapshot_path, _parse_path_map(args.map))
+            )
+    except (ValueError, OSError, IndexerLockError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
 
 
 # 서버 실행
@@ -0,0 +1,335 @@
+"""인덱스 스냅샷 내보내기/가져오기
+
+활성 청크 테이블을 zstd로 압축한 Arrow IPC 스트림 파일 하나로 내보내고,
+다른 머신에서 임베딩 API 호출 없이 가져옵니다. 테이블 메타데이터(임베딩 모델,
+청킹 파라미터)와 프로젝트별 인덱싱 상태는 스트림 스키마 메타데이터에 함께 기록됩니다.
+내보내기와 가져오기 모두 레코드 배치 단위로 스트리밍하므로 전체 인덱스를 메모리에 올리지 않습니다.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+from legacy_code_archive_mcp.config import Config
+from legacy_code_archive_mcp.database import DatabaseService
+from legacy_code_archive_mcp.journal import IndexJournal
+from legacy_code_archive_mcp.locking import IndexerLock
+
+
+class SnapshotService:
+    """인덱스 스냅샷을 내보내고 가져오는 서비스"""
+
+    FORMAT_VERSION = 1
+    # 스키마 메타데이터에서 스냅샷 정보를 담는 키
+    METADATA_KEY = b"legacy_code_archive_snapshot"
+    BATCH_SIZE = 10000
+
+    def __init__(self, config: Config, db_service: DatabaseService):
+        """스냅샷 서비스를 초기화합니다.
+
+        Args:
+            config: 구성 객체
+            db_service: 데이터베이스 서비스 인스턴스
+        """
+        self.config = config
+        self.db = db_service
+        self.lock = IndexerLock(config.lancedb_path)
+        self.journal = IndexJournal(config.lancedb_path)
+
+    async def export_snapshot(self, output_path: str) -> Dict[str, Any]:
+        """활성 테이블과 메타데이터를 스냅샷 파일로 내보냅니다.
+
+        인덱싱과 섞이지 않도록 인덱서 잠금을 보유한 상태에서 테이블과 상태를 함께 읽습니다.
+
+        Args:
+            output_path: 기록할 스냅샷 파일 경로
+
+        Returns:
+            내보낸 행 수, 파일 크기, 테이블 메타데이터를 담은 딕셔너리
+
+        Raises:
+            ValueError: 내보낼 인덱스가 없는 경우
+            IndexerLockError: 다른 프로세스가 인덱서 잠금을 보유하고 있는 경우
+        """
+        start_time = time.time()
+
+        with self.lock.hold("export"):
+            self.db.refresh()
+            reader = self.db.scan_batches(self.BATCH_SIZE)
+            if reader is None:
+                raise ValueError("No index to export")
+
+            projects = self.db.state.data.get("projects", {})
+            info = {
+                "formatVersion": self.FORMAT_VERSION,
+                "exportedAt": time.time(),
+                "numRows": await self.db.count_chunks(),
+                "table": self.db.get_table_meta(),
+                "projects": projects,
+                # 파일 경로는 해석된 프로젝트 루트 기준으로 저장되므로
+                # 가져올 때 이 루트를 기준으로 경로를 바꿈
+                "roots": {
+                    project["projectPath"]: str(Path(project["projectPath"]).resolve())
+                    for project in projects.values() if "projectPath" in project
+                }
+            }
+            schema = reader.schema.with_metadata({
+                self.METADATA_KEY: json.dumps(info, ensure_ascii=False).encode("utf-8")
+            })
+
+            # 임시 파일에 기록한 뒤 교체 (중단되어도 불완전한 스냅샷이 남지 않음)
+            path = Path(output_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            options = pa.ipc.IpcWriteOptions(compression="zstd")
+            with pa.OSFile(str(tmp_path), "wb") as sink, \
+                    pa.ipc.new_stream(sink, schema, options=options) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+            os.replace(tmp_path, path)
+
+        return {
+            "path": str(path),
+            "num_rows": info["numRows"],
+            "bytes": path.stat().st_size,
+            "table": info["table"],
+            "projects": sorted(
+                project["projectPath"] for project in info["projects"].values()
+                if "projectPath" in project
+            ),
+            "elapsed_time": round(time.time() - start_time, 2)
+        }
+
+    @staticmethod
+    def read_snapshot_info(input_path: str) -> Dict[str, Any]:
+        """스냅샷 파일의 메타데이터만 읽습니다.
+
+        Args:
+            input_path: 스냅샷 파일 경로
+
+        Returns:
+            형식 버전, 행 수, 테이블 메타데이터, 프로젝트 상태를 담은 딕셔너리
+
+        Raises:
+            ValueError: 스냅샷 파일이 아닌 경우
+        """
+        with pa.OSFile(input_path, "rb") as source:
+            schema = pa.ipc.open_stream(source).schema
+        return SnapshotService._parse_info(schema)
+
+    @classmethod
+    def _parse_info(cls, schema: pa.Schema) -> Dict[str, Any]:
+        """스트림 스키마에서 스냅샷 메타데이터를 읽습니다.
+
+        Args:
+            schema: Arrow 스키마
+
+        Returns:
+            스냅샷 메타데이터 딕셔너리
+
+        Raises:
+            ValueError: 스냅샷 메타데이터가 없거나 지원하지 않는 형식 버전인 경우
+        """
+        raw = (schema.metadata or {}).get(cls.METADATA_KEY)
+        if raw is None:
+            raise ValueError("Not an index snapshot file")
+        info = json.loads(raw.decode("utf-8"))
+        if info.get("formatVersion") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {info.get('formatVersion')}")
+        return info
+
+    @staticmethod
+    def _normalize_path_map(path_map: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """경로 매핑의 끝 구분자를 정리합니다.
+
+        Args:
+            path_map: 스냅샷의 프로젝트 경로 -> 이 머신의 프로젝트 경로
+
+        Returns:
+            정리된 경로 매핑
+        """
+        return {
+            old.rstrip("/\\") or old: new.rstrip("/\\") or new
+            for old, new in (path_map or {}).items()
+        }
+
+    def _remap_batch(
+        self,
+        batch: pa.RecordBatch,
+        path_map: Dict[str, str],
+        roots: Dict[str, str]
+    ) -> Tuple[pa.RecordBatch, int]:
+        """레코드 배치의 프로젝트 경로와 파일 경로를 바꾸고 프로젝트 ID를 다시 계산합니다.
+
+        Args:
+            batch: 스냅샷 레코드 배치
+            path_map: 스냅샷의 프로젝트 경로 -> 이 머신의 프로젝트 경로
+            roots: 스냅샷의 프로젝트 경로 -> 내보낸 머신에서 해석된 프로젝트 루트
+
+        Returns:
+            (경로가 바뀐 레코드 배치, 프로젝트 경로는 바뀌었지만 파일 경로가 루트 아래에 없어
+            바뀌지 않은 행 수) 튜플
+        """
+        project_paths = batch.column("projectPath")
+        file_paths = batch.column("filePath")
+        unmapped_rows = 0
+
+        for old, new in path_map.items():
+            mask = pc.equal(project_paths, old)
+            # 파일 경로는 해석된 절대 경로로 저장되므로 양쪽 모두 해석된 루트를 사용
+            # (루트가 기록되지 않은 스냅샷은 프로젝트 경로가 해석된 경로라고 가정)
+            old_root = roots.get(old, old)
+            new_root = str(Path(new).resolve())
+            under_old = pc.and_(mask, pc.starts_with(file_paths, old_root + os.sep))
+            file_paths = pc.if_else(
+                under_old,
+                pc.binary_join_element_wise(
+                    new_root, pc.utf8_slice_codeunits(file_paths, len(old_root)), ""
+                ),
+                file_paths
+            )
+            project_paths = pc.if_else(mask, new, project_paths)
+            unmapped_rows += (pc.sum(mask).as_py() or 0) - (pc.sum(under_old).as_py() or 0)
+
+        # 프로젝트 ID는 프로젝트 경로의 해시이므로 고유한 경로에 대해서만 계산
+        unique_paths = pc.unique(project_paths)
+        project_ids = pc.take(
+            pa.array([
+                self.db.compute_project_id(project_path)
+                for project_path in unique_paths.to_pylist()
+            ], pa.string()),
+            pc.index_in(project_paths, value_set=unique_paths)
+        )
+
+        columns = {
+            "projectPath": project_paths,
+            "filePath": file_paths,
+            "projectId": project_ids,
+            # 스칼라 인덱스용 복사본 컬럼 (이전 테이블에서 내보낸 스냅샷에는 없음)
+            "file_path": file_paths,
+            "project_id": project_ids
+        }
+        return pa.RecordBatch.from_arrays(
+            [
+                columns.get(name, batch.column(name)).cast(batch.schema.field(name).type)
+                for name in batch.schema.names
+            ],
+            schema=batch.schema
+        ), unmapped_rows
+
+    def _remap_projects(
+        self,
+        projects: Dict[str, Dict[str, Any]],
+        path_map: Dict[str, str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """프로젝트별 인덱싱 상태의 경로와 ID를 바꿉니다.
+
+        Args:
+            projects: 스냅샷의 프로젝트 ID -> 상태
+            path_map: 스냅샷의 프로젝트 경로 -> 이 머신의 프로젝트 경로
+
+        Returns:
+            새 프로젝트 ID -> 상태 딕셔너리
+        """
+        remapped: Dict[str, Dict[str, Any]] = {}
+        for project_id, project_state in projects.items():
+            project_path = project_state.get("projectPath")
+            if project_path in path_map:
+                project_path = path_map[project_path]
+                project_id = self.db.compute_project_id(project_path)
+                project_state = {**project_state, "projectPath": project_path}
+            remapped[project_id] = project_state
+        return remapped
+
+    async def import_snapshot(
+        self,
+        input_path: str,
+        path_map: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """스냅샷을 새 테이블로 가져온 뒤 활성 테이블로 교체합니다.
+
+        레코드 배치를 스트리밍하며 프로젝트 경로를 바꿔 새 테이블에 기록하고,
+        파일 단위 벡터와 스칼라 인덱스를 만든 뒤 활성 테이블 포인터를 원자적으로 교체합니다.
+        스냅샷의 청킹 파라미터가 현재 구성과 다르면 교체 후 재인덱싱이 필요합니다
+        (임베딩 모델이 같으므로 벡터는 재사용됩니다).
+
+        Args:
+            input_path: 스냅샷 파일 경로
+            path_map: 스냅샷의 프로젝트 경로 -> 이 머신의 프로젝트 경로 (선택 사항)
+
+        Returns:
+            가져온 행 수, 새 테이블 이름, 프로젝트 경로, 현재 구성과 다른 항목,
+            파일 경로를 바꾸지 못한 행 수를 담은 딕셔너리
+
+        Raises:
+            ValueError: 스냅샷 파일이 아니거나 임베딩 모델이 현재 구성과 다른 경우
+            IndexerLockError: 다른 프로세스가 인덱서 잠금을 보유하고 있는 경우
+        """
+        start_time = time.time()
+        path_map = self._normalize_path_map(path_map)
+
+        with self.lock.hold("import"), pa.OSFile(input_path, "rb") as source:
+            reader = pa.ipc.open_stream(source)
+            info = self._parse_info(reader.schema)
+
+            snapshot_meta = dict(info.get("table") or {})
+            if snapshot_meta.get("embeddingModel") != self.config.embedding_model:
+                # 모델이 다르면 검색 쿼리와 벡터 공간이 맞지 않고 전체 재임베딩이 필요함
+                raise ValueError(
+                    f"Snapshot embedding model {snapshot_meta.get('embeddingModel')!r} "
+                    f"does not match configured model {self.config.embedding_model!r}"
+                )
+
+            self.db.refresh()
+            self.db.discard_migration()
+
+            table_name = f"{self.db.TABLE_NAME}_{int(time.time())}"
+            schema = reader.schema.remove_metadata()
+            roots = info.get("roots", {})
+            num_rows = 0
+            unmapped_rows = 0
+
+            def batches() -> Iterator[pa.RecordBatch]:
+                nonlocal num_rows, unmapped_rows
+                for batch in reader:
+                    num_rows += batch.num_rows
+                    remapped, unmapped = self._remap_batch(batch, path_map, roots)
+                    unmapped_rows += unmapped
+                    yield remapped.replace_schema_metadata(None)
+
+            self.db.create_table_from_batches(table_name, batches(), schema)
+
+            # 파일 단위 벡터와 스칼라 인덱스 생성 후 활성 테이블 교체
+            imported = self.db.for_table(table_name)
+            imported.migrate_schema()
+            await imported.ensure_file_vectors()
+            index_errors = await imported.ensure_scalar_indexes()
+
+            projects = self._remap_projects(info.get("projects", {}), path_map)
+            for key in ("name", "dimensions"):
+                snapshot_meta.pop(key, None)
+            self.db.activate_table(table_name, projects, table_meta=snapshot_meta)
+
+            # 이전 테이블 기준으로 기록된 미완료 인덱싱 실행은 더 이상 유효하지 않음
+            self.journal.finish_run()
+
+        project_paths: List[str] = sorted(
+            project["projectPath"] for project in projects.values() if "projectPath" in project
+        )
+        return {
+            "num_rows": num_rows,
+            "table": table_name,
+            "projects": project_paths,
+            "unmapped_projects": [
+                project_path for project_path in project_paths
+                if project_path not in self.config.project_paths
+            ],
+            "mismatches": self.db.table_meta_mismatches(),
+            # 파일 경로가 바뀌지 않은 행은 이 머신에서 원본을 읽을 수 없으며 다음 인덱싱에서 정리됨
+            "unmapped_rows": unmapped_rows,
+            "errors": index_errors,
+            "elapsed_time": round(time.time() - start_time, 2)
+        }
@@ -0,0 +1,105 @@
+"""원본 파일에서 청크 내용을 읽어오는 유틸리티
+
+청크 본문을 테이블에 저장하지 않는 경우(참조 저장), 검색 결과의 내용은
+저장된 바이트 오프셋으로 원본 파일을 메모리 매핑하여 읽고 내용 해시로 검증합니다.
+"""
+
+import hashlib
+import mmap
+from typing import Dict, List, Optional, Tuple
+
+
+def read_source_text(raw: bytes) -> Tuple[str, bool]:
+    """파일 바이트를 인덱싱에 사용할 텍스트로 변환합니다.
+
+    텍스트 모드로 읽은 것과 같도록 UTF-8로 디코딩(잘못된 바이트 무시)하고
+    줄바꿈을 `\\n`으로 통일합니다.
+
+    Args:
+        raw: 파일 바이트
+
+    Returns:
+        (텍스트, 텍스트의 UTF-8 인코딩이 원본 바이트와 정확히 같은지 여부) 튜플
+    """
+    text = raw.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        return text.replace("\r\n", "\n").replace("\r", "\n"), False
+    return text, len(text.encode("utf-8")) == len(raw)
+
+
+def to_byte_offsets(text: str, offsets: List[int]) -> Dict[int, int]:
+    """문자 오프셋을 UTF-8 바이트 오프셋으로 변환합니다.
+
+    Args:
+        text: 원본 텍스트
+        offsets: 문자 오프셋 리스트
+
+    Returns:
+        문자 오프셋 -> 바이트 오프셋 딕셔너리
+    """
+    if text.isascii():
+        return {offset: offset for offset in offsets}
+
+    # 정렬된 오프셋 사이 구간만 인코딩하여 누적
+    byte_offsets: Dict[int, int] = {}
+    position = 0
+    byte_position = 0
+    for offset in sorted(set(offsets)):
+        byte_position += len(text[position:offset].encode("utf-8"))
+        position = offset
+        byte_offsets[offset] = byte_position
+    return byte_offsets
+
+
+def read_chunks(
+    requests: List[Tuple[str, int, int, str]]
+) -> List[Optional[str]]:
+    """원본 파일에서 청크 내용을 읽고 내용 해시로 검증합니다.
+
+    같은 파일의 청크는 한 번의 메모리 매핑으로 읽습니다.
+
+    Args:
+        requests: (파일 경로, 시작 바이트, 끝 바이트, 내용 MD5 해시) 튜플 리스트
+
+    Returns:
+        요청 순서대로의 청크 내용 리스트 (파일이 없거나 인덱싱 이후 내용이 바뀐 경우 None)
+    """
+    results: List[Optional[str]] = [None] * len(requests)
+
+    by_file: Dict[str, List[int]] = {}
+    for i, (file_path, _, _, _) in enumerate(requests):
+        by_file.setdefault(file_path, []).append(i)
+
+    for file_path, indexes in by_file.items():
+        try:
+            with open(file_path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for i in indexes:
+                    _, start, end, content_hash = requests[i]
+                    data = mapped[start:end]
+                    if hashlib.md5(data).hexdigest() == content_hash:
+                        results[i] = data.decode("utf-8")
+        except (OSError, ValueError):
+            # 파일이 삭제되었거나 비어 있는 경우 (빈 파일은 매핑할 수 없음)
+            continue
+
+    return results
+
+
+def read_lines(file_path: str, start_line: int, end_line: int) -> Optional[str]:
+    """현재 파일에서 줄 범위의 내용을 읽습니다.
+
+    Args:
+        file_path: 파일 경로
+        start_line: 시작 줄 (1부터 시작)
+        end_line: 끝 줄 (포함)
+
+    Returns:
+        줄 범위의 내용 또는 파일을 읽을 수 없으면 None
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return None
+    return "\n".join(lines[max(start_line - 1, 0):end_line])
@@ -0,0 +1,111 @@
+"""인덱싱 상태 저장소
+
+프로젝트별 마지막 인덱싱 커밋 등 벡터 테이블에 담기 어려운 작은 상태 정보를
+LanceDB 디렉토리 안의 JSON 파일로 관리합니다.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class IndexStateStore:
+    """인덱싱 상태를 JSON 파일로 저장하고 불러오는 저장소"""
+
+    FILE_NAME = "index_state.json"
+
+    def __init__(self, base_path: str):
+        """상태 저장소를 초기화합니다.
+
+        Args:
+            base_path: 상태 파일을 저장할 디렉토리 (LanceDB 경로)
+        """
+        self.path = Path(base_path) / self.FILE_NAME
+        self._data: Optional[Dict[str, Any]] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        """상태 파일의 변경 여부를 판단할 (inode, 크기, 수정 시각) 서명을 반환합니다."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def load(self) -> Dict[str, Any]:
+        """디스크에서 상태를 읽어옵니다. 파일이 없거나 손상된 경우 빈 상태를 반환합니다.
+
+        Returns:
+            상태 딕셔너리
+        """
+        self._signature = self._stat_signature()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._data = {}
+        return self._data
+
+    def refresh(self) -> bool:
+        """다른 프로세스가 상태 파일을 바꿨으면 다시 읽습니다.
+
+        Returns:
+            상태를 다시 읽었으면 True
+        """
+        if self._data is not None and self._stat_signature() == self._signature:
+            return False
+        self.load()
+        return True
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """현재 상태 딕셔너리 (필요 시 디스크에서 로드)"""
+        if self._data is None:
+            return self.load()
+        return self._data
+
+    def save(self):
+        """상태를 디스크에 원자적으로 기록합니다 (임시 파일 작성 후 교체)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._signature = self._stat_signature()
+
+    def get_project(self, project_id: str) -> Dict[str, Any]:
+        """프로젝트의 인덱싱 상태를 가져옵니다.
+
+        Args:
+            project_id: 프로젝트 경로의 MD5 해시
+
+        Returns:
+            프로젝트 상태 딕셔너리 (없으면 빈 딕셔너리)
+        """
+        return dict(self.data.get("projects", {}).get(project_id, {}))
+
+    def set_project(self, project_id: str, project_state: Dict[str, Any]):
+        """프로젝트의 인덱싱 상태를 갱신하고 저장합니다.
+
+        Args:
+            project_id: 프로젝트 경로의 MD5 해시
+            project_state: 저장할 상태 딕셔너리
+        """
+        self.data.setdefault("projects", {})[project_id] = project_state
+        self.save()
+
+    def remove_project(self, project_id: str):
+        """프로젝트의 인덱싱 상태를 제거하고 저장합니다.
+
+        Args:
+            project_id: 프로젝트 경로의 MD5 해시
+        """
+        if self.data.get("projects", {}).pop(project_id, None) is not None:
+            self.save()
+
+    def project_ids(self) -> List[str]:
+        """상태가 기록된 모든 프로젝트 ID를 반환합니다."""
+        return list(self.data.get("projects", {}).keys())
@@ -0,0 +1,142 @@
+"""Git 기반 변경 감지 유틸리티
+
+git 저장소인 프로젝트에 대해 파일 시스템 전체를 스캔하지 않고
+마지막 인덱싱 커밋 이후 변경된 파일을 계산합니다.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Set
+from pydantic import BaseModel, Field
+
+GIT_TIMEOUT_SECONDS = 60
+
+
+class GitChanges(BaseModel):
+    """마지막 인덱싱 이후의 변경 사항 (프로젝트 루트 기준 상대 경로)"""
+
+    changed: Set[str] = Field(default_factory=set, description="추가되거나 수정된 파일")
+    deleted: Set[str] = Field(default_factory=set, description="삭제된 파일")
+    dirty: Set[str] = Field(
+        default_factory=set,
+        description="현재 작업 트리에서 커밋되지 않은 변경 또는 untracked 파일"
+    )
+    modified: Set[str] = Field(
+        default_factory=set,
+        description="마지막 인덱싱 커밋과 내용이 달라 인덱싱된 내용과도 다른 파일"
+    )
+
+
+def _run_git(repo_path: Path, *args: str) -> Optional[str]:
+    """git 명령을 실행하고 표준 출력을 반환합니다.
+
+    Args:
+        repo_path: 명령을 실행할 디렉토리
+        *args: git 인자
+
+    Returns:
+        표준 출력 문자열 또는 실패 시 None
+    """
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(repo_path), *args],
+            capture_output=True,
+            timeout=GIT_TIMEOUT_SECONDS,
+            check=False
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.decode("utf-8", errors="surrogateescape")
+
+
+def _split_nul(output: str) -> List[str]:
+    """NUL 문자로 구분된 git 출력을 분리합니다."""
+    return [item for item in output.split("\0") if item]
+
+
+def get_head_commit(repo_path: Path) -> Optional[str]:
+    """저장소의 HEAD 커밋 해시를 가져옵니다.
+
+    Args:
+        repo_path: 프로젝트 루트 경로
+
+    Returns:
+        커밋 해시 또는 git 저장소가 아니거나 커밋이 없는 경우 None
+    """
+    output = _run_git(repo_path, "rev-parse", "--verify", "--quiet", "HEAD")
+    if not output:
+        return None
+    return output.strip()
+
+
+def list_dirty_files(repo_path: Path) -> Optional[Set[str]]:
+    """HEAD와 다른 작업 트리 파일(스테이징 포함)과 untracked 파일을 나열합니다.
+
+    Args:
+        repo_path: 프로젝트 루트 경로
+
+    Returns:
+        상대 경로 집합 또는 git 실행 실패 시 None
+    """
+    modified = _run_git(
+        repo_path, "diff", "--name-only", "-z", "--no-renames", "--relative", "HEAD", "--", "."
+    )
+    untracked = _run_git(repo_path, "ls-files", "--others", "--exclude-standard", "-z")
+    if modified is None or untracked is None:
+        return None
+    return set(_split_nul(modified)) | set(_split_nul(untracked))
+
+
+def detect_changes(
+    repo_path: Path,
+    since_commit: str,
+    previously_dirty: List[str]
+) -> Optional[GitChanges]:
+    """마지막 인덱싱 커밋 이후 변경된 파일을 계산합니다.
+
+    `git diff --name-status <since_commit>`(커밋 대비 작업 트리)와 현재 untracked 파일,
+    그리고 지난 인덱싱 시점에 커밋되지 않았던 파일을 후보로 모은 뒤
+    디스크 존재 여부로 변경/삭제를 구분합니다.
+
+    지난 인덱싱 때 커밋된 상태였던 파일이 diff에 나오면 인덱싱된 내용과 다르다는 것이
+    확실하므로 `modified`에 넣습니다. 커밋되지 않았던 파일은 인덱싱된 내용이 커밋과
+    다를 수 있어 수정 시간으로 다시 확인해야 합니다.
+
+    Args:
+        repo_path: 프로젝트 루트 경로
+        since_commit: 마지막으로 인덱싱한 커밋 해시
+        previously_dirty: 지난 인덱싱 시점의 커밋되지 않은 파일 목록
+
+    Returns:
+        GitChanges 또는 git으로 계산할 수 없는 경우 None (예: 커밋이 사라진 경우)
+    """
+    diff_output = _run_git(
+        repo_path, "diff", "--name-status", "-z", "--no-renames", "--relative",
+        since_commit, "--", "."
+    )
+    if diff_output is None:
+        return None
+
+    dirty = list_dirty_files(repo_path)
+    if dirty is None:
+        return None
+
+    # --name-status -z 출력은 "상태\0경로\0" 쌍으로 구성됨
+    fields = _split_nul(diff_output)
+    diff_paths = set(fields[1::2])
+    candidates = diff_paths | dirty | set(previously_dirty)
+    modified = diff_paths - set(previously_dirty)
+
+    changes = GitChanges(dirty=dirty)
+    for relative_path in candidates:
+        if (repo_path / relative_path).is_file():
+            changes.changed.add(relative_path)
+            if relative_path in modified:
+                changes.modified.add(relative_path)
+        else:
+            changes.deleted.add(relative_path)
+
+    return changes
@@ -0,0 +1,118 @@
+"""테스트 공용 픽스처
+
+임베딩 API 대신 내용 해시로 결정되는 벡터를 반환하는 가짜 임베딩 서비스와,
+git 저장소로 초기화한 작은 Java 프로젝트를 제공합니다.
+"""
+
+import asyncio
+import hashlib
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+import numpy as np
+import pytest
+from legacy_code_archive_mcp.chunking import ChunkingService
+from legacy_code_archive_mcp.config import Config
+from legacy_code_archive_mcp.database import DatabaseService
+from legacy_code_archive_mcp.indexing import IndexingService
+
+DIMENSIONS = 16
+
+
+class FakeEmbeddingService:
+    """내용이 같으면 같은 단위 벡터를 반환하는 임베딩 서비스"""
+
+    def __init__(self, config: Config):
+        self.model = config.embedding_model
+        self.embedded_texts = 0
+
+    @staticmethod
+    def vector(text: str) -> List[float]:
+        seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+        vector = np.random.default_rng(seed).normal(size=DIMENSIONS)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def generate_embedding(self, text: str, model: Optional[str] = None) -> List[float]:
+        return self.vector(text)
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        self.embedded_texts += len(texts)
+        return [self.vector(text) for text in texts]
+
+
+class InterruptingEmbeddings:
+    """지정한 횟수만큼 배치를 임베딩한 뒤 실행을 중단시키는 임베딩 서비스"""
+
+    def __init__(self, inner, batches: int):
+        self.inner = inner
+        self.batches = batches
+
+    async def generate_embeddings_batch(self, texts):
+        if self.batches == 0:
+            raise asyncio.CancelledError()
+        self.batches -= 1
+        return await self.inner.generate_embeddings_batch(texts)
+
+
+def git(repo: Path, *args: str) -> str:
+    """테스트 저장소에서 git 명령을 실행합니다."""
+    completed = subprocess.run(
+        [
+            "git", "-C", str(repo),
+            "-c", "user.email=test@example.com", "-c", "user.name=test",
+            *args
+        ],
+        check=True,
+        capture_output=True,
+        text=True
+    )
+    return completed.stdout
+
+
+def write_java(path: Path, name: str, methods: int = 40) -> Path:
+    """여러 청크로 나뉘는 Java 파일을 작성합니다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = "\n".join(
+        f"    public int {name.lower()}Method{i}() {{ return {i} * {len(name)}; }}"
+        for i in range(methods)
+    )
+    path.write_text(f"public class {name} {{\n{body}\n}}\n", encoding="utf-8")
+    return path
+
+
+def touch_later(path: Path, seconds: float = 10.0):
+    """파일 수정 시각을 미래로 옮겨 수정 시간 비교에서 변경으로 감지되게 합니다."""
+    later = time.time() + seconds
+    os.utime(path, (later, later))
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """커밋 하나가 있는 git 저장소 프로젝트"""
+    root = tmp_path / "project"
+    for i in range(6):
+        write_java(root / "src" / f"Service{i}.java", f"Service{i}")
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "init")
+    return root
+
+
+@pytest.fixture
+def make_indexer(tmp_path: Path, project: Path) -> Callable[..., IndexingService]:
+    """구성 값을 바꿔 인덱싱 서비스를 만드는 팩토리"""
+
+    def make(**overrides) -> IndexingService:
+        config = Config(**{
+            "project_paths": [str(project)],
+            "openai_api_key": "test-key",
+            "lancedb_path": str(tmp_path / "lancedb"),
+            **overrides
+        })
+        db = DatabaseService(config)
+        db.refresh()
+        return IndexingService(config, db, FakeEmbeddingService(config), ChunkingService(config))
+
+    return make
@@ -0,0 +1,64 @@
+"""환경 변수 구성 로드 테스트"""
+
+import pytest
+from legacy_code_archive_mcp.config import OPTIONAL_ENV_VARS, load_config
+
+
+@pytest.fixture
+def required_env(monkeypatch):
+    """필수 환경 변수만 설정하고 선택 항목은 비웁니다."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("PROJECT_PATHS", "/tmp/a, /tmp/b")
+    for env_name in OPTIONAL_ENV_VARS.values():
+        monkeypatch.delenv(env_name, raising=False)
+    return monkeypatch
+
+
+def test_optional_settings_use_defaults_when_unset(required_env):
+    config = load_config()
+
+    assert config.project_paths == ["/tmp/a", "/tmp/b"]
+    assert config.checkpoint_chunks == 1000
+
+
+def test_optional_settings_are_read_from_environment(required_env):
+    required_env.setenv("CHECKPOINT_CHUNKS", "250")
+
+    config = load_config()
+
+    assert config.checkpoint_chunks == 250
+
+
+def test_missing_api_key_is_rejected(required_env):
+    required_env.delenv("OPENAI_API_KEY")
+
+    with pytest.raises(ValueError):
+        load_config()
+
+
+def test_maintenance_settings_are_read_from_environment(required_env):
+    required_env.setenv("OPTIMIZE_VERSION_THRESHOLD", "20")
+    required_env.setenv("OPTIMIZE_FRAGMENT_THRESHOLD", "8")
+    required_env.setenv("VERSION_RETENTION_DAYS", "1")
+
+    config = load_config()
+
+    assert config.optimize_version_threshold == 20
+    assert config.optimize_fragment_threshold == 8
+    assert config.version_retention_days == 1
+
+
+def test_search_settings_are_read_from_environment(required_env):
+    required_env.setenv("SEARCH_MODE", "two_stage")
+    required_env.setenv("TWO_STAGE_FILE_CANDIDATES", "120")
+
+    config = load_config()
+
+    assert config.search_mode == "two_stage"
+    assert config.two_stage_file_candidates == 120
+
+
+def test_read_consistency_is_read_from_environment(required_env):
+    required_env.setenv("READ_CONSISTENCY_SECONDS", "0.5")
+
+    assert load_config().read_consistency_seconds == 0.5
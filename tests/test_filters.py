@@ -0,0 +1,90 @@
+"""스칼라 인덱스와 검색 필터 테스트"""
+
+from pathlib import Path
+import pytest
+from conftest import FakeEmbeddingService, write_java
+from legacy_code_archive_mcp.database import DatabaseService
+
+QUERY = FakeEmbeddingService.vector("query")
+
+
+async def search(indexer, **filters):
+    """필터를 적용한 검색 결과의 파일 경로 집합을 반환합니다."""
+    found = await indexer.db.search_similar(
+        QUERY, limit=100, mmr_lambda=1.0, max_per_file=0, **filters
+    )
+    return {Path(result.filePath).name for result in found}
+
+
+@pytest.mark.asyncio
+async def test_indexing_creates_scalar_indexes_on_copy_columns(project: Path, make_indexer):
+    indexer = make_indexer()
+    result = await indexer.index_projects()
+
+    assert result.errors == []
+    assert set(DatabaseService.SCALAR_INDEXES) <= indexer.db._indexed_columns(indexer.db._table)
+    files_indexes = indexer.db._indexed_columns(indexer.db._files_table)
+    assert {"project_id", "file_path", "last_modified"} <= files_indexes
+
+    # 필터는 인덱스가 있는 소문자 복사본 컬럼을 사용
+    where = indexer.db.build_filter(project_filter=str(project))
+    plan = indexer.db._table.search(QUERY).where(where, prefilter=True).explain_plan(True)
+    assert "ScalarIndexQuery" in plan
+
+
+@pytest.mark.asyncio
+async def test_path_prefix_escapes_like_wildcards(project: Path, make_indexer):
+    write_java(project / "src" / "my_code" / "A.java", "A")
+    write_java(project / "src" / "myXcode" / "B.java", "B")
+    write_java(project / "src" / "100%" / "C.java", "C")
+    write_java(project / "src" / "1000" / "D.java", "D")
+    indexer = make_indexer()
+    await indexer.index_projects()
+
+    assert await search(indexer, path_prefix=str(project / "src" / "my_code")) == {"A.java"}
+    assert await search(indexer, path_prefix=str(project / "src" / "100%")) == {"C.java"}
+    # 상대 경로는 경로 중간에서 시작하는 디렉토리 일치도 허용
+    assert await search(indexer, path_prefix="my_code/") == {"A.java"}
+    assert await search(indexer, path_prefix="ode/") == set()
+
+
+@pytest.mark.asyncio
+async def test_language_and_project_filters(tmp_path: Path, project: Path, make_indexer):
+    (project / "web").mkdir()
+    (project / "web" / "app.ts").write_text(
+        "export function app(): number {\n  return 1;\n}\n", encoding="utf-8"
+    )
+    other = tmp_path / "other"
+    write_java(other / "Other.java", "Other")
+    indexer = make_indexer(project_paths=[str(project), str(other)])
+    await indexer.index_projects()
+
+    assert await search(indexer, language="TS") == {"app.ts"}
+    assert "app.ts" not in await search(indexer, language="java")
+    assert await search(indexer, project_filter=str(other)) == {"Other.java"}
+    assert await search(indexer, project_filter=str(project), language="java") == {
+        f"Service{i}.java" for i in range(6)
+    }
+    assert await search(indexer, modified_since=4102444800) == set()
+
+
+@pytest.mark.asyncio
+async def test_migrate_schema_adds_copy_columns_to_old_tables(project: Path, make_indexer):
+    indexer = make_indexer()
+    await indexer.index_projects()
+    copy_columns = list(DatabaseService.FILTER_COLUMNS.values())
+    indexer.db._table.drop_columns(copy_columns)
+    indexer.db._files_table.drop_columns(copy_columns)
+
+    # 복사본이 없는 이전 테이블은 원본 컬럼으로 필터
+    old = make_indexer()
+    assert old.db._column("filePath") == "filePath"
+    assert await search(old, project_filter=str(project)) == {f"Service{i}.java" for i in range(6)}
+
+    old.db.migrate_schema()
+
+    assert old.db._column("filePath") == "file_path"
+    rows = old.db._scan_columns(["filePath", "file_path", "projectId", "project_id"])
+    assert rows.column("file_path").to_pylist() == rows.column("filePath").to_pylist()
+    assert rows.column("project_id").to_pylist() == rows.column("projectId").to_pylist()
+    assert await search(old, path_prefix=str(project / "src" / "Service1")) == {"Service1.java"}
@@ -0,0 +1,90 @@
+"""저장된 벡터로 유사 코드를 찾는 find_similar 테스트"""
+
+import importlib
+import json
+import shutil
+from pathlib import Path
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture
+async def indexed(project: Path, make_indexer):
+    """Service0과 내용이 같은 Copy.java를 포함해 인덱싱한 서비스"""
+    shutil.copy(project / "src" / "Service0.java", project / "src" / "Copy.java")
+    indexer = make_indexer(chunk_size=300, chunk_overlap=0)
+    await indexer.index_projects()
+    return indexer
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path: Path, project: Path, indexed):
+    """인덱싱한 데이터베이스를 사용하는 서버 모듈"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("PROJECT_PATHS", str(project))
+    monkeypatch.setenv("LANCEDB_PATH", str(tmp_path / "server_db"))
+    module = importlib.import_module("legacy_code_archive_mcp.server")
+    monkeypatch.setattr(module, "db_service", indexed.db)
+    return module
+
+
+def chunk_rows(indexer, file_path: Path):
+    """파일의 청크 행을 줄 순서로 반환합니다."""
+    rows = indexer.db._scan_columns(
+        ["id", "content", "filePath", "startLine", "endLine"],
+        f"`file_path` = '{file_path}'"
+    ).to_pylist()
+    return sorted(rows, key=lambda row: row["startLine"])
+
+
+@pytest.mark.asyncio
+async def test_find_similar_by_file_excludes_source_file(project: Path, indexed):
+    source = project / "src" / "Service0.java"
+
+    results = await indexed.db.find_similar(file_path=str(source), limit=5, max_per_file=0)
+
+    assert results
+    assert all(Path(result.filePath) != source for result in results)
+    assert Path(results[0].filePath).name == "Copy.java"
+
+
+@pytest.mark.asyncio
+async def test_find_similar_by_chunk_id_and_by_line_range_agree(project: Path, indexed):
+    source = project / "src" / "Service0.java"
+    chunk = chunk_rows(indexed, source)[1]
+    copy_contents = {row["content"] for row in chunk_rows(indexed, project / "src" / "Copy.java")}
+    assert chunk["content"] in copy_contents
+
+    by_id = await indexed.db.find_similar(chunk_id=chunk["id"], limit=3, mmr_lambda=1.0)
+    by_lines = await indexed.db.find_similar(
+        file_path=str(source), start_line=chunk["startLine"], end_line=chunk["endLine"],
+        limit=3, mmr_lambda=1.0
+    )
+
+    # 내용이 같은 Copy.java의 청크가 가장 유사하고, 원본 파일의 다른 청크는 제외
+    assert by_id[0].content == chunk["content"]
+    assert Path(by_id[0].filePath).name == "Copy.java"
+    assert [result.id for result in by_id] == [result.id for result in by_lines]
+    assert all(Path(result.filePath) != source for result in by_id)
+
+
+@pytest.mark.asyncio
+async def test_find_similar_rejects_unknown_chunk(indexed):
+    with pytest.raises(ValueError):
+        await indexed.db.find_similar(chunk_id="missing")
+
+
+@pytest.mark.asyncio
+async def test_find_similar_tool_formats_results_and_errors(project: Path, server):
+    tool = server.find_similar.fn
+    source = project / "src" / "Service0.java"
+
+    response = json.loads(await tool(file_path=str(source), output_format="json"))
+    assert response["source"] == str(source)
+    assert response["results"]
+    assert all(Path(hit["filePath"]) != source for hit in response["results"])
+
+    error = json.loads(await tool(chunk_id="missing", output_format="json"))
+    assert "error" in error
+    assert "찾을 수 없습니다" in await tool(chunk_id="missing")
+    assert "error" in json.loads(await tool(output_format="json"))
@@ -0,0 +1,86 @@
+"""참조 저장(STORE_CONTENT=false) 시 바이트 오프셋으로 본문을 채우는 테스트"""
+
+from pathlib import Path
+import pytest
+from conftest import FakeEmbeddingService
+from legacy_code_archive_mcp.database import DatabaseService
+from legacy_code_archive_mcp.source_reader import read_chunks
+
+
+async def search_all(indexer, file_path: Path):
+    """파일의 모든 청크를 검색 결과로 가져옵니다."""
+    return await indexer.db.search_similar(
+        FakeEmbeddingService.vector("query"),
+        limit=20,
+        path_prefix=str(file_path),
+        mmr_lambda=1.0,
+        max_per_file=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_reference_storage_hydrates_content_from_source(project: Path, make_indexer):
+    indexer = make_indexer(store_content=False, chunk_size=300, chunk_overlap=0)
+    await indexer.index_projects()
+
+    rows = indexer.db._table.search().select(["content", "endOffset"]).limit(None).to_list()
+    assert rows and all(row["content"] == "" and row["endOffset"] > 0 for row in rows)
+
+    file_path = project / "src" / "Service0.java"
+    results = await search_all(indexer, file_path)
+    source_lines = file_path.read_text(encoding="utf-8").split("\n")
+
+    assert len(results) > 1
+    for found in results:
+        assert not found.stale
+        # 청크는 앞뒤 공백을 제외한 줄 범위의 내용
+        assert found.content == "\n".join(source_lines[found.startLine - 1:found.endLine]).strip()
+
+
+@pytest.mark.asyncio
+async def test_changed_source_returns_current_lines_marked_stale(project: Path, make_indexer):
+    indexer = make_indexer(store_content=False, chunk_size=300, chunk_overlap=0)
+    await indexer.index_projects()
+
+    file_path = project / "src" / "Service1.java"
+    source = file_path.read_text(encoding="utf-8")
+    file_path.write_text(source.replace("return", "return -"), encoding="utf-8")
+    current_lines = file_path.read_text(encoding="utf-8").split("\n")
+
+    results = await search_all(indexer, file_path)
+
+    assert results and all(found.stale for found in results)
+    for found in results:
+        assert found.content == "\n".join(current_lines[found.startLine - 1:found.endLine])
+
+
+@pytest.mark.asyncio
+async def test_non_reproducible_files_keep_stored_content(project: Path, make_indexer):
+    # CRLF 줄바꿈은 청크 문자열과 원본 바이트가 달라 본문을 그대로 저장
+    crlf = project / "src" / "Windows.java"
+    crlf.write_bytes(b"public class Windows {\r\n    int a() { return 1; }\r\n}\r\n")
+
+    indexer = make_indexer(store_content=False)
+    await indexer.index_projects()
+
+    rows = indexer.db._table.search().select(["content", "filePath"]).limit(None).to_list()
+    stored = [row["content"] for row in rows if row["filePath"] == str(crlf)]
+    assert stored and all(stored)
+
+
+def test_read_chunks_verifies_hash(tmp_path: Path):
+    file_path = tmp_path / "A.java"
+    file_path.write_text("héllo\nwörld\n", encoding="utf-8")
+    data = file_path.read_bytes()
+    start = data.index(b"w")
+    text = data[start:].decode("utf-8")
+
+    ok, wrong_hash, out_of_range, missing = read_chunks([
+        (str(file_path), start, len(data), DatabaseService.compute_content_hash(text)),
+        (str(file_path), start, len(data), "0" * 32),
+        (str(file_path), 0, len(data) + 10, DatabaseService.compute_content_hash(text)),
+        (str(tmp_path / "missing.java"), 0, 5, "0" * 32)
+    ])
+
+    assert ok == text
+    assert wrong_hash is None and out_of_range is None and missing is None
@@ -0,0 +1,166 @@
+"""증분 인덱싱, 재개, 처리량 기록 테스트"""
+
+import asyncio
+import os
+from pathlib import Path
+import pytest
+from conftest import FakeEmbeddingService, InterruptingEmbeddings, git, touch_later, write_java
+from legacy_code_archive_mcp.journal import IndexJournal
+
+
+@pytest.mark.asyncio
+async def test_incremental_index_handles_rename_and_delete(project: Path, make_indexer):
+    indexer = make_indexer()
+    first = await indexer.index_projects()
+    assert first.new_files == 6
+
+    git(project, "mv", "src/Service0.java", "src/Moved.java")
+    (project / "src" / "Service1.java").unlink()
+    git(project, "commit", "-q", "-am", "rename and delete")
+    write_java(project / "src" / "Service2.java", "Service2", methods=5)
+    touch_later(project / "src" / "Service2.java")
+
+    result = await indexer.index_projects()
+
+    assert (result.new_files, result.updated_files, result.deleted_files) == (1, 1, 2)
+    project_id = indexer.db.compute_project_id(str(project))
+    indexed = await indexer.db.get_indexed_files(project_id)
+    assert {Path(path).name for path in indexed} == {
+        "Moved.java", "Service2.java", "Service3.java", "Service4.java", "Service5.java"
+    }
+
+
+@pytest.mark.asyncio
+async def test_committed_change_is_indexed_within_mtime_tolerance(project: Path, make_indexer):
+    indexer = make_indexer()
+    await indexer.index_projects()
+
+    # 인덱싱된 수정 시간과 1초 이내에 수정하고 커밋한 경우
+    file_path = project / "src" / "Service1.java"
+    indexed_mtime = file_path.stat().st_mtime
+    write_java(file_path, "Edited", methods=3)
+    os.utime(file_path, (indexed_mtime, indexed_mtime))
+    git(project, "commit", "-q", "-am", "edit")
+
+    result = await indexer.index_projects()
+
+    assert result.updated_files == 1
+    found = await indexer.db.search_similar(
+        FakeEmbeddingService.vector("query"), limit=20, path_prefix=str(file_path)
+    )
+    assert found and all("editedMethod" in snippet.content for snippet in found)
+    # 다음 실행에서는 커밋된 파일로 기록되어 다시 인덱싱하지 않음
+    again = await indexer.index_projects()
+    assert (again.new_files, again.updated_files, again.deleted_files) == (0, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_without_committed_files(project: Path, make_indexer):
+    # 파일 하나가 체크포인트 하나가 되도록 작게 설정
+    indexer = make_indexer(checkpoint_chunks=1)
+    indexer.embeddings = InterruptingEmbeddings(indexer.embeddings, batches=2)
+    with pytest.raises(asyncio.CancelledError):
+        await indexer.index_projects()
+
+    pending = IndexJournal(indexer.config.lancedb_path).load_pending()
+    assert len(pending["committed"]) == 2
+
+    resumed = make_indexer(checkpoint_chunks=1)
+    result = await resumed.index_projects()
+
+    assert result.resumed
+    assert result.total_files == 6
+    project_id = resumed.db.compute_project_id(str(project))
+    assert len(await resumed.db.get_indexed_files(project_id)) == 6
+    # 이미 커밋된 두 파일은 다시 읽거나 임베딩하지 않음
+    fresh = make_indexer()
+    expected = sum(
+        len(fresh._prepare_file(path, str(project)))
+        for path in sorted((project / "src").glob("*.java"))
+        if str(path) not in pending["committed"]
+    )
+    assert resumed.embeddings.embedded_texts == expected
+    assert IndexJournal(indexer.config.lancedb_path).load_pending() is None
+
+
+def test_journal_ignores_truncated_last_line(tmp_path: Path):
+    journal = IndexJournal(str(tmp_path))
+    journal.start_run({"files": [], "deletes": []})
+    journal.record_committed(["/a.java", "/b.java"])
+    journal.record_deleted(["/c.java"])
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "commit", "files": ["/d.ja')
+
+    pending = journal.load_pending()
+
+    assert pending["committed"] == {"/a.java", "/b.java"}
+    assert pending["deleted"] == {"/c.java"}
+    journal.finish_run()
+    assert journal.load_pending() is None
+
+
+def test_save_throughput_decays_previous_measurements(make_indexer):
+    indexer = make_indexer()
+    indexer.db.state.data["throughput"] = {
+        "embeddingModel": indexer.config.embedding_model,
+        "embedChars": 1000, "embedSeconds": 10.0,
+        "storeChunks": 100, "storeSeconds": 2.0
+    }
+
+    indexer._measure("embed", 500, 1.0)
+    indexer._measure("embed", 500, 1.0)
+    indexer._measure("store", 50, 0.5)
+    indexer._save_throughput()
+
+    throughput = indexer.db.state.data["throughput"]
+    assert throughput["embedChars"] == pytest.approx(1000 * 0.5 + 1000)
+    assert throughput["embedSeconds"] == pytest.approx(10.0 * 0.5 + 2.0)
+    assert throughput["storeChunks"] == pytest.approx(100 * 0.5 + 50)
+    assert throughput["storeSeconds"] == pytest.approx(2.0 * 0.5 + 0.5)
+    # 측정값은 한 번만 반영
+    indexer._save_throughput()
+    assert indexer.db.state.data["throughput"]["embedChars"] == throughput["embedChars"]
+
+
+def test_save_throughput_drops_embed_measurements_of_other_model(make_indexer):
+    indexer = make_indexer()
+    indexer.db.state.data["throughput"] = {
+        "embeddingModel": "other-model",
+        "embedChars": 1000, "embedSeconds": 10.0,
+        "storeChunks": 100, "storeSeconds": 2.0
+    }
+
+    indexer._measure("embed", 300, 3.0)
+    indexer._save_throughput()
+
+    throughput = indexer.db.state.data["throughput"]
+    assert throughput["embeddingModel"] == indexer.config.embedding_model
+    assert (throughput["embedChars"], throughput["embedSeconds"]) == (300, 3.0)
+    assert (throughput["storeChunks"], throughput["storeSeconds"]) == (50, 1.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("checkpoint_chunks", [1, 10000])
+async def test_estimate_matches_embedded_chunks(project: Path, make_indexer, checkpoint_chunks):
+    # 같은 내용의 파일이 여러 체크포인트 배치에 걸쳐 있으면 배치마다 다시 임베딩됨
+    for i in range(4):
+        write_java(project / "src" / f"Copy{i}.java", "Copy")
+
+    indexer = make_indexer(checkpoint_chunks=checkpoint_chunks)
+    estimate = await indexer.estimate_index()
+    result = await indexer.index_projects()
+
+    assert estimate.mode == "incremental"
+    assert estimate.total.files == result.new_files == 10
+    assert estimate.total.chunks == result.total_chunks
+    assert estimate.total.chunks_to_embed == indexer.embeddings.embedded_texts
+
+    write_java(project / "src" / "Service0.java", "Service0", methods=45)
+    touch_later(project / "src" / "Service0.java")
+    indexer.embeddings.embedded_texts = 0
+    estimate = await indexer.estimate_index()
+    await indexer.index_projects()
+
+    assert estimate.total.updated_files == 1
+    assert estimate.total.reused_chunks > 0
+    assert estimate.total.chunks_to_embed == indexer.embeddings.embedded_texts
@@ -0,0 +1,119 @@
+"""인덱서 잠금과 테이블 핸들 캐시 테스트"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from legacy_code_archive_mcp.locking import IndexerLock, IndexerLockError
+
+HOLD_LOCK_SCRIPT = """
+import sys
+from legacy_code_archive_mcp.locking import IndexerLock
+with IndexerLock(sys.argv[1]).hold("index"):
+    print("locked", flush=True)
+    sys.stdin.read()
+"""
+
+
+@pytest.fixture
+def other_process(tmp_path: Path):
+    """다른 프로세스에서 잠금을 보유합니다."""
+    processes = []
+
+    def start(lock_dir: Path) -> subprocess.Popen:
+        process = subprocess.Popen(
+            [sys.executable, "-c", HOLD_LOCK_SCRIPT, str(lock_dir)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        assert process.stdout.readline().strip() == "locked"
+        processes.append(process)
+        return process
+
+    yield start
+    for process in processes:
+        process.stdin.close()
+        process.wait(timeout=10)
+
+
+def test_second_holder_fails_with_holder_details(tmp_path: Path):
+    lock = IndexerLock(str(tmp_path))
+
+    with lock.hold("rebuild"):
+        holder = IndexerLock(str(tmp_path)).holder()
+        assert holder["operation"] == "rebuild"
+        with pytest.raises(IndexerLockError, match="rebuild, pid"):
+            with IndexerLock(str(tmp_path)).hold("index"):
+                pass
+
+    assert lock.holder() is None
+    with lock.hold("index"):
+        pass
+
+
+def test_holder_reads_without_taking_the_lock(tmp_path: Path, monkeypatch, other_process):
+    process = other_process(tmp_path)
+
+    def fail(fd):
+        raise AssertionError("holder() must not try to lock")
+
+    monkeypatch.setattr(IndexerLock, "_try_lock", staticmethod(fail))
+    holder = IndexerLock(str(tmp_path)).holder()
+
+    assert holder["pid"] == process.pid
+    assert holder["operation"] == "index"
+
+
+@pytest.mark.asyncio
+async def test_indexing_fails_while_other_process_holds_lock(
+    tmp_path: Path, make_indexer, other_process
+):
+    indexer = make_indexer()
+    process = other_process(Path(indexer.config.lancedb_path))
+
+    with pytest.raises(IndexerLockError, match=f"pid {process.pid}"):
+        await indexer.index_projects()
+    # 상태 조회는 실행 중인 인덱서의 잠금에 영향을 주지 않음
+    assert indexer.lock.holder()["pid"] == process.pid
+
+
+def test_holder_ignores_info_left_by_dead_process(tmp_path: Path):
+    finished = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True, text=True, check=True
+    )
+    lock = IndexerLock(str(tmp_path))
+    info = {"pid": int(finished.stdout), "operation": "index", "since": 0}
+    lock.path.write_text("\n" + json.dumps(info), encoding="utf-8")
+
+    assert lock.holder() is None
+    with lock.hold("index"):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_refresh_reopens_tables_only_when_state_changes(project: Path, make_indexer):
+    reader = make_indexer()
+    calls = []
+    ensure_table = reader.db._ensure_table
+
+    def counting_ensure_table():
+        calls.append(reader.db.table_name)
+        ensure_table()
+
+    reader.db._ensure_table = counting_ensure_table
+
+    # 테이블이 없다는 것도 기억하여 다시 열지 않음
+    reader.db.refresh()
+    reader.db.refresh()
+    assert calls == []
+    assert reader.db._table is None
+
+    # 다른 프로세스가 인덱싱하여 상태를 기록하면 한 번만 다시 엶
+    writer = make_indexer()
+    await writer.index_projects()
+    reader.db.refresh()
+    reader.db.refresh()
+    assert calls == ["code_snippets"]
+    assert reader.db._table is not None
+    assert await reader.db.count_chunks() == await writer.db.count_chunks()
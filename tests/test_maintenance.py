@@ -0,0 +1,71 @@
+"""테이블 압축과 이전 버전 정리 테스트"""
+
+from pathlib import Path
+import pytest
+from conftest import touch_later, write_java
+
+
+async def index_in_batches(project: Path, make_indexer, **overrides):
+    """파일마다 체크포인트를 커밋하여 작은 프래그먼트를 여러 개 만듭니다."""
+    indexer = make_indexer(checkpoint_chunks=1, **overrides)
+    result = await indexer.index_projects()
+    return indexer, result
+
+
+@pytest.mark.asyncio
+async def test_indexing_skips_optimization_below_thresholds(project: Path, make_indexer):
+    indexer, result = await index_in_batches(
+        project, make_indexer, optimize_version_threshold=1000, optimize_fragment_threshold=1000
+    )
+
+    assert result.maintenance is None
+    assert not await indexer.db.needs_optimization()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("thresholds", [
+    {"optimize_version_threshold": 3, "optimize_fragment_threshold": 1000},
+    {"optimize_version_threshold": 1000, "optimize_fragment_threshold": 3},
+])
+async def test_indexing_optimizes_when_threshold_is_reached(
+    project: Path, make_indexer, thresholds
+):
+    indexer, result = await index_in_batches(project, make_indexer, **thresholds)
+
+    assert result.maintenance is not None
+    assert result.maintenance["after"]["num_fragments"] == 1
+    # 최적화 직후에는 기록된 버전 기준으로 다시 계산
+    assert not await indexer.db.needs_optimization()
+    last_optimized = indexer.db.state.data["maintenance"]["lastOptimizedVersion"]
+    assert last_optimized == result.maintenance["after"]["version"]
+
+
+@pytest.mark.asyncio
+async def test_optimize_table_reports_before_and_after_stats(project: Path, make_indexer):
+    indexer, _ = await index_in_batches(
+        project, make_indexer,
+        optimize_version_threshold=1000, optimize_fragment_threshold=1000,
+        version_retention_days=0
+    )
+    write_java(project / "src" / "Service0.java", "Service0", methods=10)
+    touch_later(project / "src" / "Service0.java")
+    await indexer.index_projects()
+
+    result = await indexer.db.optimize_table()
+    before, after = result["before"], result["after"]
+
+    assert before["num_rows"] == after["num_rows"] == await indexer.db.count_chunks()
+    assert before["num_fragments"] > after["num_fragments"]
+    assert after["num_small_fragments"] < before["num_small_fragments"]
+    assert after["version"] > before["version"]
+    # 보존 기간 0일이면 이전 버전이 정리되어 디스크 사용량이 줄어듦
+    assert after["num_versions"] < before["num_versions"]
+    assert after["disk_bytes"] < before["disk_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_optimize_table_without_index_returns_empty(make_indexer):
+    indexer = make_indexer()
+
+    assert await indexer.db.optimize_table() == {}
+    assert not await indexer.db.needs_optimization()
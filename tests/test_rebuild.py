@@ -0,0 +1,97 @@
+"""구성 변경 시 섀도 테이블 재인덱싱과 교체 테스트"""
+
+import asyncio
+from pathlib import Path
+import pytest
+from conftest import FakeEmbeddingService, InterruptingEmbeddings
+
+QUERY = FakeEmbeddingService.vector("query")
+
+
+async def max_chunk_length(db) -> int:
+    """검색 결과 청크의 최대 길이 (어느 청크 크기로 만든 테이블인지 확인용)"""
+    found = await db.search_similar(QUERY, limit=50, mmr_lambda=1.0, max_per_file=0)
+    assert found
+    return max(len(result.content) for result in found)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_shadow_reindex_resumes_and_swaps_atomically(project: Path, make_indexer):
+    active = make_indexer()
+    await active.index_projects()
+    old_table = active.db.table_name
+
+    # 청크 크기를 바꾸면 새 청크를 임베딩하는 섀도 재인덱싱이 필요
+    rebuilding = make_indexer(chunk_size=300, chunk_overlap=0, checkpoint_chunks=1)
+    assert rebuilding.db.table_meta_mismatches() == ["chunkSize", "chunkOverlap"]
+    rebuilding.embeddings = InterruptingEmbeddings(rebuilding.embeddings, batches=2)
+    with pytest.raises(asyncio.CancelledError):
+        await rebuilding.rebuild_index()
+
+    # 중단된 동안 검색은 기존 테이블에서 계속 동작
+    migration = rebuilding.db.state.data["migration"]
+    shadow = rebuilding.db.for_table(migration["table"])
+    committed = await shadow.get_indexed_files(rebuilding.db.compute_project_id(str(project)))
+    assert len(committed) == 2
+    reader = make_indexer()
+    assert reader.db.table_name == old_table
+    assert await max_chunk_length(reader.db) > 300
+
+    resumed = make_indexer(chunk_size=300, chunk_overlap=0, checkpoint_chunks=1)
+    result = await resumed.rebuild_index()
+
+    # 이미 섀도 테이블에 기록된 파일은 다시 임베딩하지 않음
+    assert result.new_files == 4
+    assert result.errors == []
+    remaining = [
+        path for path in sorted((project / "src").glob("*.java")) if str(path) not in committed
+    ]
+    assert resumed.embeddings.embedded_texts == sum(
+        len(resumed._prepare_file(path, str(project))) for path in remaining
+    )
+
+    # 교체 후 활성 테이블이 바뀌고 이전 테이블은 제거됨
+    assert resumed.db.table_name == migration["table"]
+    assert resumed.db.table_meta_mismatches() == []
+    assert "migration" not in resumed.db.state.data
+    assert old_table not in resumed.db.db.table_names()
+    reader.db.refresh()
+    assert reader.db.table_name == migration["table"]
+    assert await max_chunk_length(reader.db) <= 300
+    project_id = reader.db.compute_project_id(str(project))
+    assert len(await reader.db.get_indexed_files(project_id)) == 6
+
+
+@pytest.mark.asyncio
+async def test_shadow_reindex_with_same_model_reuses_vectors(project: Path, make_indexer):
+    await make_indexer().index_projects()
+
+    # 본문 저장 방식만 바뀌면 청크 내용이 같아 모든 벡터를 재사용
+    rebuilding = make_indexer(store_content=False)
+    assert rebuilding.db.table_meta_mismatches() == ["storeContent"]
+    result = await rebuilding.rebuild_index()
+
+    assert result.total_chunks > 0
+    assert rebuilding.embeddings.embedded_texts == 0
+    assert rebuilding.db.table_meta_mismatches() == []
+
+
+@pytest.mark.asyncio
+async def test_changed_config_discards_stale_shadow_table(project: Path, make_indexer):
+    await make_indexer().index_projects()
+    interrupted = make_indexer(chunk_size=300, checkpoint_chunks=1)
+    interrupted.embeddings = InterruptingEmbeddings(interrupted.embeddings, batches=1)
+    with pytest.raises(asyncio.CancelledError):
+        await interrupted.rebuild_index()
+    stale_table = interrupted.db.state.data["migration"]["table"]
+
+    # 재인덱싱 도중 구성이 다시 바뀌면 이전 섀도 테이블을 버리고 처음부터 구축
+    changed = make_indexer(chunk_size=400)
+    result = await changed.rebuild_index()
+
+    assert result.new_files == 6
+    assert changed.db.table_meta_mismatches() == []
+    # 이전 활성 테이블과 섀도 테이블은 모두 제거되고 새 테이블만 남음
+    active_table = changed.db.table_name
+    assert stale_table == active_table or stale_table not in changed.db.db.table_names()
+    assert set(changed.db.db.table_names()) == {active_table, changed.db.files_table_name}
@@ -0,0 +1,80 @@
+"""MMR 재순위화와 파일별 상한 테스트"""
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from legacy_code_archive_mcp import reranking
+
+
+def unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+QUERY = [1.0, 0.0, 0.0]
+# 0: 쿼리와 같은 방향, 1: 0과 거의 같은 청크, 2: 관련성은 낮지만 다른 내용
+CANDIDATES = np.stack([unit(1, 0, 0), unit(0.99, 0.14, 0), unit(0.7, 0, 0.7)])
+
+
+def test_relevance_only_keeps_similarity_order():
+    order = reranking.mmr_rerank(QUERY, CANDIDATES, ["a", "b", "c"], limit=3, mmr_lambda=1.0)
+
+    assert order == [0, 1, 2]
+
+
+def test_mmr_prefers_diverse_result_over_near_duplicate():
+    order = reranking.mmr_rerank(QUERY, CANDIDATES, ["a", "b", "c"], limit=3, mmr_lambda=0.3)
+
+    assert order == [0, 2, 1]
+
+
+def test_per_file_cap_skips_file_until_other_candidates_run_out():
+    vectors = np.stack([unit(1, 0.1 * i, 0) for i in range(4)])
+    groups = ["A.java", "A.java", "A.java", "B.java"]
+
+    capped = reranking.mmr_rerank(QUERY, vectors, groups, limit=3, mmr_lambda=1.0, max_per_file=2)
+    assert capped == [0, 1, 3]
+
+    # 상한 때문에 limit을 채울 수 없으면 상한을 풀고 계속 고름
+    filled = reranking.mmr_rerank(QUERY, vectors, groups, limit=4, mmr_lambda=1.0, max_per_file=1)
+    assert filled == [0, 3, 1, 2]
+
+
+def test_mmr_rerank_handles_empty_and_short_candidates():
+    empty = np.zeros((0, 3), dtype=np.float32)
+    assert reranking.mmr_rerank(QUERY, empty, [], limit=5, mmr_lambda=0.5) == []
+    assert sorted(reranking.mmr_rerank(QUERY, CANDIDATES, ["a", "b", "c"], 10, 0.5)) == [0, 1, 2]
+
+
+def test_vector_matrix_normalizes_rows():
+    column = pa.chunked_array([
+        pa.array([[3.0, 4.0]], pa.list_(pa.float32(), 2)),
+        pa.array([[0.0, 0.0]], pa.list_(pa.float32(), 2))
+    ])
+
+    matrix = reranking.vector_matrix(column)
+
+    assert matrix.shape == (2, 2)
+    np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 0.0]], rtol=1e-6)
+
+
+@pytest.mark.parametrize("limit, mmr_lambda, max_per_file, expected", [
+    (5, 1.0, 0, False),
+    (1, 0.5, 2, False),
+    (5, 0.7, 0, True),
+    (5, 1.0, 2, True),
+])
+def test_needs_rerank(limit, mmr_lambda, max_per_file, expected):
+    assert reranking.needs_rerank(limit, mmr_lambda, max_per_file) is expected
+
+
+def test_candidate_limit_is_bounded():
+    assert reranking.candidate_limit(5, 4) == 20
+    assert reranking.candidate_limit(5, 0) == 5
+    assert reranking.candidate_limit(100, 4) == reranking.MAX_CANDIDATES
+
+
+def test_resolve_settings_uses_defaults_and_clamps():
+    assert reranking.resolve_settings(None, None, 0.7, 2) == (0.7, 2)
+    assert reranking.resolve_settings(1.5, -1, 0.7, 2) == (1.0, 0)
+    assert reranking.resolve_settings(-0.2, 3, 0.7, 2) == (0.0, 3)
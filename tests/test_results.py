@@ -0,0 +1,111 @@
+"""검색 결과 병합과 응답 크기 예산 테스트"""
+
+import json
+from legacy_code_archive_mcp.models import SearchResult
+from legacy_code_archive_mcp.results import (
+    MIN_SNIPPET_CHARS,
+    build_json_response,
+    merge_results,
+    snippet_budget,
+    trim_snippet,
+)
+
+
+def lines(start: int, end: int) -> str:
+    return "\n".join(f"line {i}" for i in range(start, end + 1))
+
+
+def result(
+    chunk_id: str, start: int, end: int, score: float, file_path: str = "/p/A.java"
+) -> SearchResult:
+    return SearchResult(
+        id=chunk_id,
+        content=lines(start, end) if end else "no line info",
+        filePath=file_path,
+        projectPath="/p",
+        language="java",
+        score=score,
+        startLine=start,
+        endLine=end
+    )
+
+
+def test_merge_overlapping_ranges_keeps_each_line_once():
+    merged = merge_results([result("b", 4, 8, 0.2), result("a", 1, 5, 0.3)])
+
+    assert len(merged) == 1
+    assert (merged[0].startLine, merged[0].endLine) == (1, 8)
+    assert merged[0].content == lines(1, 8)
+    assert merged[0].score == 0.2
+    assert merged[0].id == "b"
+    assert merged[0].chunkIds == ["a", "b"]
+
+
+def test_merge_adjacent_ranges_but_not_gaps():
+    merged = merge_results([
+        result("a", 1, 3, 0.1), result("b", 4, 6, 0.2), result("c", 8, 9, 0.3)
+    ])
+
+    assert [(r.startLine, r.endLine, r.chunkIds) for r in merged] == [
+        (1, 6, ["a", "b"]), (8, 9, ["c"])
+    ]
+    assert merged[0].content == lines(1, 6)
+
+
+def test_merge_contained_range_adds_no_lines():
+    merged = merge_results([result("outer", 1, 10, 0.4), result("inner", 3, 5, 0.1)])
+
+    assert len(merged) == 1
+    assert (merged[0].startLine, merged[0].endLine) == (1, 10)
+    assert merged[0].content == lines(1, 10)
+    assert merged[0].id == "inner"
+
+
+def test_merge_keeps_other_files_and_results_without_lines():
+    merged = merge_results([
+        result("a", 1, 5, 0.1),
+        result("b", 3, 6, 0.2, file_path="/p/B.java"),
+        result("c", 0, 0, 0.3),
+        result("d", 0, 0, 0.4)
+    ])
+
+    assert [r.chunkIds for r in merged] == [["a"], ["b"], ["c"], ["d"]]
+
+
+def test_trim_snippet_cuts_at_line_boundary():
+    snippet, truncated = trim_snippet(lines(1, 10), 20)
+
+    assert truncated
+    assert snippet == lines(1, 2)
+    assert trim_snippet("short", 20) == ("short", False)
+
+
+def test_snippet_budget_splits_total_with_minimum():
+    assert snippet_budget(3, None, 600) == 600
+    assert snippet_budget(2, 3000, 600) == 600
+    assert snippet_budget(5, 2000, 600) == 400
+    assert snippet_budget(50, 2000, 600) == MIN_SNIPPET_CHARS
+
+
+def test_build_json_response_stays_within_max_chars():
+    results = [
+        result(f"r{i}", 1, 200, 0.1 * i, file_path=f"/p/F{i}.java") for i in range(10)
+    ]
+
+    response = build_json_response(results, total_hits=12, max_chars=3000, query="q")
+    payload = json.loads(response)
+
+    assert len(response) <= 3000
+    assert payload["query"] == "q"
+    assert payload["total_hits"] == 12
+    assert payload["omitted"] == 10 - len(payload["results"])
+    assert payload["results"][0]["id"] == "r0"
+    assert all(item["truncated"] for item in payload["results"])
+
+
+def test_build_json_response_always_includes_best_result():
+    response = build_json_response([result("only", 1, 200, 0.1)], total_hits=1, max_chars=100)
+    payload = json.loads(response)
+
+    assert [item["id"] for item in payload["results"]] == ["only"]
+    assert payload["omitted"] == 0
@@ -0,0 +1,93 @@
+"""인덱스 스냅샷 내보내기/가져오기 테스트"""
+
+import shutil
+from pathlib import Path
+import pytest
+from conftest import FakeEmbeddingService
+from legacy_code_archive_mcp.snapshot import SnapshotService
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("through_symlink", [False, True])
+async def test_import_remaps_paths_to_new_location(
+    tmp_path: Path, project: Path, make_indexer, through_symlink
+):
+    # 심볼릭 링크로 구성한 프로젝트는 파일 경로가 해석된 실제 경로로 저장됨
+    configured = project
+    if through_symlink:
+        configured = tmp_path / "link"
+        configured.symlink_to(project)
+
+    source = make_indexer(project_paths=[str(configured)], lancedb_path=str(tmp_path / "source_db"))
+    await source.index_projects()
+    snapshot_path = tmp_path / "snapshot.arrow"
+    exported = await SnapshotService(source.config, source.db).export_snapshot(str(snapshot_path))
+    assert exported["projects"] == [str(configured)]
+
+    moved = tmp_path / "moved"
+    shutil.copytree(project, moved)
+    target = make_indexer(project_paths=[str(moved)], lancedb_path=str(tmp_path / "target_db"))
+    snapshots = SnapshotService(target.config, target.db)
+
+    result = await snapshots.import_snapshot(str(snapshot_path), {str(configured): str(moved)})
+
+    assert result["num_rows"] == exported["num_rows"]
+    assert result["projects"] == [str(moved)]
+    assert result["unmapped_projects"] == []
+    assert result["unmapped_rows"] == 0
+    assert result["mismatches"] == []
+    assert result["errors"] == []
+
+    project_id = target.db.compute_project_id(str(moved))
+    indexed = await target.db.get_indexed_files(project_id)
+    assert sorted(indexed) == sorted(str(path) for path in (moved / "src").glob("*.java"))
+
+    found = await target.db.search_similar(
+        FakeEmbeddingService.vector("query"), limit=3, project_filter=str(moved)
+    )
+    assert found and all(Path(result.filePath).is_relative_to(moved) for result in found)
+
+    # 가져온 상태로 증분 인덱싱하면 임베딩할 파일이 없음
+    after = await target.index_projects()
+    assert (after.new_files, after.updated_files, after.deleted_files) == (0, 0, 0)
+    assert target.embeddings.embedded_texts == 0
+
+
+@pytest.mark.asyncio
+async def test_import_reports_rows_outside_project_root(
+    tmp_path: Path, project: Path, make_indexer
+):
+    source = make_indexer(lancedb_path=str(tmp_path / "source_db"))
+    await source.index_projects()
+    snapshot_path = tmp_path / "snapshot.arrow"
+    snapshots = SnapshotService(source.config, source.db)
+    await snapshots.export_snapshot(str(snapshot_path))
+
+    # 다른 루트로 기록된 스냅샷 - 프로젝트 경로는 바뀌지만 파일 경로는 바꿀 수 없음
+    info = SnapshotService.read_snapshot_info(str(snapshot_path))
+    info["roots"] = {str(project): "/elsewhere"}
+    target = make_indexer(lancedb_path=str(tmp_path / "target_db"))
+    target_snapshots = SnapshotService(target.config, target.db)
+    batch = next(iter(source.db.scan_batches(1000)))
+
+    remapped, unmapped = target_snapshots._remap_batch(
+        batch, {str(project): str(tmp_path / "moved")}, info["roots"]
+    )
+
+    assert unmapped == batch.num_rows
+    assert remapped.column("filePath").to_pylist() == batch.column("filePath").to_pylist()
+    assert set(remapped.column("projectPath").to_pylist()) == {str(tmp_path / "moved")}
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_other_embedding_model(tmp_path: Path, make_indexer):
+    source = make_indexer(lancedb_path=str(tmp_path / "source_db"))
+    await source.index_projects()
+    snapshot_path = tmp_path / "snapshot.arrow"
+    await SnapshotService(source.config, source.db).export_snapshot(str(snapshot_path))
+
+    target = make_indexer(
+        lancedb_path=str(tmp_path / "target_db"), embedding_model="text-embedding-3-large"
+    )
+    with pytest.raises(ValueError):
+        await SnapshotService(target.config, target.db).import_snapshot(str(snapshot_path))
@@ -0,0 +1,124 @@
+"""파일 단위 벡터와 2단계 검색 테스트"""
+
+from pathlib import Path
+import numpy as np
+import pytest
+from conftest import FakeEmbeddingService, touch_later, write_java
+from legacy_code_archive_mcp.database import DatabaseService
+
+
+def file_vectors(db) -> dict:
+    """파일 벡터 테이블의 파일 경로 -> (벡터, 청크 수) 딕셔너리"""
+    rows = db._files_table.to_arrow().select(["filePath", "vector", "chunkCount"]).to_pylist()
+    return {row["filePath"]: (np.asarray(row["vector"]), row["chunkCount"]) for row in rows}
+
+
+def chunk_centroids(db) -> dict:
+    """청크 테이블에서 직접 계산한 파일별 정규화 평균 벡터"""
+    rows = db._scan_columns(["filePath", "vector"]).to_pylist()
+    grouped: dict = {}
+    for row in rows:
+        grouped.setdefault(row["filePath"], []).append(row["vector"])
+    centroids = {}
+    for path, vectors in grouped.items():
+        mean = np.mean(vectors, axis=0)
+        centroids[path] = (mean / np.linalg.norm(mean), len(vectors))
+    return centroids
+
+
+def test_compute_file_vectors_averages_and_normalizes_per_file():
+    paths = ["B.java", "A.java", "B.java", "A.java", "A.java"]
+    vectors = np.asarray([
+        [0.0, 2.0], [1.0, 0.0], [0.0, 4.0], [1.0, 0.0], [0.0, 3.0]
+    ], dtype=np.float32)
+    metadata = {
+        path: {
+            "projectId": f"p-{path}", "projectPath": "/p", "language": "java", "lastModified": 1.0
+        }
+        for path in set(paths)
+    }
+
+    table = DatabaseService._compute_file_vectors(paths, vectors, metadata)
+
+    rows = {row["filePath"]: row for row in table.to_pylist()}
+    assert rows["A.java"]["chunkCount"] == 3
+    assert rows["B.java"]["chunkCount"] == 2
+    np.testing.assert_allclose(rows["A.java"]["vector"], np.array([2, 3]) / np.sqrt(13), rtol=1e-6)
+    np.testing.assert_allclose(rows["B.java"]["vector"], [0.0, 1.0])
+    assert rows["A.java"]["project_id"] == rows["A.java"]["projectId"] == "p-A.java"
+    assert rows["A.java"]["file_path"] == "A.java"
+    assert DatabaseService._compute_file_vectors([], vectors[:0], {}) is None
+
+
+@pytest.mark.asyncio
+async def test_file_vectors_follow_incremental_changes(project: Path, make_indexer):
+    indexer = make_indexer(chunk_size=300, chunk_overlap=0)
+    await indexer.index_projects()
+
+    write_java(project / "src" / "Service0.java", "Changed", methods=5)
+    touch_later(project / "src" / "Service0.java")
+    (project / "src" / "Service1.java").unlink()
+    await indexer.index_projects()
+
+    maintained = file_vectors(indexer.db)
+    expected = chunk_centroids(indexer.db)
+    assert maintained.keys() == expected.keys()
+    assert str(project / "src" / "Service1.java") not in maintained
+    for path, (vector, count) in expected.items():
+        np.testing.assert_allclose(maintained[path][0], vector, rtol=1e-5, atol=1e-6)
+        assert maintained[path][1] == count
+
+
+@pytest.mark.asyncio
+async def test_ensure_file_vectors_creates_missing_table(project: Path, make_indexer):
+    indexer = make_indexer(chunk_size=300, chunk_overlap=0)
+    await indexer.index_projects()
+    maintained = file_vectors(indexer.db)
+
+    # 파일 벡터 테이블이 없던 이전 인덱스
+    indexer.db.db.drop_table(indexer.db.files_table_name)
+    indexer.db._files_table = None
+    await indexer.db.ensure_file_vectors()
+
+    created = file_vectors(indexer.db)
+    assert created.keys() == maintained.keys()
+    for path, (vector, count) in maintained.items():
+        np.testing.assert_allclose(created[path][0], vector, rtol=1e-5, atol=1e-6)
+        assert created[path][1] == count
+
+
+@pytest.mark.asyncio
+async def test_two_stage_matches_flat_when_all_files_are_candidates(project: Path, make_indexer):
+    indexer = make_indexer(chunk_size=300, chunk_overlap=0, two_stage_file_candidates=6)
+    await indexer.index_projects()
+    db = indexer.db
+
+    for text in ("query", "parse", "export"):
+        query = FakeEmbeddingService.vector(text)
+        flat = db._search_rows(query, 10, None, "flat")
+        two_stage = db._search_rows(query, 10, None, "two_stage")
+        assert [row["id"] for row in two_stage] == [row["id"] for row in flat]
+
+    comparison = await db.compare_search_modes(sample_size=10, limit=5)
+    assert comparison["recall"] == 1.0
+    assert comparison["total_files"] == 6
+    assert comparison["file_filter_indexed"]
+
+
+@pytest.mark.asyncio
+async def test_two_stage_searches_only_candidate_files(project: Path, make_indexer):
+    indexer = make_indexer(chunk_size=300, chunk_overlap=0, two_stage_file_candidates=2)
+    await indexer.index_projects()
+    db = indexer.db
+    query = FakeEmbeddingService.vector("query")
+
+    candidates = db._candidate_files(query, None)
+    rows = db._search_rows(query, 20, None, "two_stage")
+
+    assert len(candidates) == 2
+    assert rows and {row["filePath"] for row in rows} <= set(candidates)
+    comparison = await db.compare_search_modes(sample_size=20, limit=5)
+    assert 0.0 <= comparison["recall"] <= 1.0
+    # 필터와 함께 쓰면 후보 파일도 필터 안에서 고름
+    where = db.build_filter(path_prefix=str(project / "src" / "Service3"))
+    assert db._candidate_files(query, where) == [str(project / "src" / "Service3.java")]
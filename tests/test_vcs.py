@@ -0,0 +1,71 @@
+"""git 기반 변경 감지 테스트"""
+
+from pathlib import Path
+from conftest import git, write_java
+from legacy_code_archive_mcp import vcs
+
+
+def test_detect_changes_reports_modified_added_and_deleted(project: Path):
+    base = vcs.get_head_commit(project)
+
+    write_java(project / "src" / "Service0.java", "Service0", methods=10)
+    (project / "src" / "Service1.java").unlink()
+    git(project, "commit", "-q", "-am", "modify and delete")
+    write_java(project / "src" / "Untracked.java", "Untracked")
+
+    changes = vcs.detect_changes(project, base, [])
+
+    assert changes is not None
+    assert changes.changed == {"src/Service0.java", "src/Untracked.java"}
+    assert changes.deleted == {"src/Service1.java"}
+    assert changes.dirty == {"src/Untracked.java"}
+    assert changes.modified == {"src/Service0.java"}
+
+
+def test_detect_changes_splits_renames_into_delete_and_add(project: Path):
+    base = vcs.get_head_commit(project)
+
+    git(project, "mv", "src/Service2.java", "src/Renamed.java")
+    git(project, "commit", "-q", "-m", "rename")
+
+    changes = vcs.detect_changes(project, base, [])
+
+    assert changes.changed == {"src/Renamed.java"}
+    assert changes.deleted == {"src/Service2.java"}
+
+
+def test_detect_changes_keeps_special_characters_in_paths(project: Path):
+    base = vcs.get_head_commit(project)
+
+    # -z 출력은 공백, 따옴표, 비ASCII 문자를 이스케이프하지 않음
+    names = ["src/with space.java", "src/한글 파일.java", 'src/quote"d.java']
+    for name in names:
+        write_java(project / name, "Special")
+    git(project, "add", ".")
+    git(project, "commit", "-q", "-m", "special names")
+    (project / names[0]).unlink()
+
+    changes = vcs.detect_changes(project, base, [])
+
+    assert changes.changed == set(names[1:])
+    assert changes.deleted == {names[0]}
+
+
+def test_detect_changes_rechecks_previously_dirty_files(project: Path):
+    base = vcs.get_head_commit(project)
+
+    # 지난 인덱싱 때 커밋되지 않았던 파일은 되돌려졌어도 다시 확인
+    changes = vcs.detect_changes(project, base, ["src/Service3.java", "src/Gone.java"])
+
+    assert changes.changed == {"src/Service3.java"}
+    assert changes.deleted == {"src/Gone.java"}
+    assert changes.dirty == set()
+    assert changes.modified == set()
+
+
+def test_detect_changes_returns_none_for_unknown_commit(project: Path):
+    assert vcs.detect_changes(project, "0" * 40, []) is None
+
+
+def test_get_head_commit_outside_repository(tmp_path: Path):
+    assert vcs.get_head_commit(tmp_path) is None